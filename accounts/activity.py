@@ -0,0 +1,111 @@
+"""
+Buffered last-login and last-seen tracking.
+
+Writing the user row on every token issuance turns logins and refreshes
+into row updates. Instead, activity is buffered in process, keeping only the
+latest timestamp per user, and written out with bulk UPDATEs by a
+background thread every flush interval, or by the request that fills up a
+batch. Timestamps still buffered when a process dies are lost, which is
+acceptable for activity data.
+"""
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+class LastSeenTracker:
+    """Per-process buffer of user activity, flushed in batches"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seen = {}
+        self._logins = {}
+        self._stop = threading.Event()
+        self._flusher_pid = None
+
+    def record(self, user_id, login=False, when=None):
+        """Buffer activity for ``user_id``; logins also update ``last_login``"""
+        when = when or timezone.now()
+        with self._lock:
+            self._seen[user_id] = max(when, self._seen.get(user_id, when))
+            if login:
+                self._logins[user_id] = max(when, self._logins.get(user_id, when))
+            due = len(self._seen) >= settings.LAST_SEEN_BATCH_SIZE
+            # Threads do not survive a fork, so each worker process starts
+            # its own flusher on first use
+            start = self._flusher_pid != os.getpid()
+            if start:
+                self._flusher_pid = os.getpid()
+        if start:
+            threading.Thread(target=self._run, name='last-seen-flusher', daemon=True).start()
+        if due:
+            self.flush()
+
+    def stop(self):
+        """Stop the background flusher"""
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(settings.LAST_SEEN_FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception:
+                logger.exception('Could not flush last-seen data')
+            finally:
+                # Not kept open for the whole interval between flushes
+                connections.close_all()
+
+    def pending(self):
+        with self._lock:
+            return len(self._seen)
+
+    def flush(self):
+        """Write buffered timestamps to the database; returns rows updated"""
+        with self._lock:
+            seen, self._seen = self._seen, {}
+            logins, self._logins = self._logins, {}
+        if not seen:
+            return 0
+
+        from .models import User
+
+        batch_size = settings.LAST_SEEN_BATCH_SIZE
+        try:
+            updated = User.objects.bulk_update(
+                [User(pk=user_id, last_seen=when) for user_id, when in seen.items()],
+                ['last_seen'],
+                batch_size=batch_size
+            )
+            if logins:
+                User.objects.bulk_update(
+                    [User(pk=user_id, last_login=when) for user_id, when in logins.items()],
+                    ['last_login'],
+                    batch_size=batch_size
+                )
+        except DatabaseError:
+            logger.exception('Dropped last-seen data for %d users', len(seen))
+            return 0
+        return updated
+
+
+tracker = LastSeenTracker()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        tracker.flush()
+    except Exception:
+        # The database may already be unusable while the process exits
+        logger.warning('Could not flush last-seen data at exit', exc_info=True)
+
+
+def record_activity(user_id, login=False):
+    """Record that ``user_id`` logged in or refreshed a token"""
+    tracker.record(user_id, login=login)
@@ -5,5 +5,6 @@ from .models import User
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
-    list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff')
+    list_display = ('username', 'email', 'first_name', 'last_name', 'is_staff', 'last_seen')
+    readonly_fields = ('last_login', 'last_seen')
     search_fields = ('username', 'email')
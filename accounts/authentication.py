@@ -0,0 +1,54 @@
+from asgiref.sync import sync_to_async
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser
+from .revocation import ais_revoked, is_revoked
+
+
+class ClaimsUser(TokenUser):
+    """User built from token claims, exposing the ids views filter by"""
+
+    @property
+    def team_id(self):
+        return self.token.get('team_id')
+
+
+class StatelessJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the token's claims instead of loading
+    the user row.
+
+    Tokens issued by ``FantasyRefreshToken`` carry the user and team ids,
+    so authenticating them costs no queries, only a cached revocation
+    check. Tokens without those claims fall back to the database lookup.
+    """
+
+    def get_user(self, validated_token):
+        if is_revoked(validated_token):
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+        if 'team_id' in validated_token:
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+    async def aauthenticate(self, request):
+        """
+        Authenticate a plain Django request from an async view.
+
+        Claims tokens are resolved without leaving the event loop; tokens
+        that need the user row load it in a worker thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+        if await ais_revoked(validated_token):
+            raise AuthenticationFailed(_('Token has been revoked'), code='token_revoked')
+        if 'team_id' in validated_token:
+            return ClaimsUser(validated_token), validated_token
+        user = await sync_to_async(super().get_user)(validated_token)
+        return user, validated_token
@@ -0,0 +1,47 @@
+import time
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from accounts.services import UserRegistrationService
+
+
+class Command(BaseCommand):
+    """Bulk-register users with teams and squads for load tests and migrations"""
+    help = 'Create N users, each with a team and a generated squad, in batched transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', type=int, help='Number of users to create')
+        parser.add_argument('--prefix', default='seed', help='Username prefix (default: seed)')
+        parser.add_argument('--start', type=int, default=0, help='First index used in generated usernames')
+        parser.add_argument('--password', default='SeedPass123', help='Password shared by all seeded users')
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.REGISTRATION_BATCH_SIZE,
+            help='Users committed per transaction'
+        )
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        start = options['start']
+        # Hashing is deliberately slow, so hash the shared password only once
+        password_hash = make_password(options['password'])
+
+        accounts = [
+            {
+                'username': f'{prefix}_{i}',
+                'email': f'{prefix}_{i}@example.com',
+                'password_hash': password_hash,
+                'team_name': f'{prefix.title()} Team {i}',
+            }
+            for i in range(start, start + options['count'])
+        ]
+
+        started = time.perf_counter()
+        created = UserRegistrationService.bulk_create_users_with_teams(
+            accounts, batch_size=options['batch_size']
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} users with teams in {elapsed:.2f}s '
+            f'({created / elapsed if elapsed else 0:.0f} users/s)'
+        ))
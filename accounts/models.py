@@ -1,10 +1,43 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils.functional import cached_property
+from .revocation import revoke_user_tokens
 
 
 class User(AbstractUser):
     """Custom User model"""
     email = models.EmailField(unique=True)
+    # Last login or token refresh, written in batches by accounts.activity
+    last_seen = models.DateTimeField(null=True, blank=True, db_index=True)
+
+    @cached_property
+    def team_id(self):
+        """Primary key of the user's team, matching the token claim"""
+        cached_team = self._state.fields_cache.get('team')
+        if cached_team is not None:
+            return cached_team.pk
+        team_model = self._meta.get_field('team').related_model
+        return team_model.objects.filter(user_id=self.pk).values_list('pk', flat=True).first()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_claims = user.token_claims()
+        return user
+
+    def token_claims(self):
+        """Fields copied into token claims, see ``accounts.tokens``"""
+        return self.__dict__.get('is_staff')
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Tokens are accepted without reading this row, so deactivating the
+        # account, or changing what its tokens claim, has to revoke them
+        # explicitly; refreshing would otherwise carry stale claims forward
+        loaded_claims = getattr(self, '_loaded_claims', None)
+        if not self.is_active or loaded_claims not in (None, self.token_claims()):
+            revoke_user_tokens(self.pk)
+        self._loaded_claims = self.token_claims()
 
     def __str__(self):
         return self.username
@@ -0,0 +1,60 @@
+"""
+Cached denylist for revoking stateless JWTs.
+
+Tokens are accepted without reading the user row, so revocation is kept in
+the cache: single tokens are denied by ``jti`` until they would have expired
+anyway, and all of a user's tokens by recording the time they were revoked
+and rejecting tokens issued before it. Both checks are one ``get_many``.
+"""
+import time
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework_simplejwt.settings import api_settings
+
+TOKEN_KEY = 'accounts:revoked:jti:{}'
+USER_KEY = 'accounts:revoked:user:{}'
+
+
+def get_cache():
+    return caches[settings.AUTH_REVOCATION_CACHE_ALIAS]
+
+
+def revoke_token(token):
+    """Deny a single access or refresh token until it expires"""
+    remaining = int(token['exp'] - time.time())
+    if remaining > 0:
+        get_cache().set(TOKEN_KEY.format(token[api_settings.JTI_CLAIM]), 1, remaining)
+
+
+def revoke_user_tokens(user_id):
+    """Deny every token issued to ``user_id`` up to now"""
+    # Kept as long as the longest lived token issued before now
+    lifetime = max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+    get_cache().set(USER_KEY.format(user_id), int(time.time()), int(lifetime.total_seconds()))
+
+
+def _keys(token):
+    return (
+        TOKEN_KEY.format(token.get(api_settings.JTI_CLAIM)),
+        USER_KEY.format(token.get(api_settings.USER_ID_CLAIM)),
+    )
+
+
+def _check(token, found):
+    token_key, user_key = _keys(token)
+    if token_key in found:
+        return True
+    revoked_before = found.get(user_key)
+    # ``iat`` has one second resolution, so tokens issued in the second of
+    # revocation are denied too
+    return revoked_before is not None and token.get('iat', 0) <= revoked_before
+
+
+def is_revoked(token):
+    """Whether ``token`` was revoked on its own or with all of its user's tokens"""
+    return _check(token, get_cache().get_many(list(_keys(token))))
+
+
+async def ais_revoked(token):
+    """Async variant of ``is_revoked``"""
+    return _check(token, await get_cache().aget_many(list(_keys(token))))
@@ -0,0 +1,15 @@
+"""
+Render ``values()`` rows in the shape of the account serializers.
+"""
+
+USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name')
+
+
+def user_values(prefix=''):
+    """``values()`` names needed to render the user at ``prefix``"""
+    return [f'{prefix}{name}' for name in USER_FIELDS]
+
+
+def render_user(row, prefix=''):
+    """Same output as ``UserSerializer``"""
+    return {name: row[f'{prefix}{name}'] for name in USER_FIELDS}
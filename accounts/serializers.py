@@ -1,8 +1,14 @@
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from core.instrumentation import TimedSerializerMixin
+from .activity import record_activity
 from .models import User
+from .revocation import is_revoked
 from .services import UserRegistrationService
+from .tokens import FantasyRefreshToken
 
 
 class UserRegistrationSerializer(serializers.ModelSerializer):
@@ -31,7 +37,8 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
             team_name=team_name
         )
         
-        refresh = RefreshToken.for_user(user)
+        refresh = FantasyRefreshToken.for_user(user)
+        record_activity(user.pk, login=True)
         user.tokens = {
             'refresh': str(refresh),
             'access': str(refresh.access_token),
@@ -40,8 +47,31 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
         return user
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for User model"""
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name')
+
+
+class FantasyTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Login serializer issuing tokens with the stateless auth claims"""
+    token_class = FantasyRefreshToken
+
+    def validate(self, attrs):
+        data = super().validate(attrs)
+        record_activity(self.user.pk, login=True)
+        return data
+
+
+class FantasyTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer that refuses revoked refresh tokens"""
+    token_class = FantasyRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_revoked(refresh):
+            raise InvalidToken('Token has been revoked')
+        data = super().validate(attrs)
+        record_activity(refresh[api_settings.USER_ID_CLAIM])
+        return data
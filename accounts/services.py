@@ -1,45 +1,120 @@
-from decimal import Decimal
 import random
 import string
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from accounts.models import User
 from teams.models import Team
-from players.models import Player
+from players.models import Player, PositionCount
 
 
 class UserRegistrationService:
     """Service for handling user registration with team creation"""
-    
+
     @staticmethod
-    def create_user_with_team(username, email, password, team_name):
-        """Create a user with a team and 20 players"""
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password
-        )
-        
-        team = Team.objects.create(
-            user=user,
-            name=team_name,
-            capital=Decimal('5000000.00')
-        )
-        
-        position_counts = {
-            'GK': 2,
-            'DF': 5,
-            'MF': 5,
-            'AT': 8,
-        }
-        
-        for position, count in position_counts.items():
+    def get_squad_template():
+        """Return the configured squad template as position -> count"""
+        return dict(settings.SQUAD_TEMPLATE)
+
+    @staticmethod
+    def get_squad_value(template):
+        """Total value of a freshly generated squad"""
+        return settings.INITIAL_PLAYER_VALUE * sum(template.values())
+
+    @staticmethod
+    def build_squad(team, template=None):
+        """Build unsaved Player instances for a new team"""
+        if template is None:
+            template = UserRegistrationService.get_squad_template()
+
+        players = []
+        for position, count in template.items():
             for i in range(count):
                 player_name = f"Player_{position}_{''.join(random.choices(string.ascii_uppercase + string.digits, k=6))}"
-                
-                Player.objects.create(
+                players.append(Player(
                     team=team,
                     name=player_name,
                     position=position,
-                    value=Decimal('1000000.00')
-                )
-        
+                    value=settings.INITIAL_PLAYER_VALUE
+                ))
+        return players
+
+    @staticmethod
+    def build_position_counts(team, template):
+        """Counters matching a squad built from ``template``"""
+        return [
+            PositionCount(team=team, position=position, count=count)
+            for position, count in template.items()
+        ]
+
+    @staticmethod
+    def create_user_with_team(username, email, password, team_name):
+        """Create a user with a team and a generated squad in one transaction"""
+        with transaction.atomic():
+            user = User.objects.create_user(
+                username=username,
+                email=email,
+                password=password
+            )
+
+            template = UserRegistrationService.get_squad_template()
+            # bulk_create skips Player.save(), so the team starts with the
+            # squad's value already set and its position counts are written
+            # alongside the players
+            team = Team.objects.create(
+                user=user,
+                name=team_name,
+                capital=settings.INITIAL_TEAM_CAPITAL,
+                total_team_value=UserRegistrationService.get_squad_value(template)
+            )
+
+            Player.objects.bulk_create(UserRegistrationService.build_squad(team, template))
+            PositionCount.objects.bulk_create(UserRegistrationService.build_position_counts(team, template))
+
         return user
+
+    @staticmethod
+    def bulk_create_users_with_teams(accounts, batch_size=None):
+        """
+        Create many users, teams and squads with batched INSERTs.
+
+        ``accounts`` is a sequence of dicts with ``username``, ``email``,
+        ``team_name`` and either ``password`` or a precomputed
+        ``password_hash``. Each chunk of ``batch_size`` accounts is committed
+        in its own transaction; returns the number of users created.
+        """
+        if batch_size is None:
+            batch_size = settings.REGISTRATION_BATCH_SIZE
+        template = UserRegistrationService.get_squad_template()
+        squad_value = UserRegistrationService.get_squad_value(template)
+
+        created = 0
+        for start in range(0, len(accounts), batch_size):
+            chunk = accounts[start:start + batch_size]
+            with transaction.atomic():
+                users = User.objects.bulk_create([
+                    User(
+                        username=account['username'],
+                        email=account['email'],
+                        password=account.get('password_hash') or make_password(account['password'])
+                    )
+                    for account in chunk
+                ])
+                teams = Team.objects.bulk_create([
+                    Team(
+                        user=user,
+                        name=account['team_name'],
+                        capital=settings.INITIAL_TEAM_CAPITAL,
+                        total_team_value=squad_value
+                    )
+                    for user, account in zip(users, chunk)
+                ])
+                players, counts = [], []
+                for team in teams:
+                    players.extend(UserRegistrationService.build_squad(team, template))
+                    counts.extend(UserRegistrationService.build_position_counts(team, template))
+                Player.objects.bulk_create(players, batch_size=batch_size)
+                PositionCount.objects.bulk_create(counts, batch_size=batch_size)
+            created += len(users)
+
+        return created
@@ -1,5 +1,7 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from io import StringIO
 from unittest.mock import patch, MagicMock
 from accounts.services import UserRegistrationService
 from accounts.models import User
@@ -74,6 +76,79 @@ class UserRegistrationServiceTests(TestCase):
             self.assertEqual(float(player.value), 1000000.00)
 
 
+    @override_settings(SQUAD_TEMPLATE={'GK': 1, 'DF': 2, 'MF': 2, 'AT': 1})
+    def test_create_user_with_team_uses_squad_template(self):
+        """Test that the configured squad template drives squad generation"""
+        user = UserRegistrationService.create_user_with_team(
+            username='testuser',
+            email='test@example.com',
+            password='Test123456',
+            team_name='Test Team'
+        )
+
+        players = Player.objects.filter(team__user=user)
+        self.assertEqual(players.count(), 6)
+        self.assertEqual(players.filter(position='GK').count(), 1)
+        self.assertEqual(players.filter(position='AT').count(), 1)
+
+    def test_create_user_with_team_is_atomic(self):
+        """Test that a failed squad insert rolls back the user and team"""
+        with patch('accounts.services.Player.objects.bulk_create', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                UserRegistrationService.create_user_with_team(
+                    username='testuser',
+                    email='test@example.com',
+                    password='Test123456',
+                    team_name='Test Team'
+                )
+
+        self.assertFalse(User.objects.filter(username='testuser').exists())
+        self.assertFalse(Team.objects.exists())
+
+    def test_create_user_with_team_uses_few_queries(self):
+        """Test that the squad and its position counts are inserted in single batches"""
+        with self.assertNumQueries(6):
+            UserRegistrationService.create_user_with_team(
+                username='testuser',
+                email='test@example.com',
+                password='Test123456',
+                team_name='Test Team'
+            )
+
+
+class BulkRegistrationTests(TestCase):
+    """Unit tests for bulk user registration"""
+
+    def test_bulk_create_users_with_teams(self):
+        """Test that every account gets a user, team and full squad"""
+        accounts = [
+            {
+                'username': f'bulk_{i}',
+                'email': f'bulk_{i}@example.com',
+                'password': 'Test123456',
+                'team_name': f'Bulk Team {i}'
+            }
+            for i in range(5)
+        ]
+
+        created = UserRegistrationService.bulk_create_users_with_teams(accounts, batch_size=2)
+
+        self.assertEqual(created, 5)
+        self.assertEqual(Team.objects.count(), 5)
+        self.assertEqual(Player.objects.count(), 100)
+        user = User.objects.get(username='bulk_3')
+        self.assertTrue(user.check_password('Test123456'))
+        self.assertEqual(user.team.players.count(), 20)
+
+    def test_seed_users_command(self):
+        """Test seeding users through the management command"""
+        call_command('seed_users', 3, '--prefix', 'load', '--batch-size', '2', stdout=StringIO())
+
+        self.assertEqual(User.objects.filter(username__startswith='load_').count(), 3)
+        self.assertEqual(Team.objects.count(), 3)
+        self.assertEqual(Player.objects.count(), 60)
+
+
 class UserSerializerTests(TestCase):
     """Unit tests for user serializers"""
     
@@ -162,3 +237,176 @@ class UserModelTests(TestCase):
                 password='Pass123'
             )
 
+
+
+class StatelessAuthenticationTests(TestCase):
+    """Tests for token-backed authentication and revocation"""
+    
+    def setUp(self):
+        from django.core.cache import cache
+        from rest_framework.test import APIClient
+        cache.clear()
+        self.user = UserRegistrationService.create_user_with_team(
+            username='tokenuser',
+            email='token@example.com',
+            password='Test123456',
+            team_name='Token Team'
+        )
+        self.team = Team.objects.get(user=self.user)
+        self.client = APIClient()
+    
+    def tearDown(self):
+        from django.core.cache import cache
+        from accounts.activity import tracker
+        # Revocations are keyed by user id, which later tests may reuse
+        cache.clear()
+        tracker.flush()
+    
+    def login(self):
+        response = self.client.post('/api/token/', {'username': 'tokenuser', 'password': 'Test123456'})
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+        return response.data
+    
+    def test_login_tokens_carry_team_claim(self):
+        """Test that login and registration tokens carry the team id"""
+        from rest_framework_simplejwt.tokens import AccessToken
+        tokens = self.login()
+        self.assertEqual(AccessToken(tokens['access'])['team_id'], self.team.pk)
+        
+        response = self.client.post('/api/auth/users/register/', {
+            'username': 'newuser',
+            'email': 'new@example.com',
+            'password': 'Test123456',
+            'password_confirm': 'Test123456',
+            'team_name': 'New Team'
+        })
+        new_team = Team.objects.get(user__username='newuser')
+        self.assertEqual(AccessToken(response.data['tokens']['access'])['team_id'], new_team.pk)
+    
+    def test_authentication_runs_no_queries(self):
+        """Test that a claims token is authenticated without reading the user"""
+        from django.test import RequestFactory
+        from accounts.authentication import ClaimsUser, StatelessJWTAuthentication
+        tokens = self.login()
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        
+        with self.assertNumQueries(0):
+            user, _ = StatelessJWTAuthentication().authenticate(request)
+        self.assertIsInstance(user, ClaimsUser)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.team_id, self.team.pk)
+    
+    def test_token_user_reaches_own_team(self):
+        """Test that id-only views work with the token user"""
+        self.login()
+        response = self.client.get('/api/teams/my-team/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['id'], self.team.pk)
+        
+        response = self.client.get('/api/auth/users/profile/')
+        self.assertEqual(response.data['email'], 'token@example.com')
+    
+    def test_logout_revokes_tokens(self):
+        """Test that revoked access and refresh tokens are rejected"""
+        tokens = self.login()
+        response = self.client.post('/api/auth/users/logout/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        
+        self.assertEqual(self.client.get('/api/teams/my-team/').status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+    
+    def test_deactivation_revokes_all_tokens(self):
+        """Test that deactivating the user revokes tokens issued before"""
+        self.login()
+        self.user.is_active = False
+        self.user.save()
+        
+        self.assertEqual(self.client.get('/api/teams/my-team/').status_code, 401)
+    
+    def test_demotion_revokes_staff_claims(self):
+        """Test that a demoted user cannot refresh into staff claims"""
+        User.objects.filter(pk=self.user.pk).update(is_staff=True)
+        tokens = self.login()
+        self.assertEqual(self.client.get('/api/transfer-listings/cache-stats/').status_code, 200)
+        
+        user = User.objects.get(pk=self.user.pk)
+        user.is_staff = False
+        user.save()
+        
+        self.assertEqual(self.client.get('/api/transfer-listings/cache-stats/').status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 401)
+    
+    def test_rename_keeps_tokens(self):
+        """Test that changing the username does not log the user out"""
+        self.login()
+        user = User.objects.get(pk=self.user.pk)
+        user.username = 'renamed'
+        user.save()
+        self.assertEqual(self.client.get('/api/teams/my-team/').status_code, 200)
+
+
+class LastSeenTrackerTests(TestCase):
+    """Tests for buffered last-login/last-seen tracking"""
+    
+    def setUp(self):
+        from accounts.activity import tracker
+        self.tracker = tracker
+        self.tracker.flush()
+        UserRegistrationService.create_user_with_team(
+            username='seenuser',
+            email='seen@example.com',
+            password='Test123456',
+            team_name='Seen Team'
+        )
+        self.user = User.objects.get(username='seenuser')
+    
+    def tearDown(self):
+        self.tracker.flush()
+    
+    @override_settings(LAST_SEEN_FLUSH_INTERVAL=3600)
+    def test_login_and_refresh_are_buffered_then_flushed(self):
+        """Test that token issuance writes nothing until the flush"""
+        from rest_framework.test import APIClient
+        client = APIClient()
+        
+        # The user and its team id are read, but nothing is written
+        with self.assertNumQueries(2):
+            response = client.post('/api/token/', {'username': 'seenuser', 'password': 'Test123456'})
+        self.assertEqual(response.status_code, 200)
+        with self.assertNumQueries(0):
+            client.post('/api/token/refresh/', {'refresh': response.data['refresh']})
+        self.user.refresh_from_db()
+        self.assertIsNone(self.user.last_login)
+        
+        with self.assertNumQueries(2):
+            self.tracker.flush()
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_login)
+        self.assertGreaterEqual(self.user.last_seen, self.user.last_login)
+    
+    @override_settings(LAST_SEEN_BATCH_SIZE=2, LAST_SEEN_FLUSH_INTERVAL=3600)
+    def test_full_batch_triggers_flush(self):
+        """Test that filling a batch flushes it with one UPDATE"""
+        self.tracker.record(self.user.pk)
+        with self.assertNumQueries(1):
+            self.tracker.record(self.user.pk + 1000)
+        self.assertEqual(self.tracker.pending(), 0)
+        self.user.refresh_from_db()
+        self.assertIsNotNone(self.user.last_seen)
+        self.assertIsNone(self.user.last_login)
+    
+    @override_settings(LAST_SEEN_FLUSH_INTERVAL=0.01)
+    def test_idle_buffer_is_flushed_in_background(self):
+        """Test that buffered activity is flushed without further requests"""
+        import threading
+        from accounts.activity import LastSeenTracker
+        tracker = LastSeenTracker()
+        self.addCleanup(tracker.stop)
+        flushed = threading.Event()
+        
+        with patch.object(tracker, 'flush', side_effect=flushed.set):
+            tracker.record(self.user.pk)
+            self.assertTrue(flushed.wait(5))
@@ -0,0 +1,19 @@
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class FantasyRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the claims the API needs to authenticate
+    without loading the user.
+
+    Claims are copied into every access token minted from it, and survive
+    refresh rotation, so they are only set here; ``User.save`` revokes the
+    user's tokens when a claimed field changes.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token['team_id'] = user.team_id
+        token['is_staff'] = user.is_staff
+        return token
@@ -1,8 +1,14 @@
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from teams.models import Team
 from .models import User
+from .revocation import revoke_token, revoke_user_tokens
 from .serializers import UserRegistrationSerializer, UserSerializer
+from .tokens import FantasyRefreshToken
 
 
 class UserViewSet(viewsets.ModelViewSet):
@@ -10,6 +16,10 @@ class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     
+    def get_current_user(self):
+        """Load the authenticated user's row, which token users do not carry"""
+        return User.objects.get(pk=self.request.user.pk)
+    
     def get_permissions(self):
         if self.action == 'register':
             return [permissions.AllowAny()]
@@ -30,14 +40,39 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='profile')
     def profile(self, request):
         """Get current user's profile"""
-        serializer = UserSerializer(request.user)
+        serializer = UserSerializer(self.get_current_user())
         return Response(serializer.data)
     
     @action(detail=False, methods=['patch'], url_path='profile')
     def update_profile(self, request):
         """Update current user's profile"""
-        serializer = UserSerializer(request.user, data=request.data, partial=True)
+        serializer = UserSerializer(self.get_current_user(), data=request.data, partial=True)
         if serializer.is_valid():
             serializer.save()
+            # The team representation embeds the profile, so mark it changed
+            Team.objects.filter(pk=request.user.team_id).update(updated_at=timezone.now())
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    
+    @action(detail=False, methods=['post'], url_path='logout')
+    def logout(self, request):
+        """Revoke the current access token, and optionally a refresh token or all tokens"""
+        if request.data.get('everywhere') in (True, 'true'):
+            revoke_user_tokens(request.user.pk)
+            return Response({'message': 'Logged out everywhere'}, status=status.HTTP_200_OK)
+        
+        refresh = request.data.get('refresh')
+        if refresh:
+            try:
+                refresh_token = FantasyRefreshToken(refresh)
+            except TokenError as exc:
+                return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+            if refresh_token.get(api_settings.USER_ID_CLAIM) != request.user.pk:
+                return Response(
+                    {'error': 'Refresh token does not belong to you'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            revoke_token(refresh_token)
+        if request.auth is not None:
+            revoke_token(request.auth)
+        return Response({'message': 'Logged out'}, status=status.HTTP_200_OK)
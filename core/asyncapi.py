@@ -0,0 +1,126 @@
+"""
+Helpers for the async read endpoints.
+
+DRF views are synchronous, so the hot polling endpoints also exist as plain
+Django async views. Served through ASGI they wait on the database without
+holding a worker thread. They authenticate with the stateless JWT claims,
+read ``values()`` rows with the async ORM and render them with the apps'
+``rows`` modules, in the same shape as the DRF serializers.
+"""
+import base64
+import functools
+from django.db.models import Q
+from django.http import HttpResponseNotModified, JsonResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions, status
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+from accounts.authentication import StatelessJWTAuthentication
+from .conditional import set_validators
+
+
+def _error(exc):
+    detail = exc.detail if isinstance(exc.detail, (dict, list)) else {'detail': exc.detail}
+    return JsonResponse(detail, status=exc.status_code)
+
+
+def async_api_view(view):
+    """
+    Turn ``view(request, user)`` into an authenticated async GET endpoint.
+
+    Authentication failures are answered like DRF's, with 401 and a
+    ``WWW-Authenticate`` header.
+    """
+    authentication = StatelessJWTAuthentication()
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return _error(exceptions.MethodNotAllowed(request.method))
+        try:
+            result = await authentication.aauthenticate(request)
+            if result is None:
+                raise exceptions.NotAuthenticated()
+            return await view(request, result[0], *args, **kwargs)
+        except (exceptions.NotAuthenticated, exceptions.AuthenticationFailed) as exc:
+            response = _error(exc)
+            response['WWW-Authenticate'] = authentication.authenticate_header(request)
+            return response
+        except exceptions.APIException as exc:
+            return _error(exc)
+
+    return wrapper
+
+
+def not_modified(etag=None, last_modified=None):
+    return set_validators(HttpResponseNotModified(), etag, last_modified)
+
+
+class KeysetPage:
+    """
+    Keyset pagination on ``(ordering, id)``, newest first by default.
+
+    The cursor is the position of the last row served, so each page is one
+    index range scan however deep the client pages. ``parse`` turns the
+    ordering value of a cursor back into a Python value.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+    def __init__(self, request, prefix='', ordering='-created_at', parse=parse_datetime):
+        self.request = request
+        self.descending = ordering.startswith('-')
+        self.field = f"{prefix}{ordering.lstrip('-')}"
+        self.id = f'{prefix}id'
+        self.parse = parse
+        self.page_size = self._page_size()
+        self.position = self._decode(request.GET.get(self.cursor_query_param))
+
+    def _page_size(self):
+        try:
+            page_size = int(self.request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return api_settings.PAGE_SIZE
+        return min(max(page_size, 1), self.max_page_size)
+
+    def _decode(self, cursor):
+        if not cursor:
+            return None
+        try:
+            value, pk = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+            value = self.parse(value)
+            if value is None:
+                raise ValueError(cursor)
+            return value, int(pk)
+        except (TypeError, ValueError, ArithmeticError, UnicodeDecodeError):
+            raise exceptions.NotFound('Invalid cursor')
+
+    def _encode(self, value, pk):
+        value = value.isoformat() if hasattr(value, 'isoformat') else str(value)
+        return base64.urlsafe_b64encode(f'{value}|{pk}'.encode()).decode()
+
+    def paginate(self, queryset):
+        """Order and slice ``queryset`` to this page, plus one row to detect the next"""
+        after = 'lt' if self.descending else 'gt'
+        if self.position is not None:
+            value, pk = self.position
+            queryset = queryset.filter(
+                Q(**{f'{self.field}__{after}': value})
+                | Q(**{self.field: value, f'{self.id}__{after}': pk})
+            )
+        sign = '-' if self.descending else ''
+        return queryset.order_by(f'{sign}{self.field}', f'{sign}{self.id}')[:self.page_size + 1]
+
+    def response(self, rows, render):
+        """Paginated response for ``rows`` fetched from ``paginate()``"""
+        next_link = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            last = rows[-1]
+            next_link = replace_query_param(
+                self.request.build_absolute_uri(),
+                self.cursor_query_param,
+                self._encode(last[self.field], last[self.id])
+            )
+        return JsonResponse({'next': next_link, 'results': [render(row) for row in rows]}, status=status.HTTP_200_OK)
@@ -0,0 +1,66 @@
+"""
+Helpers shared by the benchmark management commands.
+"""
+import json
+import math
+import statistics
+import urllib.error
+import urllib.request
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of ``values``; ``pct`` is between 0 and 100"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(math.ceil(pct / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize_latencies(latencies):
+    """Summary statistics, in milliseconds, of latencies given in seconds"""
+    millis = [latency * 1000 for latency in latencies]
+    return {
+        'count': len(millis),
+        'mean': statistics.fmean(millis) if millis else 0.0,
+        'p50': percentile(millis, 50),
+        'p95': percentile(millis, 95),
+        'p99': percentile(millis, 99),
+        'max': max(millis) if millis else 0.0,
+    }
+
+
+def format_latencies(summary):
+    """One-line rendering of ``summarize_latencies`` output"""
+    return (
+        f"n={summary['count']} mean={summary['mean']:.2f}ms p50={summary['p50']:.2f}ms "
+        f"p95={summary['p95']:.2f}ms p99={summary['p99']:.2f}ms max={summary['max']:.2f}ms"
+    )
+
+
+def obtain_access_token(base_url, username, password):
+    """Log in to a running server and return an access token"""
+    request = urllib.request.Request(
+        f'{base_url}/api/token/',
+        data=json.dumps({'username': username, 'password': password}).encode(),
+        headers={'Content-Type': 'application/json'},
+        method='POST'
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())['access']
+
+
+def http_request(url, access, method='GET', data=None, timeout=60):
+    """Send one authenticated JSON request and return its status code"""
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(data).encode() if data is not None else None,
+        headers={'Content-Type': 'application/json', 'Authorization': f'Bearer {access}'},
+        method=method
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
@@ -0,0 +1,51 @@
+"""
+Conditional GET helpers: entity tags, Last-Modified and 304 responses.
+"""
+import hashlib
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts, weak=False):
+    """Quoted entity tag derived from ``parts``"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(request, etag=None, last_modified=None):
+    """
+    Whether the client's cached copy is still current.
+
+    If-None-Match is compared weakly and takes precedence over
+    If-Modified-Since, as RFC 9110 requires.
+    """
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag:
+        client_etags = parse_etags(if_none_match)
+        if '*' in client_etags:
+            return True
+        return _strip_weak(etag) in {_strip_weak(client_etag) for client_etag in client_etags}
+
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def set_validators(response, etag=None, last_modified=None):
+    """Attach ETag and Last-Modified headers to ``response``"""
+    if etag:
+        response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def not_modified_response(etag=None, last_modified=None):
+    """Empty 304 response carrying the current validators"""
+    return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
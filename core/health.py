@@ -0,0 +1,13 @@
+"""
+Liveness endpoint for container healthchecks.
+
+Answers without authentication or database access. Containers run the
+migrations before starting the server, so a response also means the schema
+is up to date, which the worker services wait for.
+"""
+from django.http import HttpResponse
+
+
+def health_view(request):
+    """Plain 200 once the server is accepting requests"""
+    return HttpResponse('ok', content_type='text/plain')
@@ -0,0 +1,178 @@
+"""
+Per-request cost accounting.
+
+``PerformanceMiddleware`` measures each request's wall time, database
+queries and time, serializer time and response size. It reports them in a
+``Server-Timing`` header, aggregates them into the Prometheus histograms of
+``core.metrics`` and, when ``PERFORMANCE_SLOW_REQUEST_MS`` is set, logs
+requests slower than that together with the SQL they ran.
+
+The running request's counters live in a context variable. Queries are
+counted by an execute wrapper installed on every database connection, which
+reads that variable, so queries issued through the async ORM's worker
+threads are attributed to the request that awaited them.
+"""
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from . import metrics
+
+logger = logging.getLogger('core.performance')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Counters of one request"""
+
+    def __init__(self, capture_sql=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializing = False
+        self.sql = [] if capture_sql else None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+
+def record_queries(execute, sql, params, many, context):
+    """Execute wrapper adding each query's time to the current request"""
+    request_metrics = _current.get()
+    if request_metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        request_metrics.queries += 1
+        request_metrics.db_time += duration
+        if request_metrics.sql is not None:
+            request_metrics.sql.append((duration, sql))
+
+
+def install_query_recorder(connection):
+    if record_queries not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_queries)
+
+
+@receiver(connection_created)
+def _connection_created(sender, connection, **kwargs):
+    install_query_recorder(connection)
+
+
+@contextmanager
+def timed_serialization():
+    """
+    Add the enclosed time to the request's serializer time.
+
+    Nested use, such as a serializer rendering nested serializers, is only
+    counted once.
+    """
+    request_metrics = _current.get()
+    if request_metrics is None or request_metrics.serializing:
+        yield
+        return
+    request_metrics.serializing = True
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        request_metrics.serializer_time += time.perf_counter() - started
+        request_metrics.serializing = False
+
+
+class TimedSerializerMixin:
+    """Serializer mixin counting ``to_representation`` as serializer time"""
+
+    def to_representation(self, instance):
+        with timed_serialization():
+            return super().to_representation(instance)
+
+
+class PerformanceMiddleware:
+    """Measures every request; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        # Connections opened before this module was imported never
+        # signalled connection_created
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+        request_metrics = self._start()
+        token = _current.set(request_metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, request_metrics)
+
+    async def __acall__(self, request):
+        request_metrics = self._start()
+        token = _current.set(request_metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, request_metrics)
+
+    def _start(self):
+        return RequestMetrics(capture_sql=bool(settings.PERFORMANCE_SLOW_REQUEST_MS))
+
+    def _finish(self, request, response, request_metrics):
+        duration = request_metrics.elapsed()
+        match = request.resolver_match
+        view = match.view_name if match else 'unmatched'
+
+        size = None
+        if not response.streaming:
+            size = len(response.content)
+
+        metrics.observe_request(
+            view=view,
+            method=request.method,
+            status=response.status_code,
+            duration=duration,
+            queries=request_metrics.queries,
+            db_time=request_metrics.db_time,
+            serializer_time=request_metrics.serializer_time,
+            size=size,
+        )
+
+        if settings.PERFORMANCE_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'app;dur={duration * 1000:.1f}, '
+                f'db;dur={request_metrics.db_time * 1000:.1f};desc="{request_metrics.queries} queries", '
+                f'serializer;dur={request_metrics.serializer_time * 1000:.1f}'
+            )
+
+        slow_ms = settings.PERFORMANCE_SLOW_REQUEST_MS
+        if slow_ms and duration * 1000 >= slow_ms:
+            self._log_slow_request(request, view, duration, request_metrics)
+        return response
+
+    def _log_slow_request(self, request, view, duration, request_metrics):
+        lines = [
+            f'Slow request {request.method} {request.get_full_path()} ({view}): {duration * 1000:.1f}ms, '
+            f'{request_metrics.queries} queries in {request_metrics.db_time * 1000:.1f}ms, '
+            f'serializer {request_metrics.serializer_time * 1000:.1f}ms'
+        ]
+        for query_time, sql in request_metrics.sql:
+            lines.append(f'  {query_time * 1000:8.2f}ms  {sql}')
+        logger.warning('\n'.join(lines))
@@ -0,0 +1,235 @@
+import json
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from accounts.tokens import FantasyRefreshToken
+from core.benchmarks import http_request, obtain_access_token, summarize_latencies
+from accounts.models import User
+from players.models import PositionCount
+from players.squads import SquadRules
+from teams.models import Team
+from transactions.models import Transaction
+from transfers.models import TransferListing
+
+
+class Endpoint:
+    """One request the harness times"""
+
+    def __init__(self, name, method, path, data=None, limit=None):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.data = data
+        # Most requests the endpoint can serve, warmup included
+        self.limit = limit
+
+
+class Command(BaseCommand):
+    """Drive every API endpoint and report throughput, latency and queries per request"""
+    help = (
+        'Benchmark the API endpoints in core/urls.py, in-process through the test client '
+        '(default, also counts SQL queries) or against a running server with --url. '
+        'Run generate_dataset first. --max-queries and --max-p99 turn the run into a '
+        'regression gate that fails when a budget is exceeded.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed requests per endpoint')
+        parser.add_argument('--username', help='Acting user (default: first generated dataset user)')
+        parser.add_argument('--password', default='DataPass123', help="Acting user's password")
+        parser.add_argument('--url', help='Base URL of a running server, e.g. http://localhost:8000')
+        parser.add_argument('--concurrency', type=int, default=1,
+                            help='Parallel clients with --url; req/s is then measured over wall time')
+        parser.add_argument('--only', help='Only run endpoints whose name contains this text')
+        parser.add_argument('--include-writes', action='store_true', help='Also time register and buy')
+        parser.add_argument('--max-queries', type=float, help='Fail if an endpoint averages more queries')
+        parser.add_argument('--max-p99', type=float, help='Fail if an endpoint p99 exceeds this many ms')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username'])
+        endpoints = self.build_endpoints(user, options)
+        if options['only']:
+            endpoints = [endpoint for endpoint in endpoints if options['only'] in endpoint.name]
+
+        concurrency = options['concurrency']
+        if options['url']:
+            send = self.live_sender(options['url'].rstrip('/'), user.username, options['password'])
+        elif concurrency > 1:
+            raise CommandError('--concurrency requires --url')
+        else:
+            send = self.client_sender(user)
+
+        self.stdout.write(
+            f"{'endpoint':<34} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'errors':>7}"
+        )
+        failures = []
+        for endpoint in endpoints:
+            data = endpoint.data
+            warmup, requests = options['warmup'], options['requests']
+            if endpoint.limit is not None and warmup + requests > endpoint.limit:
+                warmup = min(warmup, endpoint.limit // 2)
+                requests = endpoint.limit - warmup
+                self.stdout.write(f'{endpoint.name}: only {endpoint.limit} requests possible, timing {requests}')
+            for _ in range(warmup):
+                send(endpoint, data() if callable(data) else data)
+
+            def timed(payload):
+                started = time.perf_counter()
+                status_code, query_count = send(endpoint, payload)
+                return time.perf_counter() - started, status_code, query_count
+
+            payloads = [data() if callable(data) else data for _ in range(requests)]
+            wall_started = time.perf_counter()
+            if concurrency > 1:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    results = list(executor.map(timed, payloads))
+            else:
+                results = [timed(payload) for payload in payloads]
+            wall_time = time.perf_counter() - wall_started
+
+            latencies = [latency for latency, _, _ in results]
+            queries = [query_count for _, _, query_count in results if query_count is not None]
+            errors = sum(1 for _, status_code, _ in results if status_code >= 400)
+
+            summary = summarize_latencies(latencies)
+            mean_queries = statistics.fmean(queries) if queries else None
+            throughput = len(latencies) / wall_time if wall_time else 0
+            self.stdout.write(
+                f"{endpoint.name:<34} {throughput:>8.0f} {summary['p50']:>8.2f} {summary['p95']:>8.2f} "
+                f"{summary['p99']:>8.2f} {'n/a' if mean_queries is None else f'{mean_queries:.1f}':>8} {errors:>7}"
+            )
+
+            if options['max_queries'] is not None and mean_queries is not None and mean_queries > options['max_queries']:
+                failures.append(f'{endpoint.name}: {mean_queries:.1f} queries per request')
+            if options['max_p99'] is not None and summary['p99'] > options['max_p99']:
+                failures.append(f"{endpoint.name}: p99 {summary['p99']:.2f}ms")
+
+        if failures:
+            raise CommandError('Budget exceeded:\n  ' + '\n  '.join(failures))
+
+    def get_user(self, username):
+        users = User.objects.filter(team__isnull=False)
+        user = users.filter(username=username).first() if username else (
+            users.filter(username__startswith='data_').order_by('pk').first() or users.order_by('pk').first()
+        )
+        if user is None:
+            raise CommandError('No user with a team found; run generate_dataset first')
+        return user
+
+    def build_endpoints(self, user, options):
+        team = user.team
+        player = team.players.first()
+        other_listing = TransferListing.objects.filter(is_active=True).exclude(player__team=team).first()
+        transaction = Transaction.objects.filter(is_active=True).first()
+        refresh = FantasyRefreshToken.for_user(user)
+
+        endpoints = [
+            Endpoint('token obtain', 'POST', '/api/token/', {'username': user.username, 'password': options['password']}),
+            Endpoint('token refresh', 'POST', '/api/token/refresh/', {'refresh': str(refresh)}),
+            Endpoint('token verify', 'POST', '/api/token/verify/', {'token': str(refresh.access_token)}),
+            Endpoint('users list', 'GET', '/api/auth/users/'),
+            Endpoint('users profile', 'GET', '/api/auth/users/profile/'),
+            Endpoint('teams list', 'GET', '/api/teams/'),
+            Endpoint('teams detail', 'GET', f'/api/teams/{team.pk}/'),
+            Endpoint('teams my-team', 'GET', '/api/teams/my-team/'),
+            Endpoint('players list', 'GET', '/api/players/'),
+            Endpoint('players my-players', 'GET', '/api/players/my-players/'),
+            Endpoint('transfer-listings list', 'GET', '/api/transfer-listings/'),
+            Endpoint('transfer-listings search', 'GET', '/api/transfer-listings/?position=AT&ordering=asking_price'),
+            Endpoint('transfer-listings mine', 'GET', '/api/transfer-listings/?my_listings=true'),
+            Endpoint('transactions list', 'GET', '/api/transactions/'),
+            Endpoint('transactions mine', 'GET', '/api/transactions/?my_transactions=true'),
+        ]
+        if player:
+            endpoints.append(Endpoint('players detail', 'GET', f'/api/players/{player.pk}/'))
+        if other_listing:
+            endpoints.append(Endpoint('transfer-listings detail', 'GET', f'/api/transfer-listings/{other_listing.pk}/'))
+        if transaction:
+            endpoints.append(Endpoint('transactions detail', 'GET', f'/api/transactions/{transaction.pk}/'))
+
+        if options['include_writes']:
+            counter = iter(range(10 ** 9))
+            stamp = int(time.time())
+
+            def registration():
+                i = next(counter)
+                return {
+                    'username': f'bench_api_{stamp}_{i}',
+                    'email': f'bench_api_{stamp}_{i}@example.com',
+                    'password': 'BenchPass123',
+                    'password_confirm': 'BenchPass123',
+                    'team_name': f'Bench API {i}',
+                }
+
+            endpoints.append(Endpoint('users register', 'POST', '/api/auth/users/register/', registration))
+            listing_ids = self.buyable_listings(team, options['warmup'] + options['requests'])
+            if listing_ids:
+                listings = iter(listing_ids)
+                endpoints.append(Endpoint(
+                    'transfer-listings buy', 'POST', lambda: f'/api/transfer-listings/{next(listings)}/buy/',
+                    limit=len(listing_ids)
+                ))
+            else:
+                self.stdout.write('Skipping transfer-listings buy: no listing fits the squad rules of the acting team')
+        return endpoints
+
+    def buyable_listings(self, team, count):
+        """
+        Up to ``count`` fixed-price listings the acting team may buy in turn
+        under the squad rules, crediting the team the capital they need so
+        purchases are not refused.
+        """
+        rules = SquadRules()
+        counts = PositionCount.objects.for_teams([team.pk])
+        chosen, cost, last_pk = [], 0, 0
+        while len(chosen) < count:
+            rows = list(
+                TransferListing.objects.filter(is_active=True, mode=TransferListing.FIXED_PRICE, pk__gt=last_pk)
+                .exclude(player__team=team)
+                .order_by('pk')
+                .values_list('pk', 'player__team_id', 'player__position', 'asking_price')[:500]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            counts.update(PositionCount.objects.for_teams({seller_id for _, seller_id, _, _ in rows}))
+            for pk, seller_id, position, price in rows:
+                if len(chosen) == count:
+                    break
+                if rules.transfer_violation(counts, team.pk, seller_id, position):
+                    continue
+                rules.apply(counts, team.pk, seller_id, position)
+                chosen.append(pk)
+                cost += price
+        if cost:
+            Team.objects.filter(pk=team.pk).update(capital=F('capital') + cost)
+        return chosen
+
+    def client_sender(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {FantasyRefreshToken.for_user(user).access_token}')
+
+        def send(endpoint, data):
+            path = endpoint.path() if callable(endpoint.path) else endpoint.path
+            with CaptureQueriesContext(connection) as queries:
+                response = client.generic(
+                    endpoint.method, path,
+                    json.dumps(data) if data is not None else '',
+                    content_type='application/json'
+                )
+            return response.status_code, len(queries)
+        return send
+
+    def live_sender(self, base_url, username, password):
+        access = obtain_access_token(base_url, username, password)
+
+        def send(endpoint, data):
+            path = endpoint.path() if callable(endpoint.path) else endpoint.path
+            return http_request(f'{base_url}{path}', access, endpoint.method, data), None
+        return send
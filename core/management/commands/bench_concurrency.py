@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from core.benchmarks import http_request, obtain_access_token, summarize_latencies
+
+# Each hot read path as (sync DRF path, async path)
+ENDPOINTS = {
+    'my-team': ('/api/teams/my-team/', '/api/async/teams/my-team/'),
+    'my-players': ('/api/players/my-players/', '/api/async/players/my-players/'),
+    'market': ('/api/transfer-listings/?page_size=50', '/api/async/transfer-listings/?page_size=50'),
+    'transactions': (
+        '/api/transactions/?my_transactions=true&page_size=50',
+        '/api/async/transactions/?my_transactions=true&page_size=50'
+    ),
+}
+
+
+class Command(BaseCommand):
+    """Compare how sync and async serving hold up as concurrent clients grow"""
+    help = (
+        'Ramp up concurrent polling clients against the sync DRF endpoints and their '
+        'async variants and report throughput and latency at each level. Point --sync-url '
+        'at a gunicorn (WSGI) server and --async-url at a uvicorn (ASGI) one, both started '
+        'with the same worker count. The concurrency limit is the highest level whose p99 '
+        'stays under --p99-limit without errors.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sync-url', required=True, help='Base URL of the WSGI server')
+        parser.add_argument('--async-url', required=True, help='Base URL of the ASGI server')
+        parser.add_argument('--username', default='data_0', help='Acting user')
+        parser.add_argument('--password', default='DataPass123', help="Acting user's password")
+        parser.add_argument('--levels', default='1,8,32,64,128', help='Comma-separated client counts')
+        parser.add_argument('--requests', type=int, default=20, help='Requests per client at each level')
+        parser.add_argument('--endpoint', choices=sorted(ENDPOINTS), action='append',
+                            help='Endpoint to test; repeat for several (default: all)')
+        parser.add_argument('--p99-limit', type=float, default=500.0, help='Latency budget in ms')
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options['levels'].split(',')]
+        except ValueError:
+            raise CommandError('--levels must be comma-separated integers')
+
+        servers = {
+            'sync': (options['sync_url'].rstrip('/'), 0),
+            'async': (options['async_url'].rstrip('/'), 1),
+        }
+        tokens = {
+            mode: obtain_access_token(base_url, options['username'], options['password'])
+            for mode, (base_url, _) in servers.items()
+        }
+
+        self.stdout.write(
+            f"{'endpoint':<14} {'mode':<6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7}"
+        )
+        limits = {}
+        for name in options['endpoint'] or sorted(ENDPOINTS):
+            for mode, (base_url, index) in servers.items():
+                url = f'{base_url}{ENDPOINTS[name][index]}'
+                limit = 0
+                for clients in levels:
+                    summary, throughput, errors = self.run_level(url, tokens[mode], clients, options['requests'])
+                    self.stdout.write(
+                        f"{name:<14} {mode:<6} {clients:>7} {throughput:>8.0f} {summary['p50']:>8.2f} "
+                        f"{summary['p99']:>9.2f} {errors:>7}"
+                    )
+                    if errors or summary['p99'] > options['p99_limit']:
+                        break
+                    limit = clients
+                limits[(name, mode)] = limit
+
+        self.stdout.write(f"\nHighest client count within p99 {options['p99_limit']:.0f}ms and no errors:")
+        for name in options['endpoint'] or sorted(ENDPOINTS):
+            self.stdout.write(f"  {name:<14} sync {limits[(name, 'sync')]:>5}   async {limits[(name, 'async')]:>5}")
+
+    def run_level(self, url, access, clients, requests_per_client):
+        def client(_):
+            results = []
+            for _ in range(requests_per_client):
+                started = time.perf_counter()
+                try:
+                    status_code = http_request(url, access)
+                except OSError:
+                    status_code = 599
+                results.append((time.perf_counter() - started, status_code))
+            return results
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            results = [result for batch in executor.map(client, range(clients)) for result in batch]
+        wall_time = time.perf_counter() - started
+
+        latencies = [latency for latency, _ in results]
+        errors = sum(1 for _, status_code in results if status_code >= 400)
+        return summarize_latencies(latencies), len(results) / wall_time, errors
@@ -0,0 +1,94 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+from core.querysets import optimize_queryset
+from core.renderers import CompactJSONRenderer
+from players.models import Player
+from players.rows import player_values, render_player
+from players.serializers import PlayerSerializer
+from teams.models import Team
+from teams.rows import TEAM_VALUES, render_teams
+from teams.serializers import TeamSerializer
+from transactions.models import Transaction
+from transactions.rows import render_transaction, transaction_values
+from transactions.serializers import TransactionSerializer
+from transfers.models import TransferListing
+from transfers.rows import LISTING_VALUES, render_listing
+from transfers.serializers import TransferListingSerializer
+
+# name -> (queryset, serializer, values() columns, renderer of a list of rows)
+SUBJECTS = {
+    'players': (
+        lambda: Player.objects.order_by('pk'), PlayerSerializer,
+        player_values(), lambda rows: [render_player(row) for row in rows]
+    ),
+    'teams': (
+        lambda: Team.objects.order_by('pk'), TeamSerializer,
+        TEAM_VALUES, render_teams
+    ),
+    'transfer-listings': (
+        lambda: TransferListing.objects.filter(is_active=True).order_by('-created_at', '-id'),
+        TransferListingSerializer, LISTING_VALUES, lambda rows: [render_listing(row) for row in rows]
+    ),
+    'transactions': (
+        lambda: Transaction.objects.filter(is_active=True).order_by('-created_at', '-id'),
+        TransactionSerializer, transaction_values(), lambda rows: [render_transaction(row) for row in rows]
+    ),
+}
+
+
+class Command(BaseCommand):
+    """Compare rows/sec of the DRF serializers and the compact values() path"""
+    help = (
+        'Render a page of each list endpoint both through its ModelSerializer and JSONRenderer '
+        'and through values() rows and CompactJSONRenderer, and report rows per second. '
+        'Times include the queries, as each path issues its own; the best of --repeat runs '
+        'is reported. Run generate_dataset first.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500, help='Rows per page')
+        parser.add_argument('--repeat', type=int, default=5, help='Runs per path; the fastest counts')
+        parser.add_argument('--only', choices=sorted(SUBJECTS), help='Benchmark a single endpoint')
+
+    def handle(self, *args, **options):
+        names = [options['only']] if options['only'] else list(SUBJECTS)
+        rows, repeat = options['rows'], options['repeat']
+        if rows < 1 or repeat < 1:
+            raise CommandError('--rows and --repeat must be positive')
+
+        self.stdout.write(f"{'endpoint':<18} {'rows':>6} {'serializer rows/s':>18} {'compact rows/s':>15} {'speedup':>8}")
+        for name in names:
+            queryset, serializer_class, values, render = SUBJECTS[name]
+
+            def serializer_path():
+                instances = list(optimize_queryset(queryset(), serializer_class)[:rows])
+                JSONRenderer().render(serializer_class(instances, many=True).data)
+                return len(instances)
+
+            def compact_path():
+                page = list(queryset().values(*values)[:rows])
+                CompactJSONRenderer().render(render(page))
+                return len(page)
+
+            serializer_rate = self.best_rate(serializer_path, repeat)
+            compact_rate = self.best_rate(compact_path, repeat)
+            if serializer_rate is None:
+                self.stdout.write(f'{name:<18} no rows')
+                continue
+            self.stdout.write(
+                f'{name:<18} {rows:>6} {serializer_rate:>18,.0f} {compact_rate:>15,.0f} '
+                f'{compact_rate / serializer_rate:>7.1f}x'
+            )
+
+    def best_rate(self, path, repeat):
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            count = path()
+            elapsed = time.perf_counter() - started
+            if not count:
+                return None
+            rate = count / elapsed
+            best = rate if best is None else max(best, rate)
+        return best
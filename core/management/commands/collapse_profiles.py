@@ -0,0 +1,57 @@
+import collections
+import re
+from django.core.management.base import BaseCommand, CommandError
+from core.profiling import ProfileStore
+
+
+class Command(BaseCommand):
+    """Merge stored request profiles into a collapsed-stack file"""
+    help = (
+        'Aggregate the profiles in PROFILING_DIR into the collapsed-stack format, one '
+        '"frame;frame;... count" line per stack, for flamegraph.pl, speedscope or inferno. '
+        'Counts are samples of PROFILING_INTERVAL_MS each.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', help='Profile directory (default: PROFILING_DIR)')
+        parser.add_argument('--view', help='Only profiles whose view name matches this regex')
+        parser.add_argument('--path', help='Only profiles whose request path matches this regex')
+        parser.add_argument('--min-duration', type=float, default=0, help='Only requests slower than this, in ms')
+        parser.add_argument('--by-view', action='store_true', help='Root each stack at its view name')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            view = re.compile(options['view']) if options['view'] else None
+            path = re.compile(options['path']) if options['path'] else None
+        except re.error as exc:
+            raise CommandError(f'Invalid pattern: {exc}')
+
+        store = ProfileStore(directory=options['dir'])
+        stacks = collections.Counter()
+        profiles = 0
+        for profile_path in store.paths():
+            try:
+                profile = store.load(profile_path)
+            except (OSError, ValueError):
+                # Evicted or still being written
+                continue
+            if view and not view.search(profile['view']):
+                continue
+            if path and not path.search(profile['path']):
+                continue
+            if profile['duration_ms'] < options['min_duration']:
+                continue
+            profiles += 1
+            for stack, count in profile['stacks'].items():
+                if options['by_view']:
+                    stack = f"{profile['view']};{stack}"
+                stacks[stack] += count
+
+        lines = ''.join(f'{stack} {count}\n' for stack, count in sorted(stacks.items()))
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(lines)
+        else:
+            self.stdout.write(lines, ending='')
+        self.stderr.write(f'Collapsed {profiles} profiles, {sum(stacks.values())} samples')
@@ -0,0 +1,134 @@
+import random
+import time
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from accounts.models import User
+from accounts.services import UserRegistrationService
+from players.models import Player
+from transactions.models import LedgerEntry, Transaction
+from transfers.cache import invalidate_market
+from transfers.models import TransferListing
+
+SCALES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+
+def parse_scale(value):
+    """Accept a named scale (10k, 100k, 1m) or a plain number of users"""
+    if value.lower() in SCALES:
+        return SCALES[value.lower()]
+    try:
+        return int(value)
+    except ValueError:
+        raise CommandError(f"Unknown scale '{value}'; use one of {', '.join(SCALES)} or a number")
+
+
+class Command(BaseCommand):
+    """Generate a realistic dataset for benchmarking"""
+    help = (
+        'Bulk-insert users with teams and squads, then transfer listings and a transaction '
+        'history between them. Transactions are historical records only; capital and '
+        'ownership are left as generated.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('scale', help='Number of users: 10k, 100k, 1m or an integer')
+        parser.add_argument('--prefix', default='data', help='Username prefix (default: data)')
+        parser.add_argument('--password', default='DataPass123', help='Password of every generated user')
+        parser.add_argument('--listed-fraction', type=float, default=0.02, help='Fraction of players listed for sale')
+        parser.add_argument('--transactions-per-user', type=float, default=2.0, help='Average transactions per user')
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Rows per INSERT batch')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        users = parse_scale(options['scale'])
+        batch_size = options['batch_size']
+        rng = random.Random(options['seed'])
+        started = time.perf_counter()
+
+        # The scale is a target: rerunning tops up a partial dataset instead
+        # of adding another full one
+        generated = User.objects.filter(username__startswith=f"{options['prefix']}_")
+        offset = generated.count()
+        last_user_id = generated.order_by('-pk').values_list('pk', flat=True).first() or 0
+        self.generate_users(options['prefix'], offset, max(0, users - offset), options['password'], batch_size)
+        user_ids = list(generated.values_list('pk', flat=True))
+        self.generate_listings(rng, options['prefix'], last_user_id, options['listed_fraction'], batch_size)
+        existing = Transaction.objects.filter(buyer__username__startswith=f"{options['prefix']}_").count()
+        self.generate_transactions(
+            rng, user_ids, int(users * options['transactions_per_user']) - existing, batch_size
+        )
+
+        self.stdout.write(self.style.SUCCESS(f'Dataset ready in {time.perf_counter() - started:.1f}s'))
+
+    def generate_users(self, prefix, offset, count, password, batch_size):
+        password_hash = make_password(password)
+        started = time.perf_counter()
+        for start in range(offset, offset + count, batch_size):
+            stop = min(start + batch_size, offset + count)
+            UserRegistrationService.bulk_create_users_with_teams([
+                {
+                    'username': f'{prefix}_{i}',
+                    'email': f'{prefix}_{i}@example.com',
+                    'password_hash': password_hash,
+                    'team_name': f'{prefix.title()} Team {i}',
+                }
+                for i in range(start, stop)
+            ], batch_size=batch_size)
+            self.stdout.write(f'Users: {stop - offset}/{count}', ending='\r')
+        self.stdout.write(f'Users: {count} in {time.perf_counter() - started:.1f}s')
+
+    def generate_listings(self, rng, prefix, after_user_id, fraction, batch_size):
+        """List a fraction of the players of users created by this run"""
+        started = time.perf_counter()
+        players = (
+            Player.objects.filter(
+                team__user__username__startswith=f'{prefix}_', team__user_id__gt=after_user_id,
+                transfer_listing__isnull=True
+            )
+            .values_list('pk', 'value')
+            .iterator(chunk_size=batch_size)
+        )
+        created = 0
+        listings = []
+        for player_id, value in players:
+            if rng.random() >= fraction:
+                continue
+            markup = Decimal(str(round(rng.uniform(0.9, 1.6), 2)))
+            listings.append(TransferListing(
+                player_id=player_id,
+                asking_price=(value * markup).quantize(Decimal('0.01'))
+            ))
+            if len(listings) >= batch_size:
+                created += len(TransferListing.objects.bulk_create(listings))
+                listings = []
+        created += len(TransferListing.objects.bulk_create(listings))
+        # bulk_create bypasses TransferListing.save()
+        invalidate_market()
+        self.stdout.write(f'Listings: {created} in {time.perf_counter() - started:.1f}s')
+
+    def generate_transactions(self, rng, user_ids, count, batch_size):
+        if count <= 0 or len(user_ids) < 2:
+            return
+        started = time.perf_counter()
+        player_ids = list(
+            Player.objects.filter(team__user_id__in=rng.sample(user_ids, min(len(user_ids), 10_000)))
+            .values_list('pk', flat=True)
+        )
+        for start in range(0, count, batch_size):
+            transactions = []
+            for _ in range(min(batch_size, count - start)):
+                buyer_id, seller_id = rng.sample(user_ids, 2)
+                transactions.append(Transaction(
+                    buyer_id=buyer_id,
+                    seller_id=seller_id,
+                    player_id=rng.choice(player_ids),
+                    transfer_amount=Decimal(rng.randrange(500_000, 5_000_000)),
+                    is_active=True
+                ))
+            with db_transaction.atomic():
+                Transaction.objects.bulk_create(transactions)
+                LedgerEntry.objects.bulk_create(LedgerEntry.entries_for(transactions))
+            self.stdout.write(f'Transactions: {start + len(transactions)}/{count}', ending='\r')
+        self.stdout.write(f'Transactions: {count} in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,173 @@
+"""
+In-process request metrics in the Prometheus text exposition format.
+
+Each server process keeps its own counters; a scrape of ``/metrics`` shows
+the process that answered it, identified by the ``pid`` label, so run one
+worker or scrape each one when exact totals matter.
+"""
+import bisect
+import os
+import secrets
+import threading
+from django.conf import settings
+from django.http import Http404, HttpResponse, HttpResponseForbidden
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+_lock = threading.Lock()
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+class Counter:
+    """Monotonic count per label combination"""
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = {}
+
+    def inc(self, labels, amount=1):
+        with _lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with _lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.labelnames, labels)} {value}'
+
+
+class Histogram:
+    """Bucketed observations per label combination"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (last is +Inf), sum]
+        self._values = {}
+
+    def observe(self, labels, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with _lock:
+            state = self._values.get(labels)
+            if state is None:
+                state = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def samples(self):
+        with _lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = bound if isinstance(bound, str) else repr(float(bound))
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, [('le', le)])} {cumulative}"
+            yield f'{self.name}_sum{_labels(self.labelnames, labels)} {total}'
+            yield f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}'
+
+
+REQUESTS = Counter(
+    'http_requests_total', 'Requests by view, method and status.', ('view', 'method', 'status')
+)
+DURATION = Histogram(
+    'http_request_duration_seconds', 'Wall time spent in the application per request.', ('view', 'method'),
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+)
+QUERIES = Histogram(
+    'http_request_db_queries', 'Database queries per request.', ('view', 'method'),
+    (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+DB_DURATION = Histogram(
+    'http_request_db_duration_seconds', 'Time spent in database queries per request.', ('view', 'method'),
+    (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+SERIALIZER_DURATION = Histogram(
+    'http_request_serializer_duration_seconds', 'Time spent in serializers per request.', ('view', 'method'),
+    (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes', 'Response body size, for non-streaming responses.', ('view', 'method'),
+    (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+METRICS = (REQUESTS, DURATION, QUERIES, DB_DURATION, SERIALIZER_DURATION, RESPONSE_SIZE)
+
+
+def observe_request(view, method, status, duration, queries, db_time, serializer_time, size=None):
+    labels = (view, method)
+    REQUESTS.inc((view, method, str(status)))
+    DURATION.observe(labels, duration)
+    QUERIES.observe(labels, queries)
+    DB_DURATION.observe(labels, db_time)
+    SERIALIZER_DURATION.observe(labels, serializer_time)
+    if size is not None:
+        RESPONSE_SIZE.observe(labels, size)
+
+
+def reset():
+    """Forget all observations"""
+    with _lock:
+        for metric in METRICS:
+            metric._values.clear()
+
+
+def _outbox_samples():
+    from outbox.services import backlog
+    pending, dead, age = backlog()
+    yield '# HELP outbox_pending_events Outbox events waiting to be handled.'
+    yield '# TYPE outbox_pending_events gauge'
+    yield f'outbox_pending_events {pending}'
+    yield '# HELP outbox_dead_events Outbox events that exhausted their attempts.'
+    yield '# TYPE outbox_dead_events gauge'
+    yield f'outbox_dead_events {dead}'
+    yield '# HELP outbox_oldest_pending_age_seconds Age of the oldest pending outbox event.'
+    yield '# TYPE outbox_oldest_pending_age_seconds gauge'
+    yield f'outbox_oldest_pending_age_seconds {age}'
+
+
+def render():
+    """All metrics in the Prometheus text format"""
+    lines = [
+        '# HELP process_info Server process answering this scrape.',
+        '# TYPE process_info gauge',
+        f'process_info{_labels(("pid",), (os.getpid(),))} 1',
+    ]
+    for metric in METRICS:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.samples())
+    lines.extend(_outbox_samples())
+    return '\n'.join(lines) + '\n'
+
+
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint.
+
+    With ``METRICS_TOKEN`` set, scrapes must send it as a bearer token.
+    Without one the endpoint only exists while ``DEBUG`` is on.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not secrets.compare_digest(supplied, token):
+            return HttpResponseForbidden()
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(render(), content_type=CONTENT_TYPE)
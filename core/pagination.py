@@ -0,0 +1,86 @@
+"""
+Pagination classes shared by the API.
+"""
+from collections import OrderedDict
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class StandardPageNumberPagination(PageNumberPagination):
+    """
+    Default page-number pagination with a client-selectable page size.
+
+    ``?count=false`` skips the ``COUNT(*)`` query; the response then omits
+    ``count`` and detects the next page by fetching one extra row.
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if request.query_params.get(self.count_query_param) != 'false':
+            self.count_free = False
+            return super().paginate_queryset(queryset, request, view)
+
+        self.count_free = True
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+
+        try:
+            self.page_number = max(int(request.query_params.get(self.page_query_param, 1)), 1)
+        except ValueError:
+            self.page_number = 1
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_next_link(self):
+        if not self.count_free:
+            return super().get_next_link()
+        if not self.has_next:
+            return None
+        return self._page_link(self.page_number + 1)
+
+    def get_previous_link(self):
+        if not self.count_free:
+            return super().get_previous_link()
+        if self.page_number <= 1:
+            return None
+        return self._page_link(self.page_number - 1)
+
+    def _page_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    def get_paginated_response(self, data):
+        if not self.count_free:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Keyset pagination for append-mostly feeds, newest first.
+
+    Pages are fetched with a ``created_at`` range condition instead of an
+    OFFSET and never issue a ``COUNT(*)``, so deep pages cost the same as
+    the first one.
+    """
+    ordering = ('-created_at', '-id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class LeaderboardCursorPagination(CursorPagination):
+    """Keyset pagination down a leaderboard, best rank first"""
+    ordering = ('rank', 'team_id')
+    page_size_query_param = 'page_size'
+    max_page_size = 500
@@ -0,0 +1,177 @@
+"""
+On-demand sampling profiler for production requests.
+
+``ProfilingMiddleware`` profiles a request when a staff user sends the
+``X-Profile: 1`` header, or at random for a ``PROFILING_SAMPLE_RATE``
+fraction of requests whose path matches ``PROFILING_PATHS``. While the view
+runs, a background thread samples the request thread's Python stack every
+``PROFILING_INTERVAL_MS``; nothing is traced, so the overhead is bounded by
+the sampling rate and unprofiled requests pay only for the coin toss.
+
+Profiles are written as JSON files to ``PROFILING_DIR``, keeping the newest
+``PROFILING_MAX_FILES``. ``python manage.py collapse_profiles`` merges them
+into the collapsed-stack format read by flamegraph.pl and speedscope.
+Requests to async views are not profiled, as their event loop thread runs
+other requests' code too.
+"""
+import collections
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.functional import cached_property
+from rest_framework import exceptions
+from accounts.authentication import StatelessJWTAuthentication
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+SUFFIX = '.profile.json'
+
+
+def _frame_label(code):
+    filename = code.co_filename
+    base = str(settings.BASE_DIR) + os.sep
+    if filename.startswith(base):
+        filename = filename[len(base):]
+    else:
+        # Keep library paths short and stable across virtualenvs
+        marker = 'site-packages' + os.sep
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+    return f'{code.co_name} ({filename}:{code.co_firstlineno})'
+
+
+class StackSampler:
+    """Samples one thread's stack from a background thread"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = collections.Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            # Collapsed stacks read from the root to the leaf
+            self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+
+class ProfileStore:
+    """Ring buffer of profiles in a directory, bounded by file count"""
+
+    def __init__(self, directory=None, max_files=None):
+        self.directory = Path(directory or settings.PROFILING_DIR)
+        self.max_files = max_files or settings.PROFILING_MAX_FILES
+
+    def paths(self):
+        """Stored profiles, oldest first"""
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob(f'*{SUFFIX}'))
+
+    def save(self, profile):
+        """Write ``profile`` and evict the oldest beyond the limit; returns its id"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f'{time.time_ns()}-{os.getpid()}-{threading.get_ident()}'
+        path = self.directory / f'{profile_id}{SUFFIX}'
+        temporary = path.with_suffix('.tmp')
+        temporary.write_text(json.dumps(profile))
+        os.replace(temporary, path)
+
+        for stale in self.paths()[:-self.max_files]:
+            try:
+                stale.unlink()
+            except FileNotFoundError:
+                # Evicted by another process at the same time
+                pass
+        return profile_id
+
+    def load(self, path):
+        return json.loads(Path(path).read_text())
+
+
+class ProfilingMiddleware:
+    """Profiles selected requests; see the module docstring"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.authentication = StatelessJWTAuthentication()
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    @cached_property
+    def paths(self):
+        return [re.compile(pattern) for pattern in settings.PROFILING_PATHS]
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.get_response(request)
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        sampler = StackSampler(threading.get_ident(), settings.PROFILING_INTERVAL_MS / 1000)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - started
+
+        match = request.resolver_match
+        profile_id = ProfileStore().save({
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else 'unmatched',
+            'status': response.status_code,
+            'started_at': time.time() - duration,
+            'duration_ms': round(duration * 1000, 3),
+            'interval_ms': settings.PROFILING_INTERVAL_MS,
+            'samples': sampler.samples,
+            'stacks': dict(sampler.stacks),
+        })
+        response[PROFILE_ID_HEADER] = profile_id
+        return response
+
+    def should_profile(self, request):
+        if request.headers.get(PROFILE_HEADER) == '1' and self.is_staff(request):
+            return True
+        rate = settings.PROFILING_SAMPLE_RATE
+        if rate <= 0 or random.random() >= rate:
+            return False
+        return not self.paths or any(pattern.search(request.path) for pattern in self.paths)
+
+    def is_staff(self, request):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            return user.is_staff
+        try:
+            result = self.authentication.authenticate(request)
+        except exceptions.APIException:
+            return False
+        return result is not None and result[0].is_staff
@@ -0,0 +1,174 @@
+"""
+Queryset optimization derived from serializer field declarations.
+
+``optimize_queryset`` walks a serializer's fields and works out the
+``select_related``/``prefetch_related``/``only()`` calls needed to render it
+without lazy loads, so viewsets never have to keep them in sync by hand.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+
+class _QueryPlan:
+    """Relations and columns a serializer reads from one model"""
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = {model._meta.pk.name}
+        # Set to False when a field reads something we cannot map to columns
+        self.can_defer = True
+        self.related = {}
+        self.prefetches = {}
+
+    def add_field(self, name):
+        """Record an attribute read from the model instance"""
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            display_field = self._display_field(name)
+            if display_field:
+                self.fields.add(display_field)
+            else:
+                self.can_defer = False
+            return
+        if field.concrete:
+            self.fields.add(field.name)
+        else:
+            self.can_defer = False
+
+    def _display_field(self, name):
+        if name.startswith('get_') and name.endswith('_display'):
+            try:
+                return self.model._meta.get_field(name[4:-8]).name
+            except FieldDoesNotExist:
+                return None
+        return None
+
+    def relation(self, name):
+        """Plan for a forward foreign key or one-to-one, joined in"""
+        field = self.model._meta.get_field(name)
+        if not (field.many_to_one or field.one_to_one) or not field.concrete:
+            raise ValueError(f'{self.model.__name__}.{name} cannot be select_related')
+        self.fields.add(field.name)
+        if name not in self.related:
+            self.related[name] = _QueryPlan(field.related_model)
+        return self.related[name]
+
+    def select_related(self, prefix=''):
+        paths = []
+        for name, plan in self.related.items():
+            path = f'{prefix}{name}'
+            paths.append(path)
+            paths.extend(plan.select_related(f'{path}__'))
+        return paths
+
+    def only(self, prefix=''):
+        """Column list for only(), or None if this model must load fully"""
+        if not self.can_defer:
+            return None
+        names = [f'{prefix}{name}' for name in sorted(self.fields)]
+        for name, plan in self.related.items():
+            related_names = plan.only(f'{prefix}{name}__')
+            if related_names:
+                names.extend(related_names)
+        return names
+
+
+def _plan_serializer(serializer, plan):
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            plan.can_defer = False
+            continue
+
+        *path, attr = field.source_attrs
+        target = plan
+        try:
+            for name in path:
+                target = target.relation(name)
+        except (FieldDoesNotExist, ValueError):
+            plan.can_defer = False
+            continue
+
+        if isinstance(field, serializers.ListSerializer):
+            _plan_prefetch(target, attr, field.child)
+        elif isinstance(field, serializers.BaseSerializer):
+            try:
+                _plan_serializer(field, target.relation(attr))
+            except (FieldDoesNotExist, ValueError):
+                target.can_defer = False
+        else:
+            # Primary key related fields read the local column, not the row
+            target.add_field(attr)
+
+
+def _plan_prefetch(plan, name, child):
+    try:
+        relation = plan.model._meta.get_field(name)
+    except FieldDoesNotExist:
+        plan.can_defer = False
+        return
+    child_plan = _QueryPlan(relation.related_model)
+    if relation.one_to_many:
+        # The prefetch joins children back on their foreign key column
+        child_plan.fields.add(relation.field.name)
+    _plan_serializer(child, child_plan)
+    plan.prefetches[name] = child_plan
+
+
+def _apply_plan(queryset, plan, defer_unused):
+    select_related = plan.select_related()
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    for name, child_plan in plan.prefetches.items():
+        child_queryset = _apply_plan(child_plan.model._default_manager.all(), child_plan, defer_unused)
+        queryset = queryset.prefetch_related(Prefetch(name, queryset=child_queryset))
+    if defer_unused:
+        only = plan.only()
+        if only:
+            queryset = queryset.only(*only)
+    return queryset
+
+
+def optimize_queryset(queryset, serializer_class, defer_unused=True, keep_fields=()):
+    """
+    Return ``queryset`` with the joins and prefetches ``serializer_class``
+    needs. With ``defer_unused`` the columns it never reads are deferred,
+    except for the model fields named in ``keep_fields``.
+    """
+    plan = _QueryPlan(queryset.model)
+    _plan_serializer(serializer_class(), plan)
+    for name in keep_fields:
+        try:
+            if queryset.model._meta.get_field(name).concrete:
+                plan.fields.add(name)
+        except FieldDoesNotExist:
+            pass
+    return _apply_plan(queryset, plan, defer_unused)
+
+
+class OptimizedQuerySetMixin:
+    """
+    Viewset mixin that optimizes ``get_queryset()`` for the serializer in use.
+
+    Columns are only deferred on safe methods, so instances loaded for
+    writes are always complete. Fields the paginator orders by are kept,
+    as cursor pagination reads them from the page's rows.
+    """
+
+    def get_queryset(self):
+        return self.optimize_queryset(super().get_queryset())
+
+    def optimize_queryset(self, queryset):
+        ordering = getattr(self, 'ordering', None) or getattr(self.pagination_class, 'ordering', None) or ()
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return optimize_queryset(
+            queryset,
+            self.get_serializer_class(),
+            defer_unused=self.request.method in SAFE_METHODS,
+            keep_fields=[field.lstrip('-') for field in ordering]
+        )
@@ -0,0 +1,26 @@
+"""
+Renderers shared by the API.
+"""
+import json
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+
+class CompactJSONRenderer(JSONRenderer):
+    """
+    JSON renderer selected with ``?format=compact``.
+
+    List endpoints answer it from ``values()`` rows that are already plain
+    JSON types, so the C encoder runs without falling back to Python for
+    each value; anything else still goes through DRF's encoder.
+    """
+    format = 'compact'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return json.dumps(
+            data, separators=(',', ':'), ensure_ascii=False, default=_encoder.default
+        ).encode()
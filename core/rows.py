@@ -0,0 +1,20 @@
+"""
+Rendering helpers for ``values()`` rows.
+
+The ``rows`` modules of each app turn flat ``values()`` rows into the same
+objects their serializers produce, without DRF's per-field machinery. They
+back the async endpoints and the ``?format=compact`` list path.
+"""
+from rest_framework import serializers
+
+# DRF fields reused to render values exactly like the serializers
+_datetime_field = serializers.DateTimeField()
+_decimal_field = serializers.DecimalField(max_digits=15, decimal_places=2)
+
+
+def render_datetime(value):
+    return None if value is None else _datetime_field.to_representation(value)
+
+
+def render_decimal(value):
+    return None if value is None else _decimal_field.to_representation(value)
@@ -2,8 +2,10 @@
 Django settings for fantasy_football project.
 """
 
+import tempfile
+from decimal import Decimal
 from pathlib import Path
-from decouple import config
+from decouple import Csv, config
 
 # Build paths inside the project
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -29,22 +31,28 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'corsheaders',
+    'django_filters',
     
     # Local apps
+    'core',
     'accounts',
     'teams',
     'players',
     'transfers',
     'transactions',
+    'outbox',
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover every other middleware
+    'core.instrumentation.PerformanceMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -79,10 +87,35 @@ DATABASES = {
         'PASSWORD': config('DB_PASSWORD', default='postgres'),
         'HOST': config('DB_HOST', default='localhost'),
         'PORT': config('DB_PORT', default='5432'),
+        # Keep connections open between requests instead of reconnecting
+        # every time; set DB_CONN_MAX_AGE=0 when serving through ASGI
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=60, cast=int),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
 
+# Cache
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='fantasy-football'),
+    }
+}
+
+# Transfer market page cache
+MARKET_CACHE_ALIAS = 'default'
+MARKET_CACHE_TIMEOUT = config('MARKET_CACHE_TIMEOUT', default=300, cast=int)
+
+# Buffered last-seen tracking: seconds between flushes and users per UPDATE
+LAST_SEEN_FLUSH_INTERVAL = config('LAST_SEEN_FLUSH_INTERVAL', default=60, cast=int)
+LAST_SEEN_BATCH_SIZE = config('LAST_SEEN_BATCH_SIZE', default=500, cast=int)
+
+# Cache holding the denylist of revoked tokens; must be shared by all
+# workers in production, or revocations only apply to one process
+AUTH_REVOCATION_CACHE_ALIAS = 'default'
+
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -120,12 +153,17 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.StatelessJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_RENDERER_CLASSES': [
+        'rest_framework.renderers.JSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+        'core.renderers.CompactJSONRenderer',
+    ],
+    'DEFAULT_PAGINATION_CLASS': 'core.pagination.StandardPageNumberPagination',
     'PAGE_SIZE': 100,
 }
 
@@ -137,12 +175,102 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': False,
-    'UPDATE_LAST_LOGIN': True,
+    # Logins and refreshes are recorded by accounts.activity instead
+    'UPDATE_LAST_LOGIN': False,
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.FantasyTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.FantasyTokenRefreshSerializer',
+}
+
+# Game settings
+INITIAL_TEAM_CAPITAL = Decimal('5000000.00')
+INITIAL_PLAYER_VALUE = Decimal('1000000.00')
+
+# Squad generated for every new team, as position -> number of players
+SQUAD_TEMPLATE = {
+    'GK': 2,
+    'DF': 5,
+    'MF': 5,
+    'AT': 8,
 }
 
+# Squad composition enforced on every transfer (players.squads): position ->
+# (minimum, maximum) players. Minimums only stop a sale taking a team below
+# them; they default to zero so that any player can be sold
+SQUAD_RULES = {
+    'POSITIONS': {
+        'GK': (0, 4),
+        'DF': (0, 10),
+        'MF': (0, 10),
+        'AT': (0, 12),
+    },
+    'MAX_SQUAD_SIZE': config('SQUAD_MAX_SIZE', default=30, cast=int),
+}
+
+# Market-wide revaluation (players.pricing), as fractions of a player's value
+PRICE_ENGINE = {
+    # Trades considered, counted back from the revaluation
+    'WINDOW_DAYS': config('PRICE_WINDOW_DAYS', default=30, cast=int),
+    # Rise of a player bought repeatedly; DEMAND_SCALE trades reach ~76% of it
+    'DEMAND_WEIGHT': 0.05,
+    'DEMAND_SCALE': 2.0,
+    # Move of a whole position traded more or less than its share of players
+    'POSITION_WEIGHT': 0.02,
+    # Drop of a player listed on the transfer market
+    'LISTING_DISCOUNT': 0.01,
+    # Share of the gap to the average transfer price closed per revaluation
+    'DISCOVERY_WEIGHT': 0.25,
+    # Largest change of any player in one revaluation
+    'MAX_CHANGE': 0.10,
+    'MIN_VALUE': Decimal('10000.00'),
+    # Players locked and written per transaction
+    'CHUNK_SIZE': config('PRICE_CHUNK_SIZE', default=20000, cast=int),
+}
+
+# Most candles returned by one /api/players/{id}/price-history/ request
+PRICE_HISTORY_MAX_CANDLES = config('PRICE_HISTORY_MAX_CANDLES', default=365, cast=int)
+
+# Request instrumentation (core.instrumentation); metrics are served at /metrics
+PERFORMANCE_SERVER_TIMING = config('PERFORMANCE_SERVER_TIMING', default=True, cast=bool)
+# Log requests slower than this many milliseconds with their SQL; 0 disables
+PERFORMANCE_SLOW_REQUEST_MS = config('PERFORMANCE_SLOW_REQUEST_MS', default=0, cast=int)
+# Bearer token required to scrape /metrics; without one it is only served with DEBUG on
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
+# Sampling profiler (core.profiling). Staff can always profile a request by
+# sending "X-Profile: 1"; PROFILING_SAMPLE_RATE also profiles that fraction
+# of the requests whose path matches one of PROFILING_PATHS (all if empty)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_PATHS = config('PROFILING_PATHS', default='', cast=Csv())
+PROFILING_INTERVAL_MS = config('PROFILING_INTERVAL_MS', default=5, cast=int)
+PROFILING_DIR = config('PROFILING_DIR', default=str(Path(tempfile.gettempdir()) / 'fantasy-profiles'))
+PROFILING_MAX_FILES = config('PROFILING_MAX_FILES', default=500, cast=int)
+
+# Most listings created or bought by one batch transfer request
+TRANSFER_BATCH_MAX_ITEMS = config('TRANSFER_BATCH_MAX_ITEMS', default=50, cast=int)
+
+# Auctions: each bid must beat the high bid by AUCTION_MIN_INCREMENT, and
+# settle_auctions closes at most AUCTION_SETTLE_BATCH_SIZE per transaction
+AUCTION_MIN_INCREMENT = Decimal(config('AUCTION_MIN_INCREMENT', default='1000.00'))
+AUCTION_MIN_DURATION_MINUTES = config('AUCTION_MIN_DURATION_MINUTES', default=5, cast=int)
+AUCTION_MAX_DURATION_MINUTES = config('AUCTION_MAX_DURATION_MINUTES', default=7 * 24 * 60, cast=int)
+AUCTION_SETTLE_BATCH_SIZE = config('AUCTION_SETTLE_BATCH_SIZE', default=200, cast=int)
+
+# Outbox worker (python manage.py process_outbox)
+OUTBOX_BATCH_SIZE = config('OUTBOX_BATCH_SIZE', default=100, cast=int)
+OUTBOX_POLL_INTERVAL = config('OUTBOX_POLL_INTERVAL', default=1.0, cast=float)
+# Seconds before the first retry of a failed event, doubling with each attempt
+OUTBOX_RETRY_DELAY = config('OUTBOX_RETRY_DELAY', default=5, cast=int)
+OUTBOX_MAX_ATTEMPTS = config('OUTBOX_MAX_ATTEMPTS', default=10, cast=int)
+
+# Rows fetched per round trip when streaming ledger exports
+EXPORT_CHUNK_SIZE = config('EXPORT_CHUNK_SIZE', default=2000, cast=int)
+
+# Rows per INSERT batch when bulk-registering users
+REGISTRATION_BATCH_SIZE = config('REGISTRATION_BATCH_SIZE', default=500, cast=int)
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True
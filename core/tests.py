@@ -0,0 +1,457 @@
+import shutil
+import tempfile
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework import status
+from decimal import Decimal
+
+from accounts.tokens import FantasyRefreshToken
+from core import metrics
+from core.profiling import ProfileStore
+from core.querysets import optimize_queryset
+from teams.models import Team
+from teams.serializers import TeamSerializer
+from players.models import Player
+from transfers.models import TransferListing
+from transactions.models import Transaction
+
+User = get_user_model()
+
+# Maximum queries per list request, independent of the number of rows
+LIST_QUERY_BUDGETS = {
+    '/api/teams/': 3,
+    '/api/players/': 2,
+    '/api/players/my-players/': 2,
+    '/api/teams/my-team/': 3,
+    '/api/transfer-listings/': 2,
+    '/api/transactions/': 2,
+    '/api/transactions/?my_transactions=true': 2,
+}
+
+
+class QueryOptimizationTests(TestCase):
+    """Test queryset optimization derived from serializers"""
+
+    def test_nested_relations_are_joined_and_prefetched(self):
+        """Test that nested serializers become select/prefetch related"""
+        queryset = optimize_queryset(Team.objects.all(), TeamSerializer)
+
+        self.assertIn('user', queryset.query.select_related)
+        self.assertEqual([lookup.prefetch_through for lookup in queryset._prefetch_related_lookups], ['players'])
+
+    def test_unused_columns_are_deferred(self):
+        """Test that columns the serializer never reads are deferred"""
+        queryset = optimize_queryset(Team.objects.all(), TeamSerializer)
+        deferred, defer = queryset.query.deferred_loading
+
+        self.assertFalse(defer)
+        self.assertNotIn('updated_at', deferred)
+        self.assertIn('total_team_value', deferred)
+
+
+class QueryBudgetTests(TestCase):
+    """Test that list endpoints issue a fixed number of queries"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users = []
+
+    def add_teams(self, count):
+        for i in range(len(self.users), len(self.users) + count):
+            user = User.objects.create_user(username=f'user{i}', email=f'user{i}@test.com', password='Pass123')
+            team = Team.objects.create(user=user, name=f'Team {i}', capital=Decimal('5000000.00'))
+            players = [
+                Player.objects.create(team=team, name=f'Player {i}-{j}', position='MF', value=Decimal('1000000.00'))
+                for j in range(3)
+            ]
+            TransferListing.objects.create(player=players[0], asking_price=Decimal('1500000.00'))
+            if self.users:
+                Transaction.objects.create(
+                    buyer=user,
+                    seller=self.users[0],
+                    player=players[1],
+                    transfer_amount=Decimal('1200000.00')
+                )
+                Transaction.objects.create(
+                    buyer=self.users[0],
+                    seller=user,
+                    player=players[2],
+                    transfer_amount=Decimal('1300000.00')
+                )
+            self.users.append(user)
+
+    def count_queries(self, url):
+        # Authenticate with a real token, so authentication is measured too
+        token = FantasyRefreshToken.for_user(self.users[0]).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        # Small pages, so cursor links are computed at both dataset sizes
+        separator = '&' if '?' in url else '?'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(f'{url}{separator}page_size=3')
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(queries)
+
+    def test_list_endpoints_stay_within_query_budget(self):
+        """Test query counts at two dataset sizes against the budget"""
+        self.add_teams(2)
+        small = {url: self.count_queries(url) for url in LIST_QUERY_BUDGETS}
+
+        self.add_teams(8)
+        large = {url: self.count_queries(url) for url in LIST_QUERY_BUDGETS}
+
+        for url, budget in LIST_QUERY_BUDGETS.items():
+            self.assertLessEqual(large[url], budget, url)
+            self.assertEqual(small[url], large[url], url)
+
+
+class PageNumberPaginationTests(TestCase):
+    """Test the default page-number pagination"""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = User.objects.create_user(username='user', email='user@test.com', password='Pass123')
+        team = Team.objects.create(user=user, name='Team', capital=Decimal('5000000.00'))
+        for i in range(5):
+            Player.objects.create(team=team, name=f'Player {i}', position='MF', value=Decimal('1000000.00'))
+        self.client.force_authenticate(user=user)
+
+    def test_count_free_mode_skips_count_query(self):
+        """Test that ?count=false omits the count and its query"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/players/?count=false&page_size=2')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIn('page=2', response.data['next'])
+        self.assertIsNone(response.data['previous'])
+        self.assertFalse(any('COUNT' in query['sql'] for query in queries))
+
+    def test_count_free_mode_last_page(self):
+        """Test that the last count-free page has no next link"""
+        response = self.client.get('/api/players/?count=false&page_size=2&page=3')
+
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+        self.assertIn('page=2', response.data['previous'])
+
+    def test_default_mode_includes_count(self):
+        """Test that the count is returned by default"""
+        response = self.client.get('/api/players/?page_size=2')
+
+        self.assertEqual(response.data['count'], 5)
+
+
+class AsyncEndpointTests(TestCase):
+    """Test that the async read endpoints match their DRF counterparts"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.users, teams = [], []
+        for i in range(3):
+            user = User.objects.create_user(username=f'async{i}', email=f'async{i}@test.com', password='Pass123')
+            team = Team.objects.create(user=user, name=f'Async Team {i}', capital=Decimal('5000000.00'))
+            for j in range(3):
+                player = Player.objects.create(
+                    team=team, name=f'Player {i}-{j}', position='MF', value=Decimal('1000000.00')
+                )
+            TransferListing.objects.create(player=player, asking_price=Decimal('1500000.00'))
+            self.users.append(user)
+            teams.append(team)
+        for i in range(1, 3):
+            Transaction.objects.create(
+                buyer=self.users[0], seller=self.users[i],
+                player=teams[i].players.first(), transfer_amount=Decimal('1200000.00')
+            )
+        token = FantasyRefreshToken.for_user(self.users[0]).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_responses_match_sync_endpoints(self):
+        """Test that each async endpoint renders the same data"""
+        pairs = [
+            ('/api/teams/my-team/', '/api/async/teams/my-team/'),
+            ('/api/players/my-players/', '/api/async/players/my-players/'),
+            ('/api/transfer-listings/', '/api/async/transfer-listings/'),
+            ('/api/transfer-listings/?position=MF&my_listings=true', '/api/async/transfer-listings/?position=MF&my_listings=true'),
+            ('/api/transactions/', '/api/async/transactions/'),
+            ('/api/transactions/?my_transactions=true', '/api/async/transactions/?my_transactions=true'),
+        ]
+        for sync_url, async_url in pairs:
+            expected = self.client.get(sync_url).json()
+            response = self.client.get(async_url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK, async_url)
+            if isinstance(expected, dict) and 'results' in expected:
+                expected = expected['results']
+                actual = response.json()['results']
+            else:
+                actual = response.json()
+            self.assertTrue(expected, sync_url)
+            self.assertEqual(actual, expected, async_url)
+
+    def test_keyset_pages_cover_feed(self):
+        """Test that following next links pages through every listing once"""
+        url, seen = '/api/async/transfer-listings/?page_size=2', []
+        while url:
+            with self.assertNumQueries(1):
+                data = self.client.get(url).json()
+            seen.extend(listing['id'] for listing in data['results'])
+            url = data['next']
+        self.assertEqual(seen, list(TransferListing.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+    def test_market_filters_and_ordering_match(self):
+        """Test that the async market validates filters and orders like DRF"""
+        for listing, price in zip(TransferListing.objects.order_by('id'), ('200.00', '100.00', '300.00')):
+            TransferListing.objects.filter(pk=listing.pk).update(asking_price=Decimal(price))
+        for query in ('?ordering=asking_price', '?ordering=-player_value&position=MF'):
+            expected = self.client.get(f'/api/transfer-listings/{query}').json()['results']
+            url, actual = f'/api/async/transfer-listings/{query}&page_size=1', []
+            while url:
+                data = self.client.get(url).json()
+                actual.extend(data['results'])
+                url = data['next']
+            self.assertEqual(actual, expected, query)
+
+        for query in ('?min_price=abc', '?ordering=name'):
+            response = self.client.get(f'/api/async/transfer-listings/{query}')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+            self.assertIn(query[1:].split('=')[0], response.json())
+
+    def test_squad_validators_are_shared(self):
+        """Test that an ETag from the sync endpoint is honoured by the async one"""
+        etag = self.client.get('/api/players/my-players/')['ETag']
+        response = self.client.get('/api/async/players/my-players/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_requires_authentication(self):
+        """Test that anonymous requests are rejected like DRF does"""
+        self.client.credentials()
+        response = self.client.get('/api/async/transactions/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertIn('WWW-Authenticate', response)
+
+    def test_market_pages_are_cached(self):
+        """Test that a repeated async market request is served from the cache"""
+        from django.core.cache import cache
+        cache.clear()
+        first = self.client.get('/api/async/transfer-listings/')
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/async/transfer-listings/')
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second['ETag'], first['ETag'])
+
+
+class CompactFormatTests(TestCase):
+    """Test the values()-based ?format=compact list path"""
+
+    def setUp(self):
+        self.client = APIClient()
+        users = []
+        for i in range(3):
+            user = User.objects.create_user(username=f'compact{i}', email=f'compact{i}@test.com', password='Pass123')
+            team = Team.objects.create(user=user, name=f'Compact Team {i}', capital=Decimal('5000000.00'))
+            for j in range(3):
+                player = Player.objects.create(
+                    team=team, name=f'Player {i}-{j}', position='DF', value=Decimal('1000000.00')
+                )
+            TransferListing.objects.create(player=player, asking_price=Decimal(f'{i + 1}500000.00'))
+            users.append(user)
+        for seller in users[1:]:
+            Transaction.objects.create(
+                buyer=users[0], seller=seller,
+                player=seller.team.players.first(), transfer_amount=Decimal('1200000.00')
+            )
+        token = FantasyRefreshToken.for_user(users[0]).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def test_compact_lists_match_serializers(self):
+        """Test that every list endpoint returns the same page in compact format"""
+        urls = [
+            '/api/teams/?page_size=2',
+            '/api/players/?page_size=4',
+            '/api/transfer-listings/?page_size=2',
+            '/api/transfer-listings/?ordering=-asking_price&page_size=2',
+            '/api/transactions/',
+            '/api/transactions/?my_transactions=true&page_size=1',
+        ]
+        for url in urls:
+            expected = self.client.get(url).json()
+            response = self.client.get(f'{url}&format=compact' if '?' in url else f'{url}?format=compact')
+            self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+            actual = response.json()
+            self.assertTrue(expected['results'], url)
+            self.assertEqual(actual['results'], expected['results'], url)
+            # Links differ only by the format parameter
+            self.assertEqual(bool(actual.get('next')), bool(expected.get('next')), url)
+
+    def test_compact_cursor_follows_next_link(self):
+        """Test that cursor pages chain from compact rows"""
+        first = self.client.get('/api/transfer-listings/?format=compact&page_size=2').json()
+        second = self.client.get(first['next']).json()
+        ids = [row['id'] for row in first['results'] + second['results']]
+        self.assertEqual(sorted(ids), sorted(TransferListing.objects.values_list('id', flat=True)))
+
+    def test_compact_team_list_query_count(self):
+        """Test that squads are loaded with one query for the whole page"""
+        with self.assertNumQueries(3):
+            self.client.get('/api/teams/?format=compact')
+
+    def test_compact_falls_back_to_serializer(self):
+        """Test that viewsets without compact rows render through the serializer"""
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from teams.views import TeamViewSet
+
+        class SerializedTeamViewSet(TeamViewSet):
+            compact_values = None
+
+        request = APIRequestFactory().get('/api/teams/?format=compact')
+        force_authenticate(request, user=User.objects.get(username='compact0'))
+        response = SerializedTeamViewSet.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], self.client.get('/api/teams/').json()['results'])
+
+
+class InstrumentationTests(TestCase):
+    """Test the per-request performance middleware and metrics endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='metrics', email='metrics@test.com', password='Pass123')
+        team = Team.objects.create(user=self.user, name='Metrics Team', capital=Decimal('5000000.00'))
+        Player.objects.create(team=team, name='Player', position='MF', value=Decimal('1000000.00'))
+        token = FantasyRefreshToken.for_user(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        metrics.reset()
+
+    def test_server_timing_counts_queries(self):
+        """Test the Server-Timing header reports the queries of sync and async views"""
+        for url in ('/api/teams/my-team/', '/api/async/teams/my-team/'):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            timing = response['Server-Timing']
+            self.assertIn(f'desc="{len(queries)} queries"', timing, url)
+            self.assertIn('app;dur=', timing)
+            self.assertIn('serializer;dur=', timing)
+
+    @override_settings(DEBUG=True)
+    def test_metrics_endpoint_exposes_histograms(self):
+        """Test /metrics renders per-view histograms in the Prometheus format"""
+        self.client.get('/api/teams/my-team/')
+        response = self.client.get('/metrics')
+        body = response.content.decode()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn('http_requests_total{view="team-my-team",method="GET",status="200"} 1', body)
+        self.assertIn('http_request_db_queries_bucket{view="team-my-team",method="GET",le="+Inf"} 1', body)
+        self.assertIn('http_response_size_bytes_count{view="team-my-team",method="GET"} 1', body)
+        self.assertIn('outbox_pending_events 0', body)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """Test /metrics requires the configured bearer token"""
+        self.client.credentials()
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_health_needs_no_authentication(self):
+        """Test the container healthcheck endpoint answers anonymous requests"""
+        self.client.credentials()
+        with self.assertNumQueries(0):
+            response = self.client.get('/health')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='', DEBUG=False)
+    def test_metrics_closed_without_token(self):
+        """Test /metrics is not served in production without a token"""
+        self.assertEqual(self.client.get('/metrics').status_code, status.HTTP_404_NOT_FOUND)
+
+    @override_settings(PERFORMANCE_SLOW_REQUEST_MS=0.001)
+    def test_slow_request_log_includes_sql(self):
+        """Test requests over the threshold are logged with their SQL"""
+        with self.assertLogs('core.performance', 'WARNING') as logs:
+            self.client.get('/api/teams/my-team/')
+        self.assertIn('Slow request GET /api/teams/my-team/', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+
+class ProfilingTests(TestCase):
+    """Test the on-demand request profiler and its collapse command"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.client = APIClient()
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@test.com', password='Pass123', is_staff=True
+        )
+        Team.objects.create(user=self.staff, name='Staff Team', capital=Decimal('5000000.00'))
+        self.user = User.objects.create_user(username='player', email='player@test.com', password='Pass123')
+        Team.objects.create(user=self.user, name='Player Team', capital=Decimal('5000000.00'))
+
+    def get(self, user, **headers):
+        token = FantasyRefreshToken.for_user(user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        with override_settings(PROFILING_DIR=self.directory, PROFILING_INTERVAL_MS=1):
+            return self.client.get('/api/teams/', **headers)
+
+    def test_staff_header_profiles_request(self):
+        """Test only staff users can request a profile"""
+        response = self.get(self.user, HTTP_X_PROFILE='1')
+        self.assertNotIn('X-Profile-Id', response)
+        self.assertEqual(ProfileStore(self.directory).paths(), [])
+
+        response = self.get(self.staff, HTTP_X_PROFILE='1')
+        paths = ProfileStore(self.directory).paths()
+        self.assertEqual(len(paths), 1)
+        self.assertTrue(paths[0].name.startswith(response['X-Profile-Id']))
+        profile = ProfileStore(self.directory).load(paths[0])
+        self.assertEqual((profile['view'], profile['status']), ('team-list', 200))
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    def test_ring_buffer_keeps_newest(self):
+        """Test sampled profiles are bounded by PROFILING_MAX_FILES"""
+        with override_settings(PROFILING_MAX_FILES=2):
+            ids = [self.get(self.user)['X-Profile-Id'] for _ in range(3)]
+        names = [path.name for path in ProfileStore(self.directory).paths()]
+        self.assertEqual(len(names), 2)
+        self.assertTrue(names[-1].startswith(ids[-1]))
+
+    def test_collapse_merges_stacks(self):
+        """Test collapse_profiles sums stacks across matching profiles"""
+        store = ProfileStore(self.directory)
+        for view in ('team-list', 'team-list', 'player-list'):
+            store.save({'view': view, 'path': '/api/', 'duration_ms': 10, 'stacks': {'a;b': 2, 'a;c': 1}})
+        out = StringIO()
+
+        call_command('collapse_profiles', '--dir', self.directory, '--view', '^team-', stdout=out, stderr=StringIO())
+
+        self.assertEqual(out.getvalue(), 'a;b 4\na;c 2\n')
+
+
+class GenerateDatasetTests(TestCase):
+    """Test the benchmark dataset generator"""
+
+    def generate(self, scale):
+        call_command(
+            'generate_dataset', scale, '--prefix', 'gen', '--listed-fraction', '0.5', '--batch-size', '3',
+            stdout=StringIO()
+        )
+        return (
+            User.objects.filter(username__startswith='gen_').count(),
+            Transaction.objects.filter(buyer__username__startswith='gen_').count(),
+        )
+
+    def test_scale_is_a_target(self):
+        """Test that reruns top the dataset up instead of adding to it"""
+        self.assertEqual(self.generate('4'), (4, 8))
+        listings = TransferListing.objects.count()
+        self.assertEqual(self.generate('4'), (4, 8))
+        self.assertEqual(TransferListing.objects.count(), listings)
+        self.assertEqual(self.generate('6'), (6, 12))
+        self.assertEqual(len(set(User.objects.filter(username__startswith='gen_').values_list('username'))), 6)
@@ -0,0 +1,73 @@
+"""
+Gunicorn settings for serving the API in production.
+
+Picked up automatically when gunicorn is started from the project root:
+
+    gunicorn core.wsgi:application
+
+or, for the ASGI entry point (requires uvicorn):
+
+    GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker gunicorn core.asgi:application
+
+Every value can be overridden through the environment.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+_cpus = multiprocessing.cpu_count()
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# The usual 2 x CPU + 1 processes, capped so workers x threads stays well
+# under PostgreSQL's max_connections with persistent connections
+workers = _env_int('WEB_CONCURRENCY', min(2 * _cpus + 1, _env_int('GUNICORN_MAX_WORKERS', 12)))
+# Threads overlap the time a worker spends waiting on the database
+threads = _env_int('GUNICORN_THREADS', 4)
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread' if threads > 1 else 'sync')
+
+# Import the application once in the master so workers fork with it loaded
+preload_app = True
+
+timeout = _env_int('GUNICORN_TIMEOUT', 30)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Recycle workers now and then to bound memory growth, staggered so they
+# do not all restart together
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 10000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 1000)
+
+# Set GUNICORN_ACCESSLOG to an empty value to turn access logging off
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-') or None
+errorlog = '-'
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
+
+
+def post_fork(server, worker):
+    # Database connections must never be shared between processes; drop any
+    # the master opened while preloading
+    from django.db import connections
+    connections.close_all()
+
+
+def when_ready(server):
+    # Market page versions and the token denylist live in the cache; with
+    # a per-process cache, invalidations and revocations would only reach
+    # the worker that made them
+    from django.conf import settings
+    from django.core.cache.backends.locmem import LocMemCache
+    from django.utils.module_loading import import_string
+    if server.cfg.workers > 1:
+        for alias in {settings.MARKET_CACHE_ALIAS, settings.AUTH_REVOCATION_CACHE_ALIAS}:
+            backend = import_string(settings.CACHES[alias]['BACKEND'])
+            if issubclass(backend, LocMemCache):
+                raise RuntimeError(
+                    f"Cache '{alias}' is process-local; set CACHE_BACKEND to a shared cache "
+                    'or run a single worker (WEB_CONCURRENCY=1)'
+                )
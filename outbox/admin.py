@@ -0,0 +1,18 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import OutboxEvent
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('id', 'topic', 'created_at', 'attempts', 'processed_at')
+    list_filter = ('topic', 'processed_at')
+    readonly_fields = ('topic', 'payload', 'created_at', 'available_at', 'attempts', 'last_error', 'processed_at')
+    actions = ('requeue',)
+
+    @admin.action(description='Requeue selected unprocessed events')
+    def requeue(self, request, queryset):
+        count = queryset.filter(processed_at__isnull=True).update(
+            attempts=0, available_at=timezone.now(), last_error=''
+        )
+        self.message_user(request, f'{count} events requeued.')
@@ -0,0 +1,66 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from django.utils import timezone
+from core.benchmarks import summarize_latencies
+from outbox.services import OutboxWorker, backlog
+
+
+class Command(BaseCommand):
+    """Run the outbox worker"""
+    help = (
+        'Hand published events to their registered handlers in batches, with at-least-once '
+        'delivery. Runs until interrupted, polling when the outbox is empty; --once drains '
+        'what is due and exits. Several workers can run at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Events per transaction (default: OUTBOX_BATCH_SIZE)')
+        parser.add_argument('--poll-interval', type=float, help='Seconds to sleep when idle (default: OUTBOX_POLL_INTERVAL)')
+        parser.add_argument('--once', action='store_true', help='Exit once no events are due')
+        parser.add_argument('--purge-days', type=int, help='Also delete events processed more than this many days ago')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size is not None and batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+        poll_interval = options['poll_interval']
+        if poll_interval is None:
+            poll_interval = settings.OUTBOX_POLL_INTERVAL
+
+        worker = OutboxWorker(batch_size=batch_size)
+        if options['purge_days'] is not None:
+            purged = worker.purge(timezone.now() - timedelta(days=options['purge_days']))
+            self.stdout.write(f'Purged {purged} processed events')
+
+        totals = {'processed': 0, 'failed': 0}
+        try:
+            while True:
+                close_old_connections()
+                processed, failed, lags = worker.process_batch()
+                totals['processed'] += processed
+                totals['failed'] += failed
+                if processed or failed:
+                    self.report(processed, failed, lags)
+                elif options['once']:
+                    break
+                else:
+                    time.sleep(poll_interval)
+        except KeyboardInterrupt:
+            pass
+
+        pending, dead, age = backlog()
+        self.stdout.write(
+            f"Processed {totals['processed']} events, {totals['failed']} failures; "
+            f"{pending} pending (oldest {age:.1f}s), {dead} dead"
+        )
+
+    def report(self, processed, failed, lags):
+        summary = summarize_latencies(lags)
+        pending, dead, age = backlog()
+        self.stdout.write(
+            f"Processed {processed} events ({failed} failed), lag p50 {summary['p50']:.0f}ms "
+            f"max {summary['max']:.0f}ms; {pending} pending (oldest {age:.1f}s), {dead} dead"
+        )
@@ -0,0 +1,57 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxEventQuerySet(models.QuerySet):
+    """QuerySet for outbox events"""
+
+    def pending(self):
+        """Events not yet handled that still have attempts left"""
+        return self.filter(processed_at__isnull=True, attempts__lt=settings.OUTBOX_MAX_ATTEMPTS)
+
+    def due(self, now=None):
+        """Pending events whose next attempt is due, oldest first"""
+        return self.pending().filter(available_at__lte=now or timezone.now()).order_by('id')
+
+    def dead(self):
+        """Events that failed on every attempt and are no longer retried"""
+        return self.filter(processed_at__isnull=True, attempts__gte=settings.OUTBOX_MAX_ATTEMPTS)
+
+
+class OutboxEvent(models.Model):
+    """
+    An event recorded in the same transaction as the change it describes.
+
+    The ``process_outbox`` worker hands each event to the handlers
+    registered for its topic, so their work happens off the request path
+    and is never lost nor run for a change that was rolled back.
+    """
+    topic = models.CharField(max_length=100)
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # Next attempt is not before this time, pushed back after each failure
+    available_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OutboxEventQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['id']
+        # The worker only scans unprocessed events, and purging only
+        # processed ones, so each index skips the other set
+        indexes = [
+            models.Index(
+                fields=['available_at', 'id'], condition=Q(processed_at__isnull=True), name='outbox_pending_idx'
+            ),
+            models.Index(
+                fields=['processed_at'], condition=Q(processed_at__isnull=False), name='outbox_processed_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.topic} #{self.pk}'
@@ -0,0 +1,112 @@
+"""
+Transactional outbox.
+
+``publish()`` records an event in the caller's transaction, so it exists
+exactly when the change it describes was committed. ``OutboxWorker`` drains
+due events in batches and calls the handlers registered for their topic.
+
+Delivery is at least once: an event is marked processed in the same
+transaction as its handlers ran, and a worker that dies mid-batch leaves
+the batch to be handled again. Handlers must therefore be idempotent.
+A failing event is retried with exponential backoff until
+``OUTBOX_MAX_ATTEMPTS`` and then left in place for inspection.
+"""
+import logging
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+from .models import OutboxEvent
+
+logger = logging.getLogger(__name__)
+
+_handlers = defaultdict(list)
+
+
+def handler(topic):
+    """Register the decorated ``function(payload)`` for events of ``topic``"""
+    def register(function):
+        if function not in _handlers[topic]:
+            _handlers[topic].append(function)
+        return function
+    return register
+
+
+def handlers_for(topic):
+    return list(_handlers.get(topic, ()))
+
+
+def publish(topic, payload):
+    """Record an event; call it inside the transaction making the change"""
+    return OutboxEvent.objects.create(topic=topic, payload=payload)
+
+
+def publish_many(topic, payloads):
+    """Record one event per payload with a single INSERT"""
+    return OutboxEvent.objects.bulk_create([OutboxEvent(topic=topic, payload=payload) for payload in payloads])
+
+
+def backlog(now=None):
+    """``(pending, dead, oldest_pending_age_seconds)`` for lag monitoring"""
+    now = now or timezone.now()
+    pending = OutboxEvent.objects.pending()
+    oldest = pending.aggregate(oldest=Min('created_at'))['oldest']
+    age = (now - oldest).total_seconds() if oldest else 0.0
+    return pending.count(), OutboxEvent.objects.dead().count(), age
+
+
+class OutboxWorker:
+    """Drains the outbox in batches; several workers may run side by side"""
+
+    def __init__(self, batch_size=None, retry_delay=None):
+        self.batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+        self.retry_delay = retry_delay if retry_delay is not None else settings.OUTBOX_RETRY_DELAY
+
+    def process_batch(self):
+        """
+        Handle one batch of due events.
+
+        Returns ``(processed, failed, lags)`` where ``lags`` are the seconds
+        each processed event waited since it was published.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            # Rows locked by another worker are skipped rather than waited on
+            events = list(
+                OutboxEvent.objects.due(now)
+                .select_for_update(skip_locked=True)[:self.batch_size]
+            )
+            processed, failed, lags = 0, 0, []
+            for event in events:
+                event.attempts += 1
+                try:
+                    # A savepoint per event, so a failing handler's writes
+                    # are undone without losing the rest of the batch
+                    with transaction.atomic():
+                        self.dispatch(event)
+                except Exception as exc:
+                    failed += 1
+                    event.last_error = f'{type(exc).__name__}: {exc}'
+                    event.available_at = now + timedelta(seconds=self.retry_delay * 2 ** (event.attempts - 1))
+                    logger.exception('Outbox event %s (%s) failed on attempt %s', event.pk, event.topic, event.attempts)
+                else:
+                    processed += 1
+                    event.processed_at = timezone.now()
+                    lags.append((event.processed_at - event.created_at).total_seconds())
+            if events:
+                OutboxEvent.objects.bulk_update(events, ['attempts', 'last_error', 'available_at', 'processed_at'])
+        return processed, failed, lags
+
+    def dispatch(self, event):
+        functions = handlers_for(event.topic)
+        if not functions:
+            logger.debug('No handlers for outbox topic %s', event.topic)
+        for function in functions:
+            function(event.payload)
+
+    def purge(self, older_than):
+        """Delete events processed before ``older_than``; returns the count"""
+        deleted, _ = OutboxEvent.objects.filter(processed_at__lt=older_than).delete()
+        return deleted
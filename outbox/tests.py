@@ -0,0 +1,97 @@
+from io import StringIO
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from decimal import Decimal
+
+from outbox.models import OutboxEvent
+from outbox.services import OutboxWorker, _handlers, handler, publish
+from players.models import Player
+from teams.models import Team
+from transfers.models import TransferListing
+from transfers.services import TRANSFER_COMPLETED, TransferEngine, TransferError
+
+User = get_user_model()
+
+
+class OutboxTests(TestCase):
+    """Test the transactional outbox and its worker"""
+
+    def setUp(self):
+        self.calls = []
+        self.addCleanup(_handlers.pop, 'tests.event', None)
+
+    def register(self, fail=False):
+        @handler('tests.event')
+        def record(payload):
+            User.objects.create_user(username=f'side{len(self.calls)}', email=f'side{len(self.calls)}@test.com')
+            self.calls.append(payload)
+            if fail:
+                raise RuntimeError('handler failed')
+
+    def test_purchase_publishes_event_in_its_transaction(self):
+        """Test a purchase records one event, and a refused one records none"""
+        seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        seller_team = Team.objects.create(user=seller, name='Seller', capital=Decimal('5000000.00'))
+        Team.objects.create(user=buyer, name='Buyer', capital=Decimal('1000.00'))
+        player = Player.objects.create(team=seller_team, name='Player', position='GK', value=Decimal('1000000.00'))
+        listing = TransferListing.objects.create(player=player, asking_price=Decimal('1500000.00'))
+
+        with self.assertRaises(TransferError):
+            TransferEngine.purchase(listing.pk, buyer)
+        self.assertFalse(OutboxEvent.objects.exists())
+
+        Team.objects.filter(user=buyer).update(capital=Decimal('5000000.00'))
+        purchase = TransferEngine.purchase(listing.pk, buyer)
+
+        event = OutboxEvent.objects.get()
+        self.assertEqual(event.topic, TRANSFER_COMPLETED)
+        self.assertEqual(event.payload['transaction_id'], purchase.pk)
+        self.assertEqual(event.payload['transfer_amount'], '1500000.00')
+
+    def test_worker_runs_handlers_once(self):
+        """Test due events are handled and marked processed"""
+        self.register()
+        publish('tests.event', {'n': 1})
+        publish('tests.event', {'n': 2})
+
+        processed, failed, lags = OutboxWorker().process_batch()
+
+        self.assertEqual((processed, failed, len(lags)), (2, 0, 2))
+        self.assertEqual(self.calls, [{'n': 1}, {'n': 2}])
+        self.assertFalse(OutboxEvent.objects.pending().exists())
+        self.assertEqual(OutboxWorker().process_batch(), (0, 0, []))
+
+    @override_settings(OUTBOX_MAX_ATTEMPTS=2)
+    def test_failed_event_is_retried_with_backoff_then_dead(self):
+        """Test a failing handler's writes roll back and the event backs off"""
+        self.register(fail=True)
+        event = publish('tests.event', {})
+        users = User.objects.count()
+
+        self.assertEqual(OutboxWorker(retry_delay=60).process_batch()[:2], (0, 1))
+        event.refresh_from_db()
+        self.assertEqual(event.attempts, 1)
+        self.assertIn('handler failed', event.last_error)
+        self.assertGreater(event.available_at, timezone.now() + timedelta(seconds=30))
+        self.assertEqual(User.objects.count(), users)
+        self.assertEqual(OutboxWorker().process_batch(), (0, 0, []))
+
+        OutboxEvent.objects.filter(pk=event.pk).update(available_at=timezone.now())
+        OutboxWorker().process_batch()
+        self.assertTrue(OutboxEvent.objects.dead().filter(pk=event.pk).exists())
+        self.assertFalse(OutboxEvent.objects.pending().exists())
+
+    def test_command_drains_and_reports(self):
+        """Test process_outbox --once handles what is due and exits"""
+        self.register()
+        publish('tests.event', {})
+        out = StringIO()
+
+        call_command('process_outbox', '--once', stdout=out)
+
+        self.assertEqual(len(self.calls), 1)
+        self.assertIn('Processed 1 events, 0 failures; 0 pending', out.getvalue())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Player
+from .models import Player, PriceCandle
 
 
 @admin.register(Player)
@@ -7,3 +7,10 @@ class PlayerAdmin(admin.ModelAdmin):
     list_display = ('name', 'position', 'team', 'value')
     list_filter = ('position', 'team')
     search_fields = ('name', 'team__name')
+
+
+@admin.register(PriceCandle)
+class PriceCandleAdmin(admin.ModelAdmin):
+    list_display = ('player', 'period', 'period_start', 'open', 'high', 'low', 'close', 'trades')
+    list_filter = ('period',)
+    raw_id_fields = ('player',)
@@ -0,0 +1,22 @@
+from django.http import JsonResponse
+from core.asyncapi import async_api_view, not_modified
+from core.conditional import is_not_modified, set_validators
+from teams.models import Team
+from .models import Player
+from .rows import player_values, render_player
+
+
+@async_api_view
+async def my_players(request, user):
+    """Async variant of ``/api/players/my-players/``"""
+    validators = await Team.objects.filter(pk=user.team_id).asquad_validators('my-players', 'json')
+    if validators is None:
+        return JsonResponse({'error': 'Team not found'}, status=404)
+
+    team_id, etag, last_modified = validators
+    if is_not_modified(request, etag=etag, last_modified=last_modified):
+        return not_modified(etag=etag, last_modified=last_modified)
+
+    rows = Player.objects.filter(team_id=team_id).values(*player_values())
+    players = [render_player(row) async for row in rows.aiterator()]
+    return set_validators(JsonResponse(players, safe=False), etag=etag, last_modified=last_modified)
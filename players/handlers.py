@@ -0,0 +1,20 @@
+"""Outbox handlers for player price history"""
+from decimal import Decimal
+from django.utils.dateparse import parse_datetime
+from outbox.services import handler
+from transfers.services import TRANSFER_COMPLETED
+from .history import record
+from .models import PricePoint
+
+
+@handler(TRANSFER_COMPLETED)
+def record_trade(payload):
+    """Append the trade to the player's price history; replays are skipped"""
+    record([PricePoint(
+        player_id=payload['player_id'],
+        transaction_id=payload['transaction_id'],
+        price=Decimal(str(payload['transfer_amount'])),
+        value=Decimal(str(payload['player_value'])),
+        # Stored payloads hold ISO strings, as encoded by DjangoJSONEncoder
+        traded_at=parse_datetime(str(payload['created_at']))
+    )])
@@ -0,0 +1,130 @@
+"""
+Per-player price history.
+
+Every completed transfer is appended once to ``PricePoint`` and merged into
+daily and weekly ``PriceCandle`` rollups in the same transaction, so charts
+read a few compact rows per player instead of scanning transactions.
+Trades arrive through the transfer-completed outbox event (see
+``players.handlers``), and ``python manage.py backfill_price_history``
+replays the existing ledger through the same ``record()``.
+"""
+import datetime
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from .models import PriceCandle, PricePoint
+
+PERIODS = (PriceCandle.DAY, PriceCandle.WEEK)
+CANDLE_FIELDS = ('open', 'high', 'low', 'close', 'opened_at', 'closed_at', 'trades', 'turnover')
+
+
+def period_start(moment, period):
+    """First day of the ``period`` holding ``moment``; weeks start on Monday"""
+    day = timezone.localtime(moment).date()
+    if period == PriceCandle.WEEK:
+        return day - datetime.timedelta(days=day.weekday())
+    return day
+
+
+def record(points):
+    """
+    Append unsaved ``PricePoint`` instances and merge them into the rollups.
+
+    Points of transactions already recorded are skipped, so replaying a
+    trade is harmless; returns the number of points appended.
+    """
+    for attempt in range(2):
+        try:
+            with transaction.atomic():
+                return _record(points)
+        except IntegrityError:
+            # Another recorder appended some of these trades meanwhile;
+            # they are skipped on the second pass
+            if attempt:
+                raise
+
+
+def _record(points):
+    known = set(
+        PricePoint.objects.filter(transaction_id__in=[point.transaction_id for point in points])
+        .values_list('transaction_id', flat=True)
+    )
+    points = [point for point in points if point.transaction_id not in known]
+    if not points:
+        return 0
+    PricePoint.objects.bulk_create(points)
+    _merge(_summarize(points))
+    return len(points)
+
+
+def _summarize(points):
+    """Candles of ``points`` alone, keyed by ``(player_id, period, period_start)``"""
+    candles = {}
+    for point in sorted(points, key=lambda point: point.traded_at):
+        price, moment = point.price, point.traded_at
+        for period in PERIODS:
+            key = (point.player_id, period, period_start(moment, period))
+            candle = candles.get(key)
+            if candle is None:
+                candles[key] = PriceCandle(
+                    player_id=key[0], period=period, period_start=key[2],
+                    open=price, high=price, low=price, close=price,
+                    opened_at=moment, closed_at=moment, trades=1, turnover=price
+                )
+            else:
+                candle.high, candle.low = max(candle.high, price), min(candle.low, price)
+                candle.close, candle.closed_at = price, moment
+                candle.trades += 1
+                candle.turnover += price
+    return candles
+
+
+def _merge(candles):
+    """Fold summarized candles into the stored ones, under row locks"""
+    keys = sorted(candles)
+    # Empty candles at the opening trade merge into the same result as a
+    # fresh one, so missing rows can be created up front and every candle
+    # is then locked and updated the same way
+    PriceCandle.objects.bulk_create([
+        PriceCandle(
+            player_id=candle.player_id, period=candle.period, period_start=candle.period_start,
+            open=candle.open, high=candle.open, low=candle.open, close=candle.open,
+            opened_at=candle.opened_at, closed_at=candle.opened_at, trades=0
+        )
+        for candle in (candles[key] for key in keys)
+    ], ignore_conflicts=True)
+
+    # One term per period keeps the statement small however many candles a
+    # chunk touches; it may also match other candles of the same players,
+    # which are locked alongside but left unchanged
+    selection = Q()
+    for period in PERIODS:
+        period_keys = [key for key in keys if key[1] == period]
+        if period_keys:
+            selection |= Q(
+                period=period,
+                player_id__in={player_id for player_id, _, _ in period_keys},
+                period_start__in={start for _, _, start in period_keys}
+            )
+    # Locked in key order, like the rows created above, so concurrent
+    # recorders never deadlock
+    stored = [
+        candle
+        for candle in PriceCandle.objects.select_for_update().filter(selection)
+        .order_by('player_id', 'period', 'period_start')
+        if (candle.player_id, candle.period, candle.period_start) in candles
+    ]
+    for candle in stored:
+        update = candles[candle.player_id, candle.period, candle.period_start]
+        if update.opened_at < candle.opened_at:
+            candle.open, candle.opened_at = update.open, update.opened_at
+        if update.closed_at >= candle.closed_at:
+            candle.close, candle.closed_at = update.close, update.closed_at
+        candle.high, candle.low = max(candle.high, update.high), min(candle.low, update.low)
+        candle.trades += update.trades
+        candle.turnover += update.turnover
+    # Written back as an upsert of the locked rows: one INSERT statement
+    # instead of the per-row CASE expressions of bulk_update()
+    PriceCandle.objects.bulk_create(
+        stored, update_conflicts=True, unique_fields=['player', 'period', 'period_start'], update_fields=CANDLE_FIELDS
+    )
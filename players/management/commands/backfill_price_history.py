@@ -0,0 +1,65 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from players.history import record
+from players.models import PricePoint
+from transactions.export import parse_bound
+from transactions.models import Transaction
+
+
+class Command(BaseCommand):
+    """Build the player price history from the transaction ledger"""
+    help = (
+        'Append every active transaction to the price history and its daily and weekly candles, '
+        'oldest first, one chunk per transaction. Trades already recorded are skipped, so the '
+        'command can be rerun or interrupted at any point, even while the outbox worker runs. '
+        '--since is inclusive and --until exclusive; both take ISO dates or datetimes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only transactions at or after this date')
+        parser.add_argument('--until', help='Only transactions before this date')
+        parser.add_argument('--chunk-size', type=int, help='Transactions per chunk (default: EXPORT_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_bound(options['since']) if options['since'] else None
+            until = parse_bound(options['until']) if options['until'] else None
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        chunk_size = options['chunk_size'] or settings.EXPORT_CHUNK_SIZE
+        if chunk_size < 1:
+            raise CommandError('--chunk-size must be positive')
+
+        transactions = Transaction.objects.filter(is_active=True)
+        if since is not None:
+            transactions = transactions.filter(created_at__gte=since)
+        if until is not None:
+            transactions = transactions.filter(created_at__lt=until)
+
+        started = time.perf_counter()
+        scanned, recorded, last_pk = 0, 0, 0
+        while True:
+            # Keyset pagination: each chunk is one indexed range read,
+            # however far into the ledger it is
+            rows = list(
+                transactions.filter(pk__gt=last_pk)
+                .order_by('pk')
+                .values_list('pk', 'player_id', 'transfer_amount', 'created_at')[:chunk_size]
+            )
+            if not rows:
+                break
+            last_pk = rows[-1][0]
+            scanned += len(rows)
+            recorded += record([
+                PricePoint(transaction_id=pk, player_id=player_id, price=amount, traded_at=created_at)
+                for pk, player_id, amount, created_at in rows
+            ])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'Scanned {scanned} transactions ({scanned / elapsed:.0f}/s)', ending='\r')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'Recorded {recorded} of {scanned} transactions scanned in {elapsed:.1f}s; '
+            f'{scanned - recorded} were already in the history'
+        )
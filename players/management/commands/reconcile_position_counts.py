@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from players.models import PositionCount
+from teams.models import Team
+
+
+class Command(BaseCommand):
+    """Verify the per-position squad counters against the players table"""
+    help = (
+        'Check the PositionCount rows used by the squad rules against the players of every '
+        'team, a chunk of teams at a time, optionally repairing them'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Recompute the counters of mismatched teams')
+        parser.add_argument('--show', type=int, default=10, help='Number of mismatched counters to list')
+        parser.add_argument('--chunk-size', type=int, default=10_000, help='Teams compared per round of queries')
+
+    def handle(self, *args, **options):
+        stale_team_ids, shown, last_pk = [], 0, 0
+        while True:
+            team_ids = list(
+                Team.objects.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:options['chunk_size']]
+            )
+            if not team_ids:
+                break
+            last_pk = team_ids[-1]
+
+            stored = PositionCount.objects.for_teams(team_ids)
+            actual = PositionCount.objects.actual(team_ids)
+            stale = set()
+            for team_id, position in sorted(stored.keys() | actual.keys()):
+                stored_count = stored.get((team_id, position), 0)
+                actual_count = actual.get((team_id, position), 0)
+                if stored_count == actual_count:
+                    continue
+                stale.add(team_id)
+                if shown < options['show']:
+                    shown += 1
+                    self.stdout.write(f'Team {team_id} {position}: stored {stored_count}, actual {actual_count}')
+            stale_team_ids.extend(sorted(stale))
+
+        if not stale_team_ids:
+            self.stdout.write(self.style.SUCCESS('All position counts are consistent'))
+            return
+
+        if not options['fix']:
+            raise CommandError(
+                f'{len(stale_team_ids)} team(s) have stale position counts; rerun with --fix to repair'
+            )
+
+        fixed = 0
+        for start in range(0, len(stale_team_ids), options['chunk_size']):
+            chunk = stale_team_ids[start:start + options['chunk_size']]
+            with transaction.atomic():
+                # Transfers adjust the counters under these locks, so none is
+                # lost between counting the players and writing the counts
+                locked = list(
+                    Team.objects.select_for_update().filter(pk__in=chunk).order_by('pk').values_list('pk', flat=True)
+                )
+                fixed += PositionCount.objects.recompute(locked)
+        self.stdout.write(self.style.SUCCESS(f'Recomputed position counts for {fixed} team(s)'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from players.pricing import PriceEngine
+
+
+class Command(BaseCommand):
+    """Revalue every player from recent market activity"""
+    help = (
+        'Recompute all player values from their trades, their position and the transfer '
+        'market (see PRICE_ENGINE) and write them back in chunks, keeping team values in step. '
+        'Safe to run while the API is serving: each chunk is applied to the current values.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Compute and report without writing')
+        parser.add_argument('--window-days', type=int, help='Days of trades to consider')
+        parser.add_argument('--chunk-size', type=int, help='Players written per transaction')
+
+    def handle(self, *args, **options):
+        for option in ('window_days', 'chunk_size'):
+            if options[option] is not None and options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} must be positive")
+
+        engine = PriceEngine(window_days=options['window_days'], chunk_size=options['chunk_size'])
+        stats = engine.revalue(dry_run=options['dry_run'])
+
+        prefix = 'Would revalue' if options['dry_run'] else 'Revalued'
+        self.stdout.write(
+            f"{prefix} {stats['players']} players: {stats['changed']} changed "
+            f"({stats['raised']} up, {stats['lowered']} down), total value {stats['value_delta']:+}"
+        )
+        self.stdout.write(
+            f"load {stats['load_seconds']:.2f}s, compute {stats['compute_seconds']:.2f}s, "
+            f"write {stats['write_seconds']:.2f}s"
+        )
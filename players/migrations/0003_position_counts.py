@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:09
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def populate_position_counts(apps, schema_editor):
+    Player = apps.get_model('players', 'Player')
+    PositionCount = apps.get_model('players', 'PositionCount')
+    rows = (
+        Player.objects.order_by()
+        .values_list('team_id', 'position')
+        .annotate(count=Count('pk'))
+        .iterator(chunk_size=5000)
+    )
+    batch = []
+    for team_id, position, count in rows:
+        batch.append(PositionCount(team_id=team_id, position=position, count=count))
+        if len(batch) == 5000:
+            PositionCount.objects.bulk_create(batch)
+            batch = []
+    PositionCount.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0003_leaderboards'),
+        ('players', '0002_player_players_position_value_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.CharField(choices=[('GK', 'Goalkeeper'), ('DF', 'Defender'), ('MF', 'Midfielder'), ('AT', 'Attacker')], max_length=2)),
+                ('count', models.IntegerField(default=0)),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='position_counts', to='teams.team')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='positioncount',
+            constraint=models.UniqueConstraint(fields=('team', 'position'), name='players_position_count_unique'),
+        ),
+        migrations.RunPython(populate_position_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:21
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0002_ledgerentry'),
+        ('players', '0003_position_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceCandle',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('day', 'Day'), ('week', 'Week')], max_length=4)),
+                ('period_start', models.DateField()),
+                ('open', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('high', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('low', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('close', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('opened_at', models.DateTimeField()),
+                ('closed_at', models.DateTimeField()),
+                ('trades', models.PositiveIntegerField(default=0)),
+                ('turnover', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_candles', to='players.player')),
+            ],
+            options={
+                'ordering': ['period_start'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PricePoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('value', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('traded_at', models.DateTimeField()),
+                ('player', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='price_points', to='players.player')),
+                ('transaction', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='price_point', to='transactions.transaction')),
+            ],
+            options={
+                'ordering': ['traded_at', 'id'],
+                'indexes': [models.Index(fields=['player', 'traded_at'], name='players_price_point_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='pricecandle',
+            constraint=models.UniqueConstraint(fields=('player', 'period', 'period_start'), name='players_price_candle_unique'),
+        ),
+    ]
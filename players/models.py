@@ -1,27 +1,231 @@
-from django.db import models
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import models, transaction
+from django.db.models import F, Q
 from teams.models import Team
 
 
 class Player(models.Model):
     """Player model representing a player in the game"""
-    
+
     POSITION_CHOICES = [
         ('GK', 'Goalkeeper'),
         ('DF', 'Defender'),
         ('MF', 'Midfielder'),
         ('AT', 'Attacker'),
     ]
-    
+
     team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='players')
     name = models.CharField(max_length=100)
     position = models.CharField(max_length=2, choices=POSITION_CHOICES)
     value = models.DecimalField(max_digits=10, decimal_places=2)
-    
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['position', 'name']
+        indexes = [
+            models.Index(fields=['position', 'value'], name='players_position_value_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_team_value()
+        return instance
+
+    def _remember_team_value(self):
+        """Remember the team, value and position last persisted, to compute deltas"""
+        loaded = self.__dict__
+        if 'team_id' in loaded and 'value' in loaded and 'position' in loaded:
+            self._persisted_team_value = (loaded['team_id'], loaded['value'], loaded['position'])
+        else:
+            self._persisted_team_value = None
+
+    def save(self, *args, **kwargs):
+        """Save the player and apply the change to the team aggregates and position counts"""
+        self.value = Decimal(str(self.value)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        adding = self._state.adding
+
+        with transaction.atomic():
+            previous = None
+            if not adding:
+                previous = getattr(self, '_persisted_team_value', None)
+                if previous is None:
+                    # Loaded with deferred fields, so read the stored state
+                    previous = (
+                        Player.objects.filter(pk=self.pk).values_list('team_id', 'value', 'position').first()
+                    )
+
+            super().save(*args, **kwargs)
+
+            if previous is None:
+                Team.objects.filter(pk=self.team_id).adjust_total_value(self.value)
+                PositionCount.objects.adjust({(self.team_id, self.position): 1})
+            else:
+                previous_team_id, previous_value, previous_position = previous
+                if previous_team_id != self.team_id:
+                    Team.objects.filter(pk=previous_team_id).adjust_total_value(-previous_value)
+                    Team.objects.filter(pk=self.team_id).adjust_total_value(self.value)
+                elif self.value != previous_value:
+                    Team.objects.filter(pk=self.team_id).adjust_total_value(self.value - previous_value)
+                if (previous_team_id, previous_position) != (self.team_id, self.position):
+                    PositionCount.objects.adjust({
+                        (previous_team_id, previous_position): -1,
+                        (self.team_id, self.position): 1,
+                    })
+
+        self._remember_team_value()
+
+    def delete(self, *args, **kwargs):
+        """Delete the player and remove it from the team aggregates"""
+        team_id = self.team_id
+        with transaction.atomic():
+            result = super().delete(*args, **kwargs)
+            Team.objects.filter(pk=team_id).recompute_total_value()
+            PositionCount.objects.recompute([team_id])
+        return result
 
     def __str__(self):
         return f"{self.name} ({self.get_position_display()}) - {self.team.name}"
+
+
+class PositionCountQuerySet(models.QuerySet):
+    """QuerySet with relative maintenance of the per-position squad counters"""
+
+    def adjust(self, deltas):
+        """
+        Apply ``{(team_id, position): delta}`` to the counters.
+
+        Missing counter rows are created first, then one relative UPDATE
+        is issued per distinct delta, so no row is read.
+        """
+        deltas = {key: delta for key, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        self.bulk_create(
+            [PositionCount(team_id=team_id, position=position, count=0) for team_id, position in deltas],
+            ignore_conflicts=True
+        )
+        by_delta = defaultdict(Q)
+        for (team_id, position), delta in deltas.items():
+            by_delta[delta] |= Q(team_id=team_id, position=position)
+        for delta, keys in by_delta.items():
+            self.filter(keys).update(count=F('count') + delta)
+
+    def for_teams(self, team_ids):
+        """``{(team_id, position): count}`` for the given teams"""
+        return {
+            (team_id, position): count
+            for team_id, position, count in self.filter(team_id__in=team_ids).values_list('team_id', 'position', 'count')
+        }
+
+    def actual(self, team_ids=None):
+        """``{(team_id, position): count}`` counted from the players table"""
+        players = Player.objects.all()
+        if team_ids is not None:
+            players = players.filter(team_id__in=team_ids)
+        return {
+            (row['team_id'], row['position']): row['count']
+            for row in players.order_by().values('team_id', 'position').annotate(count=models.Count('pk'))
+        }
+
+    def recompute(self, team_ids):
+        """Recompute every counter of ``team_ids`` from the players table"""
+        team_ids = set(team_ids)
+        if not team_ids:
+            return 0
+        actual = self.actual(team_ids)
+        rows = [
+            PositionCount(team_id=team_id, position=position, count=actual.get((team_id, position), 0))
+            for team_id in team_ids
+            for position, _ in Player.POSITION_CHOICES
+        ]
+        self.bulk_create(
+            rows, update_conflicts=True, unique_fields=['team', 'position'], update_fields=['count']
+        )
+        return len(team_ids)
+
+
+class PositionCount(models.Model):
+    """
+    Number of players a team has in one position.
+
+    Maintained by ``Player.save()``, ``Player.delete()`` and the bulk
+    registration and transfer paths, so squad rules are checked against a
+    handful of rows instead of counting the squad.
+    """
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='position_counts')
+    position = models.CharField(max_length=2, choices=Player.POSITION_CHOICES)
+    count = models.IntegerField(default=0)
+
+    objects = PositionCountQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['team', 'position'], name='players_position_count_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} {self.position}: {self.count}"
+
+
+class PricePoint(models.Model):
+    """
+    One trade of a player, appended once per transaction.
+
+    The unique transaction makes recording idempotent, so the outbox handler
+    and the backfill can both replay trades safely.
+    """
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='price_points')
+    transaction = models.OneToOneField(
+        'transactions.Transaction', on_delete=models.CASCADE, related_name='price_point'
+    )
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    # The player's value right after the trade; unknown for backfilled trades
+    value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    traded_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['traded_at', 'id']
+        indexes = [
+            models.Index(fields=['player', 'traded_at'], name='players_price_point_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} at ${self.price} on {self.traded_at:%Y-%m-%d}"
+
+
+class PriceCandle(models.Model):
+    """Open, high, low and close trade price of a player over a day or a week"""
+
+    DAY = 'day'
+    WEEK = 'week'
+    PERIOD_CHOICES = [
+        (DAY, 'Day'),
+        (WEEK, 'Week'),
+    ]
+
+    player = models.ForeignKey(Player, on_delete=models.CASCADE, related_name='price_candles')
+    period = models.CharField(max_length=4, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    open = models.DecimalField(max_digits=10, decimal_places=2)
+    high = models.DecimalField(max_digits=10, decimal_places=2)
+    low = models.DecimalField(max_digits=10, decimal_places=2)
+    close = models.DecimalField(max_digits=10, decimal_places=2)
+    # Times of the opening and closing trades, so trades recorded out of
+    # order still update open and close correctly
+    opened_at = models.DateTimeField()
+    closed_at = models.DateTimeField()
+    trades = models.PositiveIntegerField(default=0)
+    turnover = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+
+    class Meta:
+        ordering = ['period_start']
+        constraints = [
+            models.UniqueConstraint(fields=['player', 'period', 'period_start'], name='players_price_candle_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.player_id} {self.period} {self.period_start}: {self.open}-{self.close}"
@@ -0,0 +1,262 @@
+"""
+Market-wide player revaluation.
+
+The engine snapshots every player's position and value, the trades of the
+recent window and the active listings into NumPy arrays and computes one
+price factor per player in a handful of vectorized operations:
+
+- player demand: players bought repeatedly in the window gain value
+- position demand: positions traded more than their share of the player
+  pool gain value, the others lose it
+- supply: players sitting on the transfer market lose a little value
+- price discovery: traded players move toward their average transfer price
+
+The factors are then applied chunk by chunk to the *current* values of the
+locked player rows, so purchases committed meanwhile are never overwritten,
+and each chunk adjusts its teams' ``total_team_value`` by the exact deltas
+in the same transaction.
+"""
+import time
+from datetime import timedelta
+from decimal import Decimal
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, BigIntegerField, Count, F
+from django.db.models.functions import Cast, Round
+from django.utils import timezone
+from teams.models import Team
+from transactions.models import Transaction
+from transfers.cache import invalidate_market
+from transfers.models import TransferListing
+from .models import Player
+
+POSITIONS = [code for code, _ in Player.POSITION_CHOICES]
+# Largest value Player.value (10 digits, 2 decimal places) can hold, in cents
+MAX_VALUE_CENTS = 10 ** 10 - 1
+
+
+def _cents(field):
+    return Cast(Round(F(field) * 100), BigIntegerField())
+
+
+class MarketSnapshot:
+    """Arrays of the inputs to a revaluation, aligned on ``player_ids``"""
+
+    def __init__(self, player_ids, positions, values, trades, average_prices, listed):
+        self.player_ids = player_ids
+        self.positions = positions
+        self.values = values
+        self.trades = trades
+        self.average_prices = average_prices
+        self.listed = listed
+
+    def __len__(self):
+        return len(self.player_ids)
+
+    @classmethod
+    def load(cls, since, chunk_size):
+        """Read players, trades since ``since`` and active listings"""
+        rows = (
+            Player.objects.order_by('pk')
+            .values_list('pk', 'position', _cents('value'))
+            .iterator(chunk_size=chunk_size)
+        )
+        position_codes = {code: index for index, code in enumerate(POSITIONS)}
+        player_ids, positions, values = [], [], []
+        for pk, position, cents in rows:
+            player_ids.append(pk)
+            positions.append(position_codes[position])
+            values.append(cents)
+        player_ids = np.array(player_ids, dtype=np.int64)
+
+        trades = np.zeros(len(player_ids), dtype=np.float64)
+        average_prices = np.zeros(len(player_ids), dtype=np.float64)
+        traded = (
+            Transaction.objects.filter(is_active=True, created_at__gte=since)
+            .order_by()
+            .values('player_id')
+            .annotate(trades=Count('id'), average_price=Avg(_cents('transfer_amount')))
+            .values_list('player_id', 'trades', 'average_price')
+        )
+        traded = list(traded)
+        if traded:
+            traded_ids, counts, prices = zip(*traded)
+            index = cls._index(player_ids, traded_ids)
+            found = index >= 0
+            trades[index[found]] = np.array(counts, dtype=np.float64)[found]
+            average_prices[index[found]] = np.array(prices, dtype=np.float64)[found]
+
+        listed = np.zeros(len(player_ids), dtype=bool)
+        listed_ids = list(TransferListing.objects.filter(is_active=True).values_list('player_id', flat=True))
+        if listed_ids:
+            index = cls._index(player_ids, listed_ids)
+            listed[index[index >= 0]] = True
+
+        return cls(
+            player_ids,
+            np.array(positions, dtype=np.int64),
+            np.array(values, dtype=np.float64),
+            trades,
+            average_prices,
+            listed,
+        )
+
+    @staticmethod
+    def _index(sorted_ids, ids):
+        """Positions of ``ids`` in ``sorted_ids``, -1 where missing"""
+        ids = np.asarray(ids, dtype=np.int64)
+        index = np.searchsorted(sorted_ids, ids)
+        index[index >= len(sorted_ids)] = 0
+        missing = sorted_ids[index] != ids if len(sorted_ids) else np.ones(len(ids), dtype=bool)
+        index[missing] = -1
+        return index
+
+
+class PriceEngine:
+    """Computes and applies a market-wide revaluation"""
+
+    def __init__(self, **overrides):
+        config = dict(settings.PRICE_ENGINE)
+        config.update({key.upper(): value for key, value in overrides.items() if value is not None})
+        self.config = config
+
+    def factors(self, snapshot):
+        """Multiplicative value change per player, within +/- MAX_CHANGE"""
+        config = self.config
+        count = len(snapshot)
+        if not count:
+            return np.ones(0)
+
+        drift = config['DEMAND_WEIGHT'] * np.tanh(snapshot.trades / config['DEMAND_SCALE'])
+
+        total_trades = snapshot.trades.sum()
+        if total_trades:
+            slots = len(POSITIONS)
+            trade_share = np.bincount(snapshot.positions, weights=snapshot.trades, minlength=slots) / total_trades
+            pool_share = np.bincount(snapshot.positions, minlength=slots) / count
+            with np.errstate(divide='ignore', invalid='ignore'):
+                position_index = np.where(pool_share > 0, trade_share / pool_share - 1, 0.0)
+            drift += config['POSITION_WEIGHT'] * np.tanh(position_index)[snapshot.positions]
+
+        drift -= config['LISTING_DISCOUNT'] * snapshot.listed
+
+        traded = snapshot.trades > 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            premium = np.where(traded & (snapshot.values > 0), snapshot.average_prices / snapshot.values - 1, 0.0)
+        drift += config['DISCOVERY_WEIGHT'] * np.clip(premium, -1.0, 1.0)
+
+        return 1.0 + np.clip(drift, -config['MAX_CHANGE'], config['MAX_CHANGE'])
+
+    def revalue(self, dry_run=False, now=None):
+        """Revalue every player; returns a dict of statistics and timings"""
+        now = now or timezone.now()
+        since = now - timedelta(days=self.config['WINDOW_DAYS'])
+        chunk_size = self.config['CHUNK_SIZE']
+        stats = {'players': 0, 'changed': 0, 'raised': 0, 'lowered': 0, 'value_delta': Decimal('0.00')}
+
+        started = time.perf_counter()
+        snapshot = MarketSnapshot.load(since, chunk_size)
+        stats['players'] = len(snapshot)
+        stats['load_seconds'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        factors = self.factors(snapshot)
+        stats['compute_seconds'] = time.perf_counter() - started
+
+        started = time.perf_counter()
+        if dry_run:
+            new_values = self._new_values(snapshot.values, factors)
+            self._count_changes(stats, snapshot.values.astype(np.int64), new_values)
+        else:
+            for start in range(0, len(snapshot), chunk_size):
+                self._apply_chunk(
+                    snapshot.player_ids[start:start + chunk_size],
+                    factors[start:start + chunk_size],
+                    now,
+                    stats,
+                )
+            if stats['changed']:
+                invalidate_market()
+        stats['write_seconds'] = time.perf_counter() - started
+        return stats
+
+    def _new_values(self, cents, factors):
+        minimum = int(self.config['MIN_VALUE'] * 100)
+        new_values = np.rint(np.asarray(cents, dtype=np.float64) * factors)
+        return np.clip(new_values, minimum, MAX_VALUE_CENTS).astype(np.int64)
+
+    def _count_changes(self, stats, old_values, new_values):
+        delta = new_values - old_values
+        stats['changed'] += int(np.count_nonzero(delta))
+        stats['raised'] += int(np.count_nonzero(delta > 0))
+        stats['lowered'] += int(np.count_nonzero(delta < 0))
+        stats['value_delta'] += Decimal(int(delta.sum())).scaleb(-2)
+        return delta
+
+    def _apply_chunk(self, player_ids, factors, now, stats):
+        with transaction.atomic():
+            # Lock in primary key order and re-read, so purchases that landed
+            # since the snapshot are compounded rather than overwritten
+            rows = list(
+                Player.objects.select_for_update()
+                .filter(pk__in=player_ids.tolist())
+                .order_by('pk')
+                .values_list('pk', 'team_id', _cents('value'))
+            )
+            if not rows:
+                return
+            current = np.array(rows, dtype=np.int64)
+            ids, team_ids, old_values = current[:, 0], current[:, 1], current[:, 2]
+
+            # Players deleted since the snapshot are skipped
+            chunk_factors = factors[np.searchsorted(player_ids, ids)]
+            new_values = self._new_values(old_values, chunk_factors)
+            delta = self._count_changes(stats, old_values, new_values)
+            changed = delta != 0
+            if not changed.any():
+                return
+
+            _write_player_values(ids[changed], new_values[changed], now)
+            teams, inverse = np.unique(team_ids[changed], return_inverse=True)
+            team_deltas = np.bincount(inverse, weights=delta[changed]).astype(np.int64)
+            _adjust_team_values(teams[team_deltas != 0], team_deltas[team_deltas != 0], now)
+
+
+def _write_player_values(ids, cents, now):
+    if connection.vendor == 'postgresql':
+        # One statement per chunk, joining the new values in as arrays
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Player._meta.db_table} AS p '
+                'SET value = v.cents::numeric / 100, updated_at = %s '
+                'FROM unnest(%s::bigint[], %s::bigint[]) AS v(id, cents) '
+                'WHERE p.id = v.id',
+                [now, ids.tolist(), cents.tolist()]
+            )
+        return
+    # executemany() of one keyed UPDATE beats bulk_update()'s CASE per row
+    updated_at = connection.ops.adapt_datetimefield_value(now)
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'UPDATE {Player._meta.db_table} SET value = %s, updated_at = %s WHERE id = %s',
+            [
+                (connection.ops.adapt_decimalfield_value(Decimal(value).scaleb(-2)), updated_at, pk)
+                for pk, value in zip(ids.tolist(), cents.tolist())
+            ]
+        )
+
+
+def _adjust_team_values(team_ids, cents, now):
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {Team._meta.db_table} AS t '
+                'SET total_team_value = t.total_team_value + v.cents::numeric / 100, updated_at = %s '
+                'FROM unnest(%s::bigint[], %s::bigint[]) AS v(id, cents) '
+                'WHERE t.id = v.id',
+                [now, team_ids.tolist(), cents.tolist()]
+            )
+        return
+    for team_id, delta in zip(team_ids.tolist(), cents.tolist()):
+        Team.objects.filter(pk=team_id).adjust_total_value(Decimal(delta).scaleb(-2))
@@ -0,0 +1,34 @@
+"""
+Render ``values()`` rows in the shape of the player serializers.
+"""
+from core.rows import render_decimal
+from .models import Player
+
+POSITION_DISPLAY = dict(Player.POSITION_CHOICES)
+
+
+def player_values(prefix=''):
+    """``values()`` names needed to render the player at ``prefix``"""
+    return [
+        f'{prefix}{name}'
+        for name in ('id', 'name', 'position', 'value', 'team_id', 'team__name')
+    ]
+
+
+def render_player(row, prefix=''):
+    """Same output as ``PlayerSerializer``"""
+    position = row[f'{prefix}position']
+    return {
+        'id': row[f'{prefix}id'],
+        'name': row[f'{prefix}name'],
+        'position': position,
+        'position_display': POSITION_DISPLAY.get(position, position),
+        'value': render_decimal(row[f'{prefix}value']),
+        'team': row[f'{prefix}team_id'],
+        'team_name': row[f'{prefix}team__name'],
+    }
+
+
+def render_players(rows):
+    """Render a page of player rows"""
+    return [render_player(row) for row in rows]
@@ -1,8 +1,10 @@
+from django.conf import settings
 from rest_framework import serializers
-from .models import Player
+from core.instrumentation import TimedSerializerMixin
+from .models import Player, PriceCandle
 
 
-class PlayerSerializer(serializers.ModelSerializer):
+class PlayerSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Player model"""
     position_display = serializers.CharField(source='get_position_display', read_only=True)
     team_name = serializers.CharField(source='team.name', read_only=True)
@@ -11,3 +13,21 @@ class PlayerSerializer(serializers.ModelSerializer):
         model = Player
         fields = ('id', 'name', 'position', 'position_display', 'value', 'team', 'team_name')
         read_only_fields = ('value', 'team')
+
+
+class PriceCandleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for one candle of a price chart"""
+
+    class Meta:
+        model = PriceCandle
+        fields = ('period_start', 'open', 'high', 'low', 'close', 'trades', 'turnover')
+
+
+class PriceHistoryQuerySerializer(serializers.Serializer):
+    """Query parameters of a price chart"""
+    period = serializers.ChoiceField(choices=PriceCandle.PERIOD_CHOICES, default=PriceCandle.DAY)
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1, max_value=settings.PRICE_HISTORY_MAX_CANDLES, default=settings.PRICE_HISTORY_MAX_CANDLES
+    )
@@ -0,0 +1,58 @@
+"""
+Squad composition rules.
+
+``SQUAD_RULES`` bounds how many players a team may hold in each position
+and in total. Transfers check a move against the team's ``PositionCount``
+rows, at most one per position, so the cost of a check does not grow with
+the squad. ``python manage.py reconcile_position_counts`` verifies the
+counters against the players table.
+"""
+from django.conf import settings
+from .models import Player
+
+POSITION_NAMES = {
+    'GK': 'goalkeepers',
+    'DF': 'defenders',
+    'MF': 'midfielders',
+    'AT': 'attackers',
+}
+
+
+class SquadRules:
+    """Per-position minimums and maximums and a squad size limit"""
+
+    def __init__(self, positions=None, max_squad_size=None):
+        rules = settings.SQUAD_RULES
+        self.positions = positions if positions is not None else rules['POSITIONS']
+        self.max_squad_size = max_squad_size if max_squad_size is not None else rules['MAX_SQUAD_SIZE']
+
+    def limits(self, position):
+        """``(minimum, maximum)`` for ``position``; a missing bound is None"""
+        return self.positions.get(position, (0, None))
+
+    def transfer_violation(self, counts, buyer_team_id, seller_team_id, position):
+        """
+        Why a player in ``position`` may not move from the seller to the
+        buyer, or None when the move is allowed.
+
+        ``counts`` is ``{(team_id, position): count}`` covering both teams,
+        as returned by ``PositionCount.objects.for_teams()``; a missing
+        counter counts as zero.
+        """
+        minimum, maximum = self.limits(position)
+        name = POSITION_NAMES.get(position, position)
+        if maximum is not None and counts.get((buyer_team_id, position), 0) >= maximum:
+            return f'Your squad already has the maximum of {maximum} {name}'
+        if self.max_squad_size is not None:
+            squad_size = sum(counts.get((buyer_team_id, code), 0) for code, _ in Player.POSITION_CHOICES)
+            if squad_size >= self.max_squad_size:
+                return f'Your squad already has the maximum of {self.max_squad_size} players'
+        if minimum and counts.get((seller_team_id, position), 0) <= minimum:
+            return f'The selling team must keep at least {minimum} {name}'
+        return None
+
+    @staticmethod
+    def apply(counts, buyer_team_id, seller_team_id, position):
+        """Record an allowed move in ``counts``, for checking the next one"""
+        counts[buyer_team_id, position] = counts.get((buyer_team_id, position), 0) + 1
+        counts[seller_team_id, position] = counts.get((seller_team_id, position), 0) - 1
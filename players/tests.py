@@ -0,0 +1,238 @@
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+from decimal import Decimal
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from outbox.models import OutboxEvent
+from outbox.services import OutboxWorker
+from teams.models import Team
+from players.history import record
+from players.models import Player, PositionCount, PriceCandle, PricePoint
+from players.pricing import PriceEngine
+from transactions.models import Transaction
+from transfers.models import TransferListing
+from transfers.services import TransferEngine
+
+User = get_user_model()
+
+
+class PriceEngineTests(TestCase):
+    """Test the market-wide player revaluation"""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        self.team1 = Team.objects.create(user=self.seller, name='Team 1', capital=Decimal('5000000.00'))
+        self.team2 = Team.objects.create(user=self.buyer, name='Team 2', capital=Decimal('5000000.00'))
+        self.traded = self.create_player(self.team2, 'Traded', 'AT')
+        self.listed = self.create_player(self.team1, 'Listed', 'DF')
+        self.idle = self.create_player(self.team1, 'Idle', 'GK')
+
+    def create_player(self, team, name, position, value='1000000.00'):
+        return Player.objects.create(team=team, name=name, position=position, value=Decimal(value))
+
+    def trade(self, player, amount):
+        Transaction.objects.create(
+            buyer=self.buyer,
+            seller=self.seller,
+            player=player,
+            transfer_amount=Decimal(amount)
+        )
+
+    def test_revaluation_follows_demand_and_supply(self):
+        """Test traded players rise, listed players fall and team values follow"""
+        self.trade(self.traded, '1200000.00')
+        self.trade(self.traded, '1200000.00')
+        TransferListing.objects.create(player=self.listed, asking_price=Decimal('900000.00'))
+
+        stats = PriceEngine().revalue()
+
+        for player in (self.traded, self.listed, self.idle):
+            player.refresh_from_db()
+        self.assertGreater(self.traded.value, Decimal('1000000.00'))
+        self.assertLess(self.listed.value, Decimal('1000000.00'))
+        self.assertEqual(stats['players'], 3)
+        self.assertFalse(Team.objects.with_stale_total_value().exists())
+
+    def test_change_is_capped(self):
+        """Test no player moves by more than MAX_CHANGE in one revaluation"""
+        for _ in range(5):
+            self.trade(self.traded, '9000000.00')
+
+        PriceEngine(max_change=0.05).revalue()
+
+        self.traded.refresh_from_db()
+        self.assertEqual(self.traded.value, Decimal('1050000.00'))
+
+    def test_values_are_applied_to_current_rows(self):
+        """Test changes made after the snapshot are compounded, not overwritten"""
+        self.trade(self.traded, '1200000.00')
+        engine = PriceEngine()
+        original_apply = engine._apply_chunk
+
+        def apply_after_purchase(*args):
+            Player.objects.filter(pk=self.traded.pk).update(value=Decimal('2000000.00'))
+            Team.objects.filter(pk=self.team2.pk).adjust_total_value(Decimal('1000000.00'))
+            return original_apply(*args)
+
+        engine._apply_chunk = apply_after_purchase
+        engine.revalue()
+
+        self.traded.refresh_from_db()
+        self.assertGreater(self.traded.value, Decimal('2000000.00'))
+        self.assertFalse(Team.objects.with_stale_total_value().exists())
+
+    def test_dry_run_writes_nothing(self):
+        """Test the command's dry run reports changes without saving them"""
+        self.trade(self.traded, '1500000.00')
+        out = StringIO()
+
+        call_command('revalue_players', '--dry-run', stdout=out)
+
+        self.traded.refresh_from_db()
+        self.assertEqual(self.traded.value, Decimal('1000000.00'))
+        self.assertIn('Would revalue 3 players', out.getvalue())
+
+
+class PositionCountTests(TestCase):
+    """Test the per-position squad counters and their reconciliation"""
+
+    def setUp(self):
+        user = User.objects.create_user(username='owner', email='owner@test.com', password='Pass123')
+        other = User.objects.create_user(username='other', email='other@test.com', password='Pass123')
+        self.team = Team.objects.create(user=user, name='Team', capital=Decimal('5000000.00'))
+        self.other_team = Team.objects.create(user=other, name='Other', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(team=self.team, name='Keeper', position='GK', value=Decimal('1000000.00'))
+
+    def counts(self):
+        return PositionCount.objects.for_teams([self.team.pk, self.other_team.pk])
+
+    def test_save_and_delete_maintain_counters(self):
+        """Test that creating, moving, repositioning and deleting a player adjust the counters"""
+        self.assertEqual(self.counts(), {(self.team.pk, 'GK'): 1})
+
+        self.player.team = self.other_team
+        self.player.save()
+        self.player.position = 'DF'
+        self.player.save()
+        self.assertEqual(self.counts(), {
+            (self.team.pk, 'GK'): 0, (self.other_team.pk, 'GK'): 0, (self.other_team.pk, 'DF'): 1,
+        })
+
+        self.player.delete()
+        self.assertEqual(self.counts()[self.other_team.pk, 'DF'], 0)
+
+    def test_reconcile_reports_and_fixes_counters(self):
+        """Test that the reconciliation command finds and repairs drifted counters"""
+        PositionCount.objects.filter(team=self.team).update(count=5)
+        Player.objects.bulk_create([Player(team=self.other_team, name='Bulk', position='AT', value=Decimal('1.00'))])
+
+        out = StringIO()
+        with self.assertRaisesMessage(CommandError, '2 team(s) have stale position counts'):
+            call_command('reconcile_position_counts', stdout=out)
+        self.assertIn(f'Team {self.team.pk} GK: stored 5, actual 1', out.getvalue())
+
+        call_command('reconcile_position_counts', '--fix', stdout=StringIO())
+        self.assertEqual(self.counts()[self.team.pk, 'GK'], 1)
+        self.assertEqual(self.counts()[self.other_team.pk, 'AT'], 1)
+        call_command('reconcile_position_counts', stdout=StringIO())
+
+
+class PriceHistoryTests(TestCase):
+    """Test the price history and its OHLC rollups"""
+
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        self.team1 = Team.objects.create(user=self.seller, name='Team 1', capital=Decimal('5000000.00'))
+        self.team2 = Team.objects.create(user=self.buyer, name='Team 2', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(team=self.team1, name='Striker', position='AT', value=Decimal('1000.00'))
+
+    def trade(self, amount, year, month, day, hour=12):
+        purchase = Transaction.objects.create(
+            buyer=self.buyer, seller=self.seller, player=self.player, transfer_amount=Decimal(amount)
+        )
+        traded_at = datetime(year, month, day, hour, tzinfo=dt_timezone.utc)
+        Transaction.objects.filter(pk=purchase.pk).update(created_at=traded_at)
+        return PricePoint(transaction=purchase, player=self.player, price=Decimal(amount), traded_at=traded_at)
+
+    def candle(self, period):
+        return PriceCandle.objects.filter(player=self.player, period=period).values(
+            'period_start', 'open', 'high', 'low', 'close', 'trades', 'turnover'
+        ).get()
+
+    def test_purchase_is_recorded_once_by_outbox_handler(self):
+        """Test that a completed transfer reaches the history and replays are skipped"""
+        listing = TransferListing.objects.create(player=self.player, asking_price=Decimal('1500.00'))
+        purchase = TransferEngine.purchase(listing.pk, self.buyer)
+
+        OutboxWorker().process_batch()
+        OutboxEvent.objects.update(processed_at=None)
+        OutboxWorker().process_batch()
+
+        point = PricePoint.objects.get()
+        self.assertEqual((point.transaction_id, point.price), (purchase.pk, Decimal('1500.00')))
+        self.player.refresh_from_db()
+        self.assertEqual(point.value, self.player.value)
+        self.assertEqual(self.candle('day')['trades'], 1)
+        self.assertEqual(self.candle('week')['close'], Decimal('1500.00'))
+
+    def test_candles_merge_trades_in_any_order(self):
+        """Test OHLC values when trades are recorded out of time order"""
+        late = self.trade('200.00', 2026, 3, 4, hour=15)
+        record([late])
+        record([self.trade('100.00', 2026, 3, 4, hour=9), self.trade('50.00', 2026, 3, 4, hour=18)])
+        record([self.trade('300.00', 2026, 3, 6)])
+
+        self.assertEqual(self.candle('week'), {
+            'period_start': datetime(2026, 3, 2).date(),
+            'open': Decimal('100.00'), 'high': Decimal('300.00'), 'low': Decimal('50.00'),
+            'close': Decimal('300.00'), 'trades': 4, 'turnover': Decimal('650.00'),
+        })
+        day = PriceCandle.objects.get(player=self.player, period='day', period_start='2026-03-04')
+        self.assertEqual((day.open, day.high, day.low, day.close), tuple(
+            Decimal(price) for price in ('100.00', '200.00', '50.00', '50.00')
+        ))
+        self.assertEqual(record([late]), 0)
+
+    def test_backfill_streams_transactions_idempotently(self):
+        """Test that the backfill builds the history in chunks and can be rerun"""
+        for day in range(1, 6):
+            self.trade(f'{day}00.00', 2026, 3, day)
+
+        call_command('backfill_price_history', '--chunk-size', '2', stdout=StringIO())
+        call_command('backfill_price_history', stdout=StringIO())
+
+        self.assertEqual(PricePoint.objects.count(), 5)
+        self.assertEqual(PriceCandle.objects.filter(period='day').count(), 5)
+        weeks = list(
+            PriceCandle.objects.filter(period='week').order_by('period_start').values_list('trades', 'close')
+        )
+        self.assertEqual(weeks, [(1, Decimal('100.00')), (4, Decimal('500.00'))])
+
+    def test_price_history_endpoint(self):
+        """Test that charts are read from the rollups, oldest candle first"""
+        record([self.trade(f'{day}00.00', 2026, 3, day) for day in range(1, 6)])
+        client = APIClient()
+        client.force_authenticate(user=self.buyer)
+
+        response = client.get(f'/api/players/{self.player.id}/price-history/', {'limit': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [candle['period_start'] for candle in response.data['candles']], ['2026-03-04', '2026-03-05']
+        )
+
+        response = client.get(
+            f'/api/players/{self.player.id}/price-history/', {'period': 'week', 'since': '2026-03-02'}
+        )
+        self.assertEqual(response.data['candles'][0]['open'], '200.00')
+        self.assertEqual(response.data['candles'][0]['trades'], 4)
+
+        self.assertEqual(client.get('/api/players/999999/price-history/').status_code, status.HTTP_404_NOT_FOUND)
+        response = client.get(f'/api/players/{self.player.id}/price-history/', {'period': 'month'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import PlayerViewSet
 
 router = DefaultRouter()
 router.register(r'players', PlayerViewSet, basename='player')
 
 urlpatterns = [
+    path('async/players/my-players/', async_views.my_players, name='async-players-my-players'),
     path('', include(router.urls)),
 ]
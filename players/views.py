@@ -1,22 +1,61 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from core.compact import CompactListMixin
+from core.conditional import is_not_modified, not_modified_response, set_validators
+from core.querysets import OptimizedQuerySetMixin
 from teams.models import Team
-from .models import Player
-from .serializers import PlayerSerializer
+from .models import Player, PriceCandle
+from .rows import player_values, render_players
+from .serializers import PlayerSerializer, PriceCandleSerializer, PriceHistoryQuerySerializer
 
 
-class PlayerViewSet(viewsets.ReadOnlyModelViewSet):
+class PlayerViewSet(CompactListMixin, OptimizedQuerySetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for Player operations"""
     queryset = Player.objects.all()
     serializer_class = PlayerSerializer
+    compact_values = player_values()
+    compact_renderer = staticmethod(render_players)
     
     @action(detail=False, methods=['get'], url_path='my-players')
     def my_players(self, request):
-        """Get current user's players"""
-        try:
-            players = request.user.team.players.all()
-            serializer = self.get_serializer(players, many=True)
-            return Response(serializer.data)
-        except Team.DoesNotExist:
+        """Get current user's players, honouring conditional GET headers"""
+        validators = Team.objects.filter(pk=request.user.team_id).squad_validators(
+            'my-players', request.accepted_renderer.format
+        )
+        if validators is None:
             return Response({'error': 'Team not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        team_id, etag, last_modified = validators
+        if is_not_modified(request, etag=etag, last_modified=last_modified):
+            return not_modified_response(etag=etag, last_modified=last_modified)
+        
+        players = self.get_queryset().filter(team_id=team_id)
+        serializer = self.get_serializer(players, many=True)
+        return set_validators(Response(serializer.data), etag=etag, last_modified=last_modified)
+    
+    @action(detail=True, methods=['get'], url_path='price-history')
+    def price_history(self, request, pk=None):
+        """
+        Daily or weekly OHLC candles of the player's transfer prices.
+        
+        Read from the rollups, newest ``limit`` candles in ``since``/``until``
+        (inclusive dates), returned oldest first.
+        """
+        query = PriceHistoryQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        player = self.get_object()
+        
+        candles = PriceCandle.objects.filter(player=player, period=params['period'])
+        if 'since' in params:
+            candles = candles.filter(period_start__gte=params['since'])
+        if 'until' in params:
+            candles = candles.filter(period_start__lte=params['until'])
+        candles = list(candles.order_by('-period_start')[:params['limit']])
+        candles.reverse()
+        return Response({
+            'player': player.pk,
+            'period': params['period'],
+            'candles': PriceCandleSerializer(candles, many=True).data
+        })
@@ -4,6 +4,6 @@ from .models import Team
 
 @admin.register(Team)
 class TeamAdmin(admin.ModelAdmin):
-    list_display = ('name', 'user', 'capital')
+    list_display = ('name', 'user', 'capital', 'total_team_value')
     search_fields = ('name', 'user__username')
-    readonly_fields = ('capital',)
+    readonly_fields = ('capital', 'total_team_value')
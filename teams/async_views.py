@@ -0,0 +1,24 @@
+from django.http import JsonResponse
+from core.asyncapi import async_api_view, not_modified
+from core.conditional import is_not_modified, set_validators
+from players.models import Player
+from players.rows import player_values, render_player
+from .models import Team
+from .rows import TEAM_VALUES, render_team
+
+
+@async_api_view
+async def my_team(request, user):
+    """Async variant of ``/api/teams/my-team/``"""
+    validators = await Team.objects.filter(pk=user.team_id).asquad_validators('my-team', 'json')
+    if validators is None:
+        return JsonResponse({'error': 'Team not found'}, status=404)
+
+    team_id, etag, last_modified = validators
+    if is_not_modified(request, etag=etag, last_modified=last_modified):
+        return not_modified(etag=etag, last_modified=last_modified)
+
+    team = await Team.objects.values(*TEAM_VALUES).aget(pk=team_id)
+    rows = Player.objects.filter(team_id=team_id).values(*player_values())
+    data = render_team(team, [render_player(row) async for row in rows.aiterator()])
+    return set_validators(JsonResponse(data), etag=etag, last_modified=last_modified)
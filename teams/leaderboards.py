@@ -0,0 +1,40 @@
+"""
+Leaderboards for team value, capital and transfer profit.
+
+Ranking a million teams on every request is not an option, and even with an
+index on each score "what is my rank" means counting every team above. The
+boards are therefore materialized into ``TeamRanking``: a refresh ranks all
+teams with one ``INSERT ... SELECT RANK() OVER (...)`` per board inside a
+transaction, so readers keep seeing the previous snapshot until it commits.
+The top of a board and any team's rank are then index lookups.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+from .models import Team, TeamRanking
+
+# Board -> Team column it ranks, highest first
+BOARDS = {
+    'value': 'total_team_value',
+    'capital': 'capital',
+    'profit': 'transfer_profit',
+}
+
+
+def refresh(boards=None, now=None):
+    """Rebuild ``boards`` (default: all); returns ``{board: teams ranked}``"""
+    now = now or timezone.now()
+    ranking_table = connection.ops.quote_name(TeamRanking._meta.db_table)
+    team_table = connection.ops.quote_name(Team._meta.db_table)
+    ranked = {}
+    for board in boards or BOARDS:
+        column = connection.ops.quote_name(Team._meta.get_field(BOARDS[board]).column)
+        with transaction.atomic():
+            TeamRanking.objects.board(board).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {ranking_table} (board, team_id, rank, score, computed_at) '
+                    f'SELECT %s, id, RANK() OVER (ORDER BY {column} DESC), {column}, %s FROM {team_table}',
+                    [board, connection.ops.adapt_datetimefield_value(now)]
+                )
+                ranked[board] = cursor.rowcount
+    return ranked
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from teams.models import Team
+
+
+class Command(BaseCommand):
+    """Verify the stored team value aggregate against the players table"""
+    help = 'Check Team.total_team_value against the sum of player values, optionally repairing it'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Recompute the value of mismatched teams')
+        parser.add_argument('--show', type=int, default=10, help='Number of mismatched teams to list')
+
+    def handle(self, *args, **options):
+        stale = Team.objects.with_stale_total_value()
+        mismatched = stale.count()
+
+        if not mismatched:
+            self.stdout.write(self.style.SUCCESS('All team values are consistent'))
+            return
+
+        for team in stale.order_by('pk').values('pk', 'name', 'total_team_value', 'actual_total_value')[:options['show']]:
+            self.stdout.write(
+                f"Team {team['pk']} ({team['name']}): stored {team['total_team_value']}, "
+                f"actual {team['actual_total_value']}"
+            )
+
+        if not options['fix']:
+            raise CommandError(f'{mismatched} team(s) have a stale total_team_value; rerun with --fix to repair')
+
+        fixed = Team.objects.filter(pk__in=stale.values('pk')).recompute_total_value()
+        self.stdout.write(self.style.SUCCESS(f'Recomputed total_team_value for {fixed} team(s)'))
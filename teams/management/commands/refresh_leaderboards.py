@@ -0,0 +1,33 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from teams.leaderboards import BOARDS, refresh
+
+
+class Command(BaseCommand):
+    """Rebuild the materialized leaderboards"""
+    help = (
+        'Rank every team on each leaderboard (team value, capital, transfer profit) into the '
+        'TeamRanking snapshot read by /api/teams/leaderboard/. Each board is swapped in one '
+        'transaction. Run it from cron, or with --every to keep refreshing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--board', choices=sorted(BOARDS), action='append',
+                            help='Board to refresh; repeat for several (default: all)')
+        parser.add_argument('--every', type=float, help='Refresh again after this many seconds, until interrupted')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                close_old_connections()
+                started = time.perf_counter()
+                ranked = refresh(options['board'])
+                elapsed = time.perf_counter() - started
+                summary = ', '.join(f'{board} {count}' for board, count in ranked.items())
+                self.stdout.write(f'Ranked teams ({summary}) in {elapsed:.2f}s')
+                if not options['every']:
+                    break
+                time.sleep(options['every'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,38 @@
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_total_team_value(apps, schema_editor):
+    Team = apps.get_model('teams', 'Team')
+    Player = apps.get_model('players', 'Player')
+    player_totals = (
+        Player.objects.filter(team=OuterRef('pk'))
+        .order_by()
+        .values('team')
+        .annotate(total=Sum('value'))
+        .values('total')
+    )
+    Team.objects.update(total_team_value=Coalesce(
+        Subquery(player_totals, output_field=models.DecimalField(max_digits=15, decimal_places=2)),
+        Decimal('0.00'),
+        output_field=models.DecimalField(max_digits=15, decimal_places=2)
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+        ('teams', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='total_team_value',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.RunPython(populate_total_team_value, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:04
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def populate_transfer_profit(apps, schema_editor):
+    Team = apps.get_model('teams', 'Team')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+
+    def total(role):
+        return Coalesce(
+            Subquery(
+                Transaction.objects.filter(**{role: OuterRef('user_id')})
+                .order_by()
+                .values(role)
+                .annotate(total=Sum('transfer_amount'))
+                .values('total'),
+                output_field=amount
+            ),
+            Decimal('0.00'),
+            output_field=amount
+        )
+
+    Team.objects.update(transfer_profit=total('seller') - total('buyer'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0002_team_total_team_value'),
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='transfer_profit',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15),
+        ),
+        migrations.RunPython(populate_transfer_profit, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='TeamRanking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('value', 'Team value'), ('capital', 'Capital'), ('profit', 'Transfer profit')], max_length=10)),
+                ('rank', models.PositiveIntegerField()),
+                ('score', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('computed_at', models.DateTimeField()),
+                ('team', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rankings', to='teams.team')),
+            ],
+            options={
+                'ordering': ['board', 'rank', 'team_id'],
+                'indexes': [models.Index(fields=['board', 'rank', 'team'], name='teams_ranking_board_rank_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='teamranking',
+            constraint=models.UniqueConstraint(fields=('board', 'team'), name='teams_ranking_unique_team'),
+        ),
+    ]
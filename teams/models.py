@@ -1,5 +1,82 @@
+from decimal import Decimal
 from django.db import models
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from accounts.models import User
+from core.conditional import make_etag
+
+
+class TeamQuerySet(models.QuerySet):
+    """QuerySet with set-based team value maintenance and freshness checks"""
+
+    def _player_value_subquery(self):
+        player_model = self.model._meta.get_field('players').related_model
+        player_totals = (
+            player_model.objects.filter(team=OuterRef('pk'))
+            .order_by()
+            .values('team')
+            .annotate(total=Sum('value'))
+            .values('total')
+        )
+        return Coalesce(
+            Subquery(player_totals, output_field=models.DecimalField(max_digits=15, decimal_places=2)),
+            Decimal('0.00'),
+            output_field=models.DecimalField(max_digits=15, decimal_places=2)
+        )
+
+    def adjust_total_value(self, delta):
+        """Add ``delta`` to the stored team value without reading the row"""
+        return self.update(
+            total_team_value=F('total_team_value') + delta,
+            updated_at=timezone.now()
+        )
+
+    def with_actual_total_value(self):
+        """Annotate ``actual_total_value`` summed from the players table"""
+        return self.annotate(actual_total_value=self._player_value_subquery())
+
+    def with_stale_total_value(self):
+        """Teams whose stored value disagrees with their players"""
+        return self.with_actual_total_value().exclude(total_team_value=F('actual_total_value'))
+
+    def recompute_total_value(self):
+        """Recompute the stored team value from the players table"""
+        return self.update(
+            total_team_value=self._player_value_subquery(),
+            updated_at=timezone.now()
+        )
+
+    def _squad_state(self):
+        return (
+            self.annotate(squad_updated_at=Max('players__updated_at'), squad_size=Count('players'))
+            .values('pk', 'updated_at', 'squad_updated_at', 'squad_size')
+        )
+
+    def squad_validators(self, *scope):
+        """
+        Return ``(team_id, etag, last_modified)`` for the first team, or None.
+
+        Only the team row and an aggregate over its players are read, so
+        an unchanged squad can be answered without loading it. ``scope``
+        distinguishes representations of the same team in the ETag.
+        """
+        return self._squad_validators(self._squad_state().first(), scope)
+
+    async def asquad_validators(self, *scope):
+        """Async variant of ``squad_validators``"""
+        return self._squad_validators(await self._squad_state().afirst(), scope)
+
+    @staticmethod
+    def _squad_validators(state, scope):
+        if state is None:
+            return None
+        last_modified = max(filter(None, [state['updated_at'], state['squad_updated_at']]))
+        etag = make_etag(
+            state['pk'], state['updated_at'], state['squad_updated_at'], state['squad_size'], *scope,
+            weak=True
+        )
+        return state['pk'], etag, last_modified
 
 
 class Team(models.Model):
@@ -7,14 +84,72 @@ class Team(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='team')
     name = models.CharField(max_length=100)
     capital = models.DecimalField(max_digits=15, decimal_places=2)
-    
+    # Sum of the team's player values, maintained by Player.save()/delete()
+    total_team_value = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    # Sales minus purchases, maintained by the transfer engine
+    transfer_profit = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
-    @property
-    def total_team_value(self):
-        """Calculate total value of all players in the team"""
-        return sum(player.value for player in self.players.all())
+    objects = TeamQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        # The aggregates are only ever changed with relative updates, so a
+        # full save of an in-memory copy must not overwrite them.
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in ('total_team_value', 'transfer_profit')
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} ({self.user.username})"
+
+
+class TeamRankingQuerySet(models.QuerySet):
+    """QuerySet for leaderboard snapshots"""
+
+    def board(self, board):
+        return self.filter(board=board)
+
+    def top(self, board, start_rank=1):
+        """A board from ``start_rank`` down, read along the (board, rank) index"""
+        return self.filter(board=board, rank__gte=start_rank).order_by('rank', 'team_id')
+
+
+class TeamRanking(models.Model):
+    """
+    A team's place on a leaderboard, as of the last refresh.
+
+    Each board is rebuilt in one ``INSERT ... SELECT`` ranking every team
+    (see ``teams.leaderboards``), so reading the top of a board or one
+    team's rank is an index lookup however many teams there are.
+    """
+
+    BOARD_CHOICES = [
+        ('value', 'Team value'),
+        ('capital', 'Capital'),
+        ('profit', 'Transfer profit'),
+    ]
+
+    board = models.CharField(max_length=10, choices=BOARD_CHOICES)
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='rankings')
+    rank = models.PositiveIntegerField()
+    score = models.DecimalField(max_digits=15, decimal_places=2)
+    computed_at = models.DateTimeField()
+
+    objects = TeamRankingQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['board', 'rank', 'team_id']
+        indexes = [
+            models.Index(fields=['board', 'rank', 'team'], name='teams_ranking_board_rank_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'team'], name='teams_ranking_unique_team'),
+        ]
+
+    def __str__(self):
+        return f"{self.board} #{self.rank}: {self.team_id}"
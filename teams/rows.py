@@ -0,0 +1,32 @@
+"""
+Render ``values()`` rows in the shape of the team serializers.
+"""
+from collections import defaultdict
+from accounts.rows import render_user, user_values
+from core.rows import render_datetime, render_decimal
+from players.models import Player
+from players.rows import player_values, render_player
+
+TEAM_VALUES = ('id', 'name', 'capital', 'total_team_value', 'created_at', *user_values('user__'))
+
+
+def render_team(row, players):
+    """Same output as ``TeamSerializer``, given the team's rendered players"""
+    return {
+        'id': row['id'],
+        'user': render_user(row, 'user__'),
+        'name': row['name'],
+        'capital': render_decimal(row['capital']),
+        'total_team_value': render_decimal(row['total_team_value']),
+        'players': players,
+        'created_at': render_datetime(row['created_at']),
+    }
+
+
+def render_teams(rows):
+    """Render a page of team rows, loading all their squads with one query"""
+    squads = defaultdict(list)
+    players = Player.objects.filter(team_id__in=[row['id'] for row in rows]).values(*player_values())
+    for player in players:
+        squads[player['team_id']].append(render_player(player))
+    return [render_team(row, squads[row['id']]) for row in rows]
@@ -1,16 +1,26 @@
 from rest_framework import serializers
+from core.instrumentation import TimedSerializerMixin
 from accounts.serializers import UserSerializer
 from players.serializers import PlayerSerializer
-from .models import Team
+from .models import Team, TeamRanking
 
 
-class TeamSerializer(serializers.ModelSerializer):
+class TeamSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Team model"""
     user = UserSerializer(read_only=True)
-    total_team_value = serializers.DecimalField(max_digits=15, decimal_places=2, read_only=True)
     players = PlayerSerializer(many=True, read_only=True)
 
     class Meta:
         model = Team
         fields = ('id', 'user', 'name', 'capital', 'total_team_value', 'players', 'created_at')
-        read_only_fields = ('capital',)
+        read_only_fields = ('capital', 'total_team_value')
+
+
+class TeamRankingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for a leaderboard row"""
+    team_name = serializers.CharField(source='team.name', read_only=True)
+    username = serializers.CharField(source='team.user.username', read_only=True)
+
+    class Meta:
+        model = TeamRanking
+        fields = ('rank', 'team', 'team_name', 'username', 'score')
@@ -1,4 +1,7 @@
+from io import StringIO
 from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
@@ -6,6 +9,8 @@ from decimal import Decimal
 
 from teams.models import Team
 from players.models import Player
+from transfers.models import TransferListing
+from transfers.services import TransferEngine
 
 User = get_user_model()
 
@@ -77,3 +82,191 @@ class TeamTests(TestCase):
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['players']), 3)
+
+
+class TeamValueAggregateTests(TestCase):
+    """Test maintenance of the stored team value"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='Test123456')
+        self.other_user = User.objects.create_user(username='other', email='other@example.com', password='Test123456')
+        self.team = Team.objects.create(user=self.user, name='Team A', capital=Decimal('5000000.00'))
+        self.other_team = Team.objects.create(user=self.other_user, name='Team B', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(
+            team=self.team,
+            name='Player',
+            position='GK',
+            value=Decimal('1000000.00')
+        )
+
+    def test_value_change_updates_team_value(self):
+        """Test that changing a player's value adjusts the team total"""
+        player = Player.objects.get(pk=self.player.pk)
+        player.value = Decimal('1250000.00')
+        player.save()
+
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.total_team_value, Decimal('1250000.00'))
+
+    def test_team_change_moves_value_between_teams(self):
+        """Test that moving a player moves its value to the new team"""
+        player = Player.objects.get(pk=self.player.pk)
+        player.team = self.other_team
+        player.value = Decimal('1100000.00')
+        player.save()
+
+        self.team.refresh_from_db()
+        self.other_team.refresh_from_db()
+        self.assertEqual(self.team.total_team_value, Decimal('0.00'))
+        self.assertEqual(self.other_team.total_team_value, Decimal('1100000.00'))
+
+    def test_deferred_player_save_updates_team_value(self):
+        """Test that a player loaded without its value still updates the total"""
+        player = Player.objects.only('id', 'name').get(pk=self.player.pk)
+        player.team = self.other_team
+        player.save()
+
+        self.team.refresh_from_db()
+        self.other_team.refresh_from_db()
+        self.assertEqual(self.team.total_team_value, Decimal('0.00'))
+        self.assertEqual(self.other_team.total_team_value, Decimal('1000000.00'))
+
+    def test_player_delete_updates_team_value(self):
+        """Test that deleting a player removes its value from the team"""
+        self.player.delete()
+
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.total_team_value, Decimal('0.00'))
+
+    def test_team_save_keeps_team_value(self):
+        """Test that saving a stale team instance does not overwrite the total"""
+        self.team.total_team_value = Decimal('0.00')
+        self.team.capital = Decimal('100.00')
+        self.team.save()
+
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.capital, Decimal('100.00'))
+        self.assertEqual(self.team.total_team_value, Decimal('1000000.00'))
+
+    def test_reconcile_command_reports_and_fixes_mismatch(self):
+        """Test that reconciliation detects and repairs stale totals"""
+        Team.objects.filter(pk=self.team.pk).update(total_team_value=Decimal('1.00'))
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_team_values', stdout=StringIO())
+
+        call_command('reconcile_team_values', '--fix', stdout=StringIO())
+
+        self.team.refresh_from_db()
+        self.assertEqual(self.team.total_team_value, Decimal('1000000.00'))
+        self.assertFalse(Team.objects.with_stale_total_value().exists())
+
+
+class TeamConditionalGetTests(TestCase):
+    """Test ETag and Last-Modified handling on squad endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(username='owner', email='owner@example.com', password='Test123456')
+        self.team = Team.objects.create(user=self.user, name='Team', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(team=self.team, name='Player', position='GK', value=Decimal('1000000.00'))
+        self.client.force_authenticate(user=self.user)
+
+    def test_matching_etag_returns_304_without_loading_squad(self):
+        """Test that a fresh squad is answered with a single query"""
+        for url in ('/api/teams/my-team/', '/api/players/my-players/'):
+            first = self.client.get(url)
+            self.assertTrue(first['ETag'].startswith('W/'))
+
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response['ETag'], first['ETag'])
+
+    def test_if_modified_since_returns_304(self):
+        """Test that Last-Modified round-trips through If-Modified-Since"""
+        first = self.client.get('/api/teams/my-team/')
+
+        response = self.client.get('/api/teams/my-team/', HTTP_IF_MODIFIED_SINCE=first['Last-Modified'])
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_squad_change_changes_etag(self):
+        """Test that a player change invalidates both representations"""
+        team_etag = self.client.get('/api/teams/my-team/')['ETag']
+        players_etag = self.client.get('/api/players/my-players/')['ETag']
+
+        player = Player.objects.get(pk=self.player.pk)
+        player.value = Decimal('1200000.00')
+        player.save()
+
+        response = self.client.get('/api/teams/my-team/', HTTP_IF_NONE_MATCH=team_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_team_value'], '1200000.00')
+        response = self.client.get('/api/players/my-players/', HTTP_IF_NONE_MATCH=players_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_representations_have_distinct_etags(self):
+        """Test that team and player list ETags never collide"""
+        team_etag = self.client.get('/api/teams/my-team/')['ETag']
+        players_etag = self.client.get('/api/players/my-players/')['ETag']
+
+        self.assertNotEqual(team_etag, players_etag)
+
+
+class LeaderboardTests(TestCase):
+    """Test the materialized leaderboards"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.teams = []
+        for i, (value, capital) in enumerate([('3000000.00', '100.00'), ('1000000.00', '300.00'), ('3000000.00', '200.00')]):
+            user = User.objects.create_user(username=f'rank{i}', email=f'rank{i}@test.com', password='Pass123')
+            team = Team.objects.create(user=user, name=f'Rank Team {i}', capital=Decimal(capital))
+            Player.objects.create(team=team, name=f'Player {i}', position='MF', value=Decimal(value))
+            self.teams.append(team)
+        self.client.force_authenticate(user=self.teams[1].user)
+        
+    def test_refresh_ranks_every_board(self):
+        """Test that ranks follow scores, with ties sharing a rank"""
+        call_command('refresh_leaderboards', stdout=StringIO())
+        
+        response = self.client.get('/api/teams/leaderboard/?board=value')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(row['rank'], row['team']) for row in response.data['results']],
+            [(1, self.teams[0].pk), (1, self.teams[2].pk), (3, self.teams[1].pk)]
+        )
+        self.assertEqual(response.data['results'][0]['score'], '3000000.00')
+        self.assertIsNotNone(response.data['computed_at'])
+        
+        response = self.client.get('/api/teams/leaderboard/?board=capital&start_rank=2')
+        self.assertEqual([row['team'] for row in response.data['results']], [self.teams[2].pk, self.teams[0].pk])
+        
+    def test_my_rank(self):
+        """Test that the user's rank is read from the last snapshot"""
+        response = self.client.get('/api/teams/leaderboard/me/?board=capital')
+        self.assertIsNone(response.data['rank'])
+        
+        call_command('refresh_leaderboards', '--board', 'capital', stdout=StringIO())
+        response = self.client.get('/api/teams/leaderboard/me/?board=capital')
+        self.assertEqual((response.data['rank'], response.data['score']), (1, '300.00'))
+        
+    def test_unknown_board_is_rejected(self):
+        """Test that an unknown board is a validation error"""
+        response = self.client.get('/api/teams/leaderboard/?board=goals')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+    def test_purchase_updates_transfer_profit(self):
+        """Test that the transfer engine keeps transfer profit in step"""
+        seller, buyer = self.teams[0], self.teams[2]
+        Team.objects.filter(pk=buyer.pk).update(capital=Decimal('5000000.00'))
+        listing = TransferListing.objects.create(player=seller.players.get(), asking_price=Decimal('1500000.00'))
+        
+        TransferEngine.purchase(listing.pk, buyer.user)
+        
+        seller.refresh_from_db()
+        buyer.refresh_from_db()
+        self.assertEqual(seller.transfer_profit, Decimal('1500000.00'))
+        self.assertEqual(buyer.transfer_profit, Decimal('-1500000.00'))
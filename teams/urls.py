@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import TeamViewSet
 
 router = DefaultRouter()
 router.register(r'teams', TeamViewSet, basename='team')
 
 urlpatterns = [
+    path('async/teams/my-team/', async_views.my_team, name='async-teams-my-team'),
     path('', include(router.urls)),
 ]
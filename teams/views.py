@@ -1,21 +1,80 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from .models import Team
-from .serializers import TeamSerializer
+from core.compact import CompactListMixin
+from core.conditional import is_not_modified, not_modified_response, set_validators
+from core.pagination import LeaderboardCursorPagination
+from core.querysets import OptimizedQuerySetMixin, optimize_queryset
+from core.rows import render_decimal
+from .leaderboards import BOARDS
+from .models import Team, TeamRanking
+from .rows import TEAM_VALUES, render_teams
+from .serializers import TeamRankingSerializer, TeamSerializer
 
 
-class TeamViewSet(viewsets.ReadOnlyModelViewSet):
+class TeamViewSet(CompactListMixin, OptimizedQuerySetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for Team operations"""
     queryset = Team.objects.all()
     serializer_class = TeamSerializer
+    compact_values = TEAM_VALUES
+    compact_renderer = staticmethod(render_teams)
     
     @action(detail=False, methods=['get'], url_path='my-team')
     def my_team(self, request):
-        """Get current user's team"""
-        try:
-            team = request.user.team
-            serializer = self.get_serializer(team)
-            return Response(serializer.data)
-        except Team.DoesNotExist:
+        """Get current user's team, honouring conditional GET headers"""
+        validators = Team.objects.filter(pk=request.user.team_id).squad_validators(
+            'my-team', request.accepted_renderer.format
+        )
+        if validators is None:
             return Response({'error': 'Team not found'}, status=status.HTTP_404_NOT_FOUND)
+        
+        team_id, etag, last_modified = validators
+        if is_not_modified(request, etag=etag, last_modified=last_modified):
+            return not_modified_response(etag=etag, last_modified=last_modified)
+        
+        team = self.get_queryset().get(pk=team_id)
+        serializer = self.get_serializer(team)
+        return set_validators(Response(serializer.data), etag=etag, last_modified=last_modified)
+    
+    def get_board(self):
+        board = self.request.query_params.get('board', 'value')
+        if board not in BOARDS:
+            raise ValidationError({'board': f"Choose one of: {', '.join(BOARDS)}"})
+        return board
+    
+    @action(detail=False, methods=['get'])
+    def leaderboard(self, request):
+        """
+        Top of a leaderboard (``?board=value|capital|profit``), as of its
+        last refresh; ``start_rank`` jumps down the board.
+        """
+        board = self.get_board()
+        rankings = TeamRanking.objects.top(board)
+        start_rank = request.query_params.get('start_rank')
+        if start_rank:
+            try:
+                rankings = rankings.filter(rank__gte=int(start_rank))
+            except ValueError:
+                raise ValidationError({'start_rank': 'Must be an integer'})
+        
+        paginator = LeaderboardCursorPagination()
+        page = paginator.paginate_queryset(optimize_queryset(rankings, TeamRankingSerializer), request)
+        response = paginator.get_paginated_response(TeamRankingSerializer(page, many=True).data)
+        response.data['board'] = board
+        response.data['computed_at'] = page[0].computed_at if page else None
+        return response
+    
+    @action(detail=False, methods=['get'], url_path='leaderboard/me')
+    def my_rank(self, request):
+        """The current user's team's place on a leaderboard"""
+        board = self.get_board()
+        ranking = TeamRanking.objects.board(board).filter(team_id=request.user.team_id).first()
+        if ranking is None:
+            return Response({'board': board, 'rank': None, 'score': None, 'computed_at': None})
+        return Response({
+            'board': board,
+            'rank': ranking.rank,
+            'score': render_decimal(ranking.score),
+            'computed_at': ranking.computed_at,
+        })
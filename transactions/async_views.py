@@ -0,0 +1,21 @@
+import functools
+from core.asyncapi import KeysetPage, async_api_view
+from .models import LedgerEntry, Transaction
+from .rows import render_transaction, transaction_values
+
+
+@async_api_view
+async def feed(request, user):
+    """Async variant of ``/api/transactions/``, including ``?my_transactions=true``"""
+    page = KeysetPage(request)
+    if request.GET.get('my_transactions') == 'true':
+        queryset = page.paginate(LedgerEntry.objects.for_user(user.pk))
+        fields = ('id', 'created_at', *transaction_values('transaction__'))
+        render = functools.partial(render_transaction, prefix='transaction__')
+    else:
+        queryset = page.paginate(Transaction.objects.filter(is_active=True))
+        fields = transaction_values()
+        render = render_transaction
+
+    rows = [row async for row in queryset.values(*fields).aiterator()]
+    return page.response(rows, render)
@@ -0,0 +1,110 @@
+"""
+Streaming export of the transaction ledger as NDJSON or CSV.
+
+Rows are read as flat ``values_list()`` tuples through a server-side cursor
+and encoded one at a time, so memory stays constant however large the
+ledger is and no serializer runs per row.
+"""
+import csv
+import datetime
+import json
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import LedgerEntry, Transaction
+
+# Output column -> lookup on Transaction
+COLUMNS = {
+    'id': 'id',
+    'created_at': 'created_at',
+    'transfer_amount': 'transfer_amount',
+    'is_active': 'is_active',
+    'buyer_id': 'buyer_id',
+    'buyer_username': 'buyer__username',
+    'seller_id': 'seller_id',
+    'seller_username': 'seller__username',
+    'player_id': 'player_id',
+    'player_name': 'player__name',
+    'player_position': 'player__position',
+}
+COLUMN_NAMES = tuple(COLUMNS)
+
+FORMATS = {
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+    'csv': ('text/csv', 'csv'),
+}
+
+
+def parse_bound(value):
+    """
+    Parse a ``since``/``until`` bound given as an ISO date or datetime.
+
+    Dates mean midnight in the current time zone. Raises ValueError.
+    """
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f'Invalid date: {value}')
+        moment = datetime.datetime.combine(day, datetime.time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(user_id=None, since=None, until=None, include_inactive=False, chunk_size=None):
+    """
+    Iterate the ledger as tuples in ``COLUMN_NAMES`` order, oldest first.
+
+    ``since`` is inclusive and ``until`` exclusive. With ``user_id`` only
+    that user's transactions are read, through the per-user ledger index.
+    """
+    if user_id is None:
+        queryset, prefix = Transaction.objects.all(), ''
+    else:
+        # Ledger rows copy created_at, so the range is served by its index
+        queryset, prefix = LedgerEntry.objects.filter(user_id=user_id), 'transaction__'
+
+    if not include_inactive:
+        queryset = queryset.filter(**{f'{prefix}is_active': True})
+    if since is not None:
+        queryset = queryset.filter(created_at__gte=since)
+    if until is not None:
+        queryset = queryset.filter(created_at__lt=until)
+
+    lookups = [f'{prefix}{lookup}' for lookup in COLUMNS.values()]
+    return (
+        queryset.order_by('created_at', 'id')
+        .values_list(*lookups)
+        .iterator(chunk_size=chunk_size or settings.EXPORT_CHUNK_SIZE)
+    )
+
+
+def _plain(row):
+    # created_at and transfer_amount, in COLUMN_NAMES order
+    return (row[0], row[1].isoformat(), str(row[2])) + row[3:]
+
+
+def encode_ndjson(rows):
+    """One JSON object per line"""
+    for row in rows:
+        yield json.dumps(dict(zip(COLUMN_NAMES, _plain(row))), separators=(',', ':')) + '\n'
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes"""
+
+    def write(self, value):
+        return value
+
+
+def encode_csv(rows):
+    """A header line, then one line per row"""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(COLUMN_NAMES)
+    for row in rows:
+        yield writer.writerow(_plain(row))
+
+
+def encode(rows, export_format):
+    return encode_csv(rows) if export_format == 'csv' else encode_ndjson(rows)
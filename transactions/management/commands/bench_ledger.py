@@ -0,0 +1,105 @@
+import random
+import time
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from rest_framework.test import APIClient
+from core.benchmarks import format_latencies, summarize_latencies
+from accounts.models import User
+from accounts.services import UserRegistrationService
+from players.models import Player
+from transactions.models import LedgerEntry, Transaction
+
+
+class Command(BaseCommand):
+    """Benchmark the my_transactions feed over a large seeded ledger"""
+    help = (
+        'Seed bench users and transactions (skipped when already present) and report '
+        'p50/p99 latency of the my_transactions=true feed, comparing the ledger index '
+        'scan against the former buyer OR seller query.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transactions', type=int, default=10_000_000, help='Transactions to seed')
+        parser.add_argument('--users', type=int, default=10_000, help='Users to spread them across')
+        parser.add_argument('--batch-size', type=int, default=10_000, help='Rows per INSERT batch')
+        parser.add_argument('--samples', type=int, default=200, help='Feed requests to time')
+        parser.add_argument('--page-size', type=int, default=100, help='Feed page size')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        user_ids = self.seed_users(options['users'])
+        self.seed_transactions(rng, user_ids, options['transactions'], options['batch_size'])
+
+        sample = [rng.choice(user_ids) for _ in range(options['samples'])]
+        page_size = options['page_size']
+
+        timings = {'legacy OR query': [], 'ledger query': [], 'API feed': []}
+        for user_id in sample:
+            started = time.perf_counter()
+            list(
+                Transaction.objects.filter(is_active=True)
+                .filter(Q(buyer_id=user_id) | Q(seller_id=user_id))
+                .order_by('-created_at', '-id')
+                .values_list('id', flat=True)[:page_size]
+            )
+            timings['legacy OR query'].append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            list(LedgerEntry.objects.for_user(user_id).values_list('transaction_id', flat=True)[:page_size])
+            timings['ledger query'].append(time.perf_counter() - started)
+
+        client = APIClient()
+        users = User.objects.in_bulk(set(sample))
+        for user_id in sample:
+            client.force_authenticate(user=users[user_id])
+            started = time.perf_counter()
+            response = client.get(f'/api/transactions/?my_transactions=true&page_size={page_size}')
+            timings['API feed'].append(time.perf_counter() - started)
+            assert response.status_code == 200, response.status_code
+
+        for name, latencies in timings.items():
+            self.stdout.write(f'{name:>16}: {format_latencies(summarize_latencies(latencies))}')
+
+    def seed_users(self, count):
+        existing = list(User.objects.filter(username__startswith='ledger_').values_list('pk', flat=True))
+        if len(existing) < count:
+            password_hash = make_password(None)
+            UserRegistrationService.bulk_create_users_with_teams([
+                {
+                    'username': f'ledger_{i}',
+                    'email': f'ledger_{i}@example.com',
+                    'password_hash': password_hash,
+                    'team_name': f'Ledger Team {i}',
+                }
+                for i in range(len(existing), count)
+            ])
+            existing = list(User.objects.filter(username__startswith='ledger_').values_list('pk', flat=True))
+        return existing
+
+    def seed_transactions(self, rng, user_ids, count, batch_size):
+        missing = count - Transaction.objects.count()
+        if missing <= 0:
+            return
+
+        player_ids = list(Player.objects.filter(team__user_id__in=user_ids).values_list('pk', flat=True))
+        started = time.perf_counter()
+        for offset in range(0, missing, batch_size):
+            transactions = []
+            for _ in range(min(batch_size, missing - offset)):
+                buyer_id, seller_id = rng.sample(user_ids, 2)
+                transactions.append(Transaction(
+                    buyer_id=buyer_id,
+                    seller_id=seller_id,
+                    player_id=rng.choice(player_ids),
+                    transfer_amount=Decimal(rng.randrange(500_000, 5_000_000)),
+                    is_active=True
+                ))
+            with db_transaction.atomic():
+                Transaction.objects.bulk_create(transactions)
+                LedgerEntry.objects.bulk_create(LedgerEntry.entries_for(transactions))
+            self.stdout.write(f'Seeded {offset + len(transactions)}/{missing} transactions', ending='\r')
+        self.stdout.write(f'\nSeeded {missing} transactions in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,57 @@
+from django.core.management.base import BaseCommand, CommandError, OutputWrapper
+from accounts.models import User
+from transactions.export import FORMATS, encode, export_rows, parse_bound
+
+
+class Command(BaseCommand):
+    """Stream the transaction ledger to a file or stdout"""
+    help = (
+        'Export transactions as NDJSON or CSV, oldest first, in constant memory. '
+        '--since is inclusive and --until exclusive; both take ISO dates or datetimes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format', choices=sorted(FORMATS), default='ndjson')
+        parser.add_argument('--since', help='Only transactions at or after this date')
+        parser.add_argument('--until', help='Only transactions before this date')
+        parser.add_argument('--user', help='Only transactions of this user id or username')
+        parser.add_argument('--include-inactive', action='store_true', help='Also export inactive transactions')
+        parser.add_argument('--chunk-size', type=int, help='Rows per fetch (default: EXPORT_CHUNK_SIZE)')
+        parser.add_argument('--output', '-o', help='File to write (default: stdout)')
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_bound(options['since']) if options['since'] else None
+            until = parse_bound(options['until']) if options['until'] else None
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        user_id = None
+        if options['user']:
+            user = options['user']
+            lookup = {'pk': int(user)} if user.isdigit() else {'username': user}
+            user_id = User.objects.filter(**lookup).values_list('pk', flat=True).first()
+            if user_id is None:
+                raise CommandError(f'User not found: {user}')
+
+        rows = export_rows(
+            user_id=user_id,
+            since=since,
+            until=until,
+            include_inactive=options['include_inactive'],
+            chunk_size=options['chunk_size']
+        )
+        stream = open(options['output'], 'w', newline='') if options['output'] else None
+        output = OutputWrapper(stream) if stream else self.stdout
+        lines = 0
+        try:
+            for line in encode(rows, options['export_format']):
+                output.write(line, ending='')
+                lines += 1
+        finally:
+            if stream:
+                stream.close()
+
+        # CSV output starts with a header line
+        exported = lines - 1 if options['export_format'] == 'csv' else lines
+        self.stderr.write(f'Exported {exported} transactions')
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:10
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('transactions', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('buyer', 'Buyer'), ('seller', 'Seller')], max_length=6)),
+                ('created_at', models.DateTimeField()),
+                ('transaction', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='transactions.transaction')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+                'indexes': [models.Index(fields=['user', '-created_at', '-id'], name='transaction_ledger_user_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='ledgerentry',
+            constraint=models.UniqueConstraint(fields=('transaction', 'role'), name='transaction_ledger_unique_role'),
+        ),
+        migrations.RunSQL(
+            sql=[
+                "INSERT INTO transactions_ledgerentry (user_id, transaction_id, role, created_at) "
+                "SELECT buyer_id, id, 'buyer', created_at FROM transactions_transaction",
+                "INSERT INTO transactions_ledgerentry (user_id, transaction_id, role, created_at) "
+                "SELECT seller_id, id, 'seller', created_at FROM transactions_transaction",
+            ],
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction as db_transaction
 from accounts.models import User
 from players.models import Player
 
@@ -21,5 +21,74 @@ class Transaction(models.Model):
             models.Index(fields=['seller', '-created_at']),
         ]
 
+    def save(self, *args, **kwargs):
+        """Save the transaction, adding its ledger entries when created"""
+        adding = self._state.adding
+        with db_transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                LedgerEntry.objects.bulk_create(LedgerEntry.entries_for([self]))
+
     def __str__(self):
         return f"{self.player.name}: {self.seller.username} -> {self.buyer.username} (${self.transfer_amount})"
+
+
+class LedgerEntryQuerySet(models.QuerySet):
+    """QuerySet for per-user ledger rows"""
+
+    def for_user(self, user):
+        """A user's active transactions as buyer or seller, newest first"""
+        return self.filter(user=user, transaction__is_active=True).order_by('-created_at', '-id')
+
+
+class LedgerEntry(models.Model):
+    """
+    One row per party of a Transaction.
+
+    A user's history is then a single range scan of the (user, created_at)
+    index instead of an OR across the buyer and seller columns.
+    """
+
+    ROLE_CHOICES = [
+        ('buyer', 'Buyer'),
+        ('seller', 'Seller'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='ledger_entries')
+    transaction = models.ForeignKey(Transaction, on_delete=models.CASCADE, related_name='ledger_entries')
+    role = models.CharField(max_length=6, choices=ROLE_CHOICES)
+    # Copied from the transaction so the index can serve the feed ordering
+    created_at = models.DateTimeField()
+
+    objects = LedgerEntryQuerySet.as_manager()
+
+    class Meta:
+        ordering = ['-created_at', '-id']
+        indexes = [
+            models.Index(fields=['user', '-created_at', '-id'], name='transaction_ledger_user_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['transaction', 'role'], name='transaction_ledger_unique_role'),
+        ]
+
+    @classmethod
+    def entries_for(cls, transactions):
+        """Unsaved buyer and seller entries for saved ``transactions``"""
+        entries = []
+        for transaction in transactions:
+            entries.append(cls(
+                user_id=transaction.buyer_id,
+                transaction=transaction,
+                role='buyer',
+                created_at=transaction.created_at
+            ))
+            entries.append(cls(
+                user_id=transaction.seller_id,
+                transaction=transaction,
+                role='seller',
+                created_at=transaction.created_at
+            ))
+        return entries
+
+    def __str__(self):
+        return f"{self.user_id} {self.role} #{self.transaction_id}"
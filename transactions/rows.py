@@ -0,0 +1,31 @@
+"""
+Render ``values()`` rows in the shape of the transaction serializers.
+"""
+from accounts.rows import render_user, user_values
+from core.rows import render_datetime, render_decimal
+from players.rows import player_values, render_player
+
+
+def transaction_values(prefix=''):
+    """``values()`` names needed to render the transaction at ``prefix``"""
+    return [
+        f'{prefix}{name}' for name in ('id', 'transfer_amount', 'is_active', 'created_at')
+    ] + user_values(f'{prefix}buyer__') + user_values(f'{prefix}seller__') + player_values(f'{prefix}player__')
+
+
+def render_transaction(row, prefix=''):
+    """Same output as ``TransactionSerializer``"""
+    return {
+        'id': row[f'{prefix}id'],
+        'buyer': render_user(row, f'{prefix}buyer__'),
+        'seller': render_user(row, f'{prefix}seller__'),
+        'player': render_player(row, f'{prefix}player__'),
+        'transfer_amount': render_decimal(row[f'{prefix}transfer_amount']),
+        'is_active': row[f'{prefix}is_active'],
+        'created_at': render_datetime(row[f'{prefix}created_at']),
+    }
+
+
+def render_transactions(rows, prefix=''):
+    """Render a page of transaction rows"""
+    return [render_transaction(row, prefix) for row in rows]
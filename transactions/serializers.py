@@ -1,10 +1,11 @@
 from rest_framework import serializers
+from core.instrumentation import TimedSerializerMixin
 from accounts.serializers import UserSerializer
 from players.serializers import PlayerSerializer
-from .models import Transaction
+from .models import LedgerEntry, Transaction
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for Transaction model"""
     buyer = UserSerializer(read_only=True)
     seller = UserSerializer(read_only=True)
@@ -14,3 +15,15 @@ class TransactionSerializer(serializers.ModelSerializer):
         model = Transaction
         fields = ('id', 'buyer', 'seller', 'player', 'transfer_amount', 'is_active', 'created_at')
         read_only_fields = fields
+
+
+class LedgerEntrySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Renders a user's ledger entry as the transaction it records"""
+    transaction = TransactionSerializer(read_only=True)
+
+    class Meta:
+        model = LedgerEntry
+        fields = ('transaction',)
+
+    def to_representation(self, instance):
+        return super().to_representation(instance)['transaction']
@@ -1,3 +1,4 @@
+from unittest.mock import patch
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
@@ -6,7 +7,7 @@ from decimal import Decimal
 
 from teams.models import Team
 from players.models import Player
-from transactions.models import Transaction
+from transactions.models import LedgerEntry, Transaction
 
 User = get_user_model()
 
@@ -41,7 +42,7 @@ class TransactionTests(TestCase):
         response = self.client.get('/api/transactions/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_view_my_transactions(self):
         """Test viewing only my transactions"""
@@ -63,8 +64,8 @@ class TransactionTests(TestCase):
         response = self.client.get('/api/transactions/?my_transactions=true')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['seller']['username'], 'user1')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['seller']['username'], 'user1')
         
     def test_transactions_filtered_by_active(self):
         """Test that only active transactions are shown"""
@@ -94,10 +95,174 @@ class TransactionTests(TestCase):
         response = self.client.get('/api/transactions/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_transactions_require_authentication(self):
         """Test that transactions endpoint requires authentication"""
         response = self.client.get('/api/transactions/')
         
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TransactionPaginationTests(TestCase):
+    """Test cursor pagination of the transaction feed"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user1 = User.objects.create_user(username='user1', email='user1@test.com', password='Pass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@test.com', password='Pass123')
+        team = Team.objects.create(user=self.user1, name='Team 1', capital=Decimal('5000000.00'))
+        player = Player.objects.create(team=team, name='Player', position='GK', value=Decimal('1000000.00'))
+        self.transactions = [
+            Transaction.objects.create(
+                buyer=self.user2,
+                seller=self.user1,
+                player=player,
+                transfer_amount=Decimal('1000000.00') + i
+            )
+            for i in range(5)
+        ]
+        self.client.force_authenticate(user=self.user1)
+        
+    def test_cursor_pages_cover_feed_without_count(self):
+        """Test walking the feed page by page, newest first"""
+        response = self.client.get('/api/transactions/?page_size=2')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('count', response.data)
+        
+        seen = []
+        while True:
+            seen.extend(item['id'] for item in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        
+        expected = sorted(
+            self.transactions, key=lambda t: (t.created_at, t.id), reverse=True
+        )
+        self.assertEqual(seen, [t.id for t in expected])
+        
+    def test_page_size_is_capped(self):
+        """Test that the client-selected page size is capped"""
+        with patch('core.pagination.FeedCursorPagination.max_page_size', 3):
+            response = self.client.get('/api/transactions/?page_size=1000')
+        
+        self.assertEqual(len(response.data['results']), 3)
+
+
+class LedgerTests(TestCase):
+    """Test the per-user transaction ledger"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.user1 = User.objects.create_user(username='user1', email='user1@test.com', password='Pass123')
+        self.user2 = User.objects.create_user(username='user2', email='user2@test.com', password='Pass123')
+        self.user3 = User.objects.create_user(username='user3', email='user3@test.com', password='Pass123')
+        team = Team.objects.create(user=self.user1, name='Team 1', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(team=team, name='Player', position='GK', value=Decimal('1000000.00'))
+        
+    def create_transaction(self, buyer, seller, **kwargs):
+        return Transaction.objects.create(
+            buyer=buyer,
+            seller=seller,
+            player=self.player,
+            transfer_amount=Decimal('1500000.00'),
+            **kwargs
+        )
+        
+    def test_transaction_creates_entry_per_party(self):
+        """Test that each transaction is recorded for buyer and seller"""
+        transaction = self.create_transaction(self.user2, self.user1)
+        
+        entries = LedgerEntry.objects.filter(transaction=transaction)
+        self.assertEqual(
+            {(entry.user_id, entry.role) for entry in entries},
+            {(self.user2.id, 'buyer'), (self.user1.id, 'seller')}
+        )
+        self.assertTrue(all(entry.created_at == transaction.created_at for entry in entries))
+        
+    def test_my_transactions_lists_purchases_and_sales(self):
+        """Test that the user feed covers both roles, newest first"""
+        sale = self.create_transaction(self.user2, self.user1)
+        purchase = self.create_transaction(self.user1, self.user3)
+        self.create_transaction(self.user3, self.user2)
+        self.create_transaction(self.user2, self.user1, is_active=False)
+        
+        self.client.force_authenticate(user=self.user1)
+        response = self.client.get('/api/transactions/?my_transactions=true')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in response.data['results']], [purchase.id, sale.id])
+        self.assertEqual(response.data['results'][0]['buyer']['username'], 'user1')
+        self.assertEqual(response.data['results'][1]['seller']['username'], 'user1')
+
+
+class TransactionExportTests(TestCase):
+    """Test the streaming ledger export"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.users = [
+            User.objects.create_user(username=f'exp{i}', email=f'exp{i}@test.com', password='Pass123')
+            for i in range(3)
+        ]
+        teams = [Team.objects.create(user=user, name=f'Team {i}', capital=Decimal('5000000.00'))
+                 for i, user in enumerate(self.users)]
+        player = Player.objects.create(team=teams[0], name='Exported', position='AT', value=Decimal('1000000.00'))
+        self.first = Transaction.objects.create(
+            buyer=self.users[1], seller=self.users[0], player=player, transfer_amount=Decimal('1100000.00')
+        )
+        self.second = Transaction.objects.create(
+            buyer=self.users[2], seller=self.users[1], player=player, transfer_amount=Decimal('1200000.00')
+        )
+        Transaction.objects.filter(pk=self.second.pk).update(created_at='2030-01-01T00:00:00Z')
+        LedgerEntry.objects.filter(transaction=self.second).update(created_at='2030-01-01T00:00:00Z')
+    
+    def export(self, user, query=''):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(f'/api/transactions/export/{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return b''.join(response.streaming_content).decode()
+    
+    def test_ndjson_export_is_flat_and_oldest_first(self):
+        """Test that staff export every transaction as one JSON object per line"""
+        import json
+        self.users[0].is_staff = True
+        rows = [json.loads(line) for line in self.export(self.users[0]).splitlines()]
+        
+        self.assertEqual([row['id'] for row in rows], [self.first.pk, self.second.pk])
+        self.assertEqual(rows[0]['buyer_username'], 'exp1')
+        self.assertEqual(rows[0]['transfer_amount'], '1100000.00')
+        self.assertEqual(rows[0]['player_name'], 'Exported')
+    
+    def test_csv_export_filters_by_user_and_date(self):
+        """Test that non-staff users get their own ledger, within the date range"""
+        lines = self.export(self.users[1], '?export_format=csv&until=2029-12-31').splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'created_at', 'transfer_amount'])
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], [str(self.first.pk)])
+        
+        lines = self.export(self.users[2], '?export_format=csv').splitlines()
+        self.assertEqual([line.split(',')[0] for line in lines[1:]], [str(self.second.pk)])
+    
+    def test_export_rejects_other_users_and_bad_parameters(self):
+        """Test parameter validation and the own-ledger restriction"""
+        self.client.force_authenticate(user=self.users[0])
+        response = self.client.get(f'/api/transactions/export/?user={self.users[1].pk}')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get('/api/transactions/export/?export_format=xml')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/api/transactions/export/?since=yesterday')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_export_command(self):
+        """Test that the command streams the same rows"""
+        from io import StringIO
+        from django.core.management import call_command
+        out, err = StringIO(), StringIO()
+        call_command('export_transactions', '--format', 'csv', '--since', '2029-01-01', stdout=out, stderr=err)
+        
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith(f'{self.second.pk},'))
+        self.assertIn('Exported 1 transactions', err.getvalue())
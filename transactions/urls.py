@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import TransactionViewSet
 
 router = DefaultRouter()
 router.register(r'transactions', TransactionViewSet, basename='transaction')
 
 urlpatterns = [
+    path('async/transactions/', async_views.feed, name='async-transactions'),
     path('', include(router.urls)),
 ]
@@ -1,19 +1,94 @@
-from rest_framework import viewsets
-from .models import Transaction
-from .serializers import TransactionSerializer
+import functools
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from core.compact import CompactListMixin
+from core.pagination import FeedCursorPagination
+from core.querysets import OptimizedQuerySetMixin
+from .export import FORMATS, encode, export_rows, parse_bound
+from .models import LedgerEntry, Transaction
+from .rows import render_transactions, transaction_values
+from .serializers import LedgerEntrySerializer, TransactionSerializer
 
 
-class TransactionViewSet(viewsets.ReadOnlyModelViewSet):
+class TransactionViewSet(CompactListMixin, OptimizedQuerySetMixin, viewsets.ReadOnlyModelViewSet):
     """ViewSet for Transaction history"""
+    queryset = Transaction.objects.filter(is_active=True)
+    pagination_class = FeedCursorPagination
     serializer_class = TransactionSerializer
+    compact_values = transaction_values()
+    compact_renderer = staticmethod(render_transactions)
+    
+    def is_user_ledger(self):
+        """Whether this request lists the current user's own transactions"""
+        return (
+            self.action == 'list'
+            and self.request.query_params.get('my_transactions', None) == 'true'
+            and self.request.user.is_authenticated
+        )
+    
+    def get_serializer_class(self):
+        if self.is_user_ledger():
+            return LedgerEntrySerializer
+        return super().get_serializer_class()
     
     def get_queryset(self):
         """Filter transactions based on user"""
-        queryset = Transaction.objects.filter(is_active=True)
+        if self.is_user_ledger():
+            # Served from the per-party ledger: one index range scan instead
+            # of an OR across the buyer and seller columns
+            return self.optimize_queryset(LedgerEntry.objects.for_user(self.request.user.pk))
+        return super().get_queryset()
+    
+    def get_compact_values(self):
+        if self.is_user_ledger():
+            return ('id', 'created_at', *transaction_values('transaction__'))
+        return super().get_compact_values()
+    
+    def get_compact_renderer(self):
+        if self.is_user_ledger():
+            return functools.partial(render_transactions, prefix='transaction__')
+        return super().get_compact_renderer()
+    
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        """
+        Stream the ledger as NDJSON or CSV, oldest first.
+
+        Accepts ``export_format`` (ndjson or csv), ``since``/``until`` ISO
+        dates and, for staff, ``user``. Other users only export their own
+        transactions.
+        """
+        export_format = request.query_params.get('export_format', 'ndjson')
+        if export_format not in FORMATS:
+            return Response(
+                {'error': f"export_format must be one of: {', '.join(FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        user_id = request.query_params.get('user')
+        if not request.user.is_staff:
+            if user_id not in (None, str(request.user.pk)):
+                return Response(
+                    {'error': 'You can only export your own transactions'},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            user_id = request.user.pk
         
-        my_transactions = self.request.query_params.get('my_transactions', None)
-        if my_transactions == 'true' and self.request.user.is_authenticated:
-            queryset = queryset.filter(
-                buyer=self.request.user) | queryset.filter(seller=self.request.user)
+        try:
+            since = request.query_params.get('since')
+            since = parse_bound(since) if since else None
+            until = request.query_params.get('until')
+            until = parse_bound(until) if until else None
+            user_id = int(user_id) if user_id is not None else None
+        except ValueError as exc:
+            return Response({'error': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return queryset.order_by('-created_at')
+        content_type, extension = FORMATS[export_format]
+        rows = export_rows(user_id=user_id, since=since, until=until)
+        response = StreamingHttpResponse(encode(rows, export_format), content_type=content_type)
+        filename = f"transactions-{timezone.now():%Y%m%d%H%M%S}.{extension}"
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
@@ -1,9 +1,16 @@
 from django.contrib import admin
-from .models import TransferListing
+from .models import Bid, TransferListing
 
 
 @admin.register(TransferListing)
 class TransferListingAdmin(admin.ModelAdmin):
-    list_display = ('player', 'asking_price', 'is_active', 'created_at')
-    list_filter = ('is_active', 'created_at')
-    readonly_fields = ('created_at', 'updated_at')
+    list_display = ('player', 'mode', 'asking_price', 'high_bid', 'ends_at', 'is_active', 'created_at')
+    list_filter = ('is_active', 'mode', 'created_at')
+    readonly_fields = ('high_bid', 'high_bidder', 'bid_count', 'created_at', 'updated_at')
+
+
+@admin.register(Bid)
+class BidAdmin(admin.ModelAdmin):
+    list_display = ('listing', 'team', 'amount', 'created_at')
+    raw_id_fields = ('listing', 'team')
+    readonly_fields = ('created_at',)
@@ -0,0 +1,58 @@
+from decimal import Decimal
+from django.db.models import F
+from django.http import HttpResponse
+from django.utils.dateparse import parse_datetime
+from rest_framework import exceptions
+from core.asyncapi import KeysetPage, async_api_view, not_modified
+from core.conditional import is_not_modified, set_validators
+from .cache import MarketPage, arecord
+from .filters import TransferListingFilter
+from .models import TransferListing
+from .rows import LISTING_VALUES, render_listing
+
+# ``ordering`` values of the DRF market, with the parser of their cursors;
+# pages are keyset ranges, so only one field is accepted
+ORDERINGS = {'asking_price': Decimal, 'player_value': Decimal, 'created_at': parse_datetime}
+
+
+@async_api_view
+async def market(request, user):
+    """
+    Async variant of ``/api/transfer-listings/``, newest first, with the same
+    search filters and a single ``ordering`` field. Shares the market page
+    cache, under its own keys.
+    """
+    if request.GET.get('my_listings') == 'true':
+        return await _listings(request, user)
+
+    page = await MarketPage.acreate(request, 'async-json')
+    if is_not_modified(request, etag=page.etag):
+        await arecord('not_modified')
+        return not_modified(etag=page.etag)
+
+    data = await page.aget()
+    if data is None:
+        response = await _listings(request, user)
+        await page.aset(response.content)
+    else:
+        response = HttpResponse(data, content_type='application/json')
+    return set_validators(response, etag=page.etag)
+
+
+async def _listings(request, user):
+    ordering = request.GET.get('ordering') or '-created_at'
+    if ordering.lstrip('-') not in ORDERINGS:
+        raise exceptions.ValidationError({'ordering': [f"Order by one of {', '.join(ORDERINGS)}, optionally with '-'"]})
+    filterset = TransferListingFilter(
+        request.GET,
+        queryset=TransferListing.objects.filter(is_active=True).annotate(player_value=F('player__value'))
+    )
+    if not filterset.is_valid():
+        raise exceptions.ValidationError(filterset.errors)
+    queryset = filterset.qs
+    if request.GET.get('my_listings') == 'true':
+        queryset = queryset.filter(player__team_id=user.team_id)
+
+    page = KeysetPage(request, ordering=ordering, parse=ORDERINGS[ordering.lstrip('-')])
+    rows = [row async for row in page.paginate(queryset).values(*LISTING_VALUES, 'player_value').aiterator()]
+    return page.response(rows, render_listing)
@@ -0,0 +1,129 @@
+"""
+Versioned read-through cache for pages of the public transfer market.
+
+Every write to the market bumps a version number stored in the cache.
+Pages are keyed by that version, so a bump invalidates every cached page
+at once without having to find them.
+"""
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+VERSION_KEY = 'transfers:market:version'
+STATS_KEYS = {
+    'hits': 'transfers:market:hits',
+    'misses': 'transfers:market:misses',
+    'not_modified': 'transfers:market:not_modified',
+}
+
+
+def get_cache():
+    return caches[settings.MARKET_CACHE_ALIAS]
+
+
+def get_version():
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses old keys
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+async def aget_version():
+    """Async variant of ``get_version``"""
+    cache = get_cache()
+    version = await cache.aget(VERSION_KEY)
+    if version is None:
+        await cache.aadd(VERSION_KEY, int(time.time() * 1000), timeout=None)
+        version = await cache.aget(VERSION_KEY)
+    return version
+
+
+def _bump_version():
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, int(time.time() * 1000), timeout=None)
+
+
+def invalidate_market():
+    """
+    Invalidate all cached market pages.
+
+    The version is bumped immediately and again on commit, so a page
+    recached from pre-commit data by a concurrent reader is discarded too.
+    """
+    _bump_version()
+    transaction.on_commit(_bump_version)
+
+
+def record(stat):
+    cache = get_cache()
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+async def arecord(stat):
+    """Async variant of ``record``"""
+    cache = get_cache()
+    key = STATS_KEYS[stat]
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aadd(key, 0, timeout=None)
+        await cache.aincr(key)
+
+
+def get_stats():
+    """Hit/miss counters for the market cache"""
+    values = get_cache().get_many(list(STATS_KEYS.values()))
+    stats = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['version'] = get_version()
+    return stats
+
+
+class MarketPage:
+    """
+    Cache entry for one market page, identified by request URL and format.
+
+    Async views build it with ``await MarketPage.acreate(...)`` and use the
+    ``a``-prefixed methods.
+    """
+
+    def __init__(self, request, renderer_format, version=None):
+        self.version = get_version() if version is None else version
+        url = request.build_absolute_uri()
+        digest = hashlib.sha1(f'{renderer_format}|{url}'.encode()).hexdigest()
+        self.key = f'transfers:market:page:{self.version}:{digest}'
+        self.etag = f'"{self.version}-{digest[:16]}"'
+
+    def get(self):
+        data = get_cache().get(self.key)
+        record('misses' if data is None else 'hits')
+        return data
+
+    def set(self, data):
+        get_cache().set(self.key, data, settings.MARKET_CACHE_TIMEOUT)
+
+    @classmethod
+    async def acreate(cls, request, renderer_format):
+        return cls(request, renderer_format, version=await aget_version())
+
+    async def aget(self):
+        data = await get_cache().aget(self.key)
+        await arecord('misses' if data is None else 'hits')
+        return data
+
+    async def aset(self, data):
+        await get_cache().aset(self.key, data, settings.MARKET_CACHE_TIMEOUT)
@@ -0,0 +1,36 @@
+import django_filters
+from rest_framework.filters import OrderingFilter
+from players.models import Player
+from .models import TransferListing
+
+
+class TransferListingFilter(django_filters.FilterSet):
+    """Server-side market search"""
+    mode = django_filters.ChoiceFilter(choices=TransferListing.MODE_CHOICES)
+    position = django_filters.ChoiceFilter(field_name='player__position', choices=Player.POSITION_CHOICES)
+    min_price = django_filters.NumberFilter(field_name='asking_price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='asking_price', lookup_expr='lte')
+    min_value = django_filters.NumberFilter(field_name='player__value', lookup_expr='gte')
+    max_value = django_filters.NumberFilter(field_name='player__value', lookup_expr='lte')
+    team_name = django_filters.CharFilter(field_name='player__team__name', lookup_expr='icontains')
+    player_name = django_filters.CharFilter(field_name='player__name', lookup_expr='icontains')
+
+    class Meta:
+        model = TransferListing
+        fields = ('mode', 'position', 'min_price', 'max_price', 'min_value', 'max_value', 'team_name', 'player_name')
+
+
+class MarketOrderingFilter(OrderingFilter):
+    """
+    Ordering by price, player value or recency, always ending with ``id``.
+
+    The trailing ``id`` keeps the order total, which cursor pagination
+    relies on to page through equal prices.
+    """
+
+    def get_ordering(self, request, queryset, view):
+        ordering = list(super().get_ordering(request, queryset, view))
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            last = ordering[-1] if ordering else '-created_at'
+            ordering.append('-id' if last.startswith('-') else 'id')
+        return ordering
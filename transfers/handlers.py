@@ -0,0 +1,15 @@
+"""Outbox handlers for transfer events"""
+import logging
+from outbox.services import handler
+from .services import TRANSFER_COMPLETED
+
+logger = logging.getLogger('transfers.notifications')
+
+
+@handler(TRANSFER_COMPLETED)
+def notify_seller(payload):
+    """Tell the seller their player was sold"""
+    logger.info(
+        'User %s sold player %s to user %s for %s',
+        payload['seller_id'], payload['player_id'], payload['buyer_id'], payload['transfer_amount']
+    )
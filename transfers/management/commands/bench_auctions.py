@@ -0,0 +1,142 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+from django.db.models import Sum
+from django.utils import timezone
+from core.benchmarks import format_latencies, summarize_latencies
+from accounts.models import User
+from players.models import Player
+from teams.models import Team
+from transactions.models import Transaction
+from transfers.models import Bid, TransferListing
+from transfers.services import BidTooLow, TransferEngine, TransferError, create_listings, place_bid
+
+
+class Command(BaseCommand):
+    """Stress the bid path with many bidders on one auction"""
+    help = (
+        'Fire a storm of concurrent bids at a single auction, each bidder raising the high bid it '
+        'last saw, then settle the auction and report throughput, latency percentiles and '
+        'invariant violations. Creates and deletes its own bench_* users; never run against production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bidders', type=int, default=50, help='Competing bidders')
+        parser.add_argument('--bids', type=int, default=20, help='Bids attempted by each bidder')
+        parser.add_argument('--threads', type=int, default=16, help='Worker threads')
+        parser.add_argument('--opening-bid', default='1000.00', help='Lowest opening bid')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated users afterwards')
+
+    def handle(self, *args, **options):
+        increment = settings.AUCTION_MIN_INCREMENT
+        opening_bid = Decimal(options['opening_bid'])
+        # Enough for the highest bid the storm could possibly reach
+        capital = opening_bid + increment * 3 * options['bidders'] * options['bids']
+        bidders, seller_team, player = self.create_fixtures(options['bidders'], capital)
+        team_ids = [seller_team.pk] + [bidder.team.pk for bidder in bidders]
+        capital_before = Team.objects.filter(pk__in=team_ids).aggregate(total=Sum('capital'))['total']
+
+        ends_at = timezone.now() + timedelta(hours=1)
+        listing = create_listings(seller_team.pk, [(player.pk, opening_bid, {'ends_at': ends_at})])[player.pk]
+
+        latencies = []
+        outcomes = {'accepted': 0, 'outbid': 0, 'conflict': 0, 'refused': 0, 'error': 0}
+        lock = threading.Lock()
+
+        def storm(bidder):
+            rng = random.Random(bidder.pk)
+            for _ in range(options['bids']):
+                seen = TransferListing.objects.filter(pk=listing.pk).values_list('high_bid', flat=True).get()
+                amount = opening_bid if seen is None else seen + increment * rng.randint(1, 3)
+                started = time.perf_counter()
+                try:
+                    place_bid(listing.pk, bidder, amount)
+                    outcome = 'accepted'
+                except BidTooLow:
+                    outcome = 'outbid'
+                except TransferError:
+                    outcome = 'refused'
+                except OperationalError:
+                    outcome = 'conflict'
+                except Exception:
+                    outcome = 'error'
+                with lock:
+                    latencies.append(time.perf_counter() - started)
+                    outcomes[outcome] += 1
+            close_old_connections()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            list(pool.map(storm, bidders))
+        elapsed = time.perf_counter() - started
+
+        attempts = sum(outcomes.values())
+        self.stdout.write(f'Bids: {attempts} in {elapsed:.2f}s ({attempts / elapsed:.0f} bids/s)')
+        self.stdout.write(f'Latency: {format_latencies(summarize_latencies(latencies))}')
+        self.stdout.write(
+            f"Outcomes: {outcomes['accepted']} accepted, {outcomes['outbid']} outbid, "
+            f"{outcomes['refused']} refused, {outcomes['conflict']} lock conflicts, {outcomes['error']} errored"
+        )
+
+        listing.refresh_from_db()
+        amounts = list(Bid.objects.filter(listing=listing).order_by('pk').values_list('amount', flat=True))
+        winner = (
+            Bid.objects.filter(listing=listing).order_by('-amount', '-pk').values_list('team_id', flat=True).first()
+        )
+
+        TransferListing.objects.filter(pk=listing.pk).update(ends_at=timezone.now())
+        settle_started = time.perf_counter()
+        sold, unsold = TransferEngine.settle_auctions()
+        settle_ms = (time.perf_counter() - settle_started) * 1000
+        self.stdout.write(f'Settlement: {sold} sold, {unsold} unsold in {settle_ms:.1f}ms')
+
+        player.refresh_from_db()
+        capital_after = Team.objects.filter(pk__in=team_ids).aggregate(total=Sum('capital'))['total']
+        violations = {
+            'high bid differs from the best bid': int(listing.high_bid != (max(amounts) if amounts else None)),
+            'bid count differs from bids stored': abs(listing.bid_count - len(amounts)),
+            'bids stored differ from bids accepted': abs(len(amounts) - outcomes['accepted']),
+            'bids not beating the previous one': sum(
+                1 for previous, amount in zip(amounts, amounts[1:]) if amount < previous + increment
+            ),
+            'player not sold to the high bidder': int(player.team_id != (winner or seller_team.pk)),
+            'transactions for the auction': abs(
+                Transaction.objects.filter(player=player).count() - int(bool(amounts))
+            ),
+            'capital created or destroyed': capital_after - capital_before,
+        }
+        for name, count in violations.items():
+            style = self.style.ERROR if count else self.style.SUCCESS
+            self.stdout.write(style(f'Invariant - {name}: {count}'))
+
+        if not options['keep']:
+            User.objects.filter(username__startswith='bench_').delete()
+
+    def create_fixtures(self, bidder_count, bidder_capital):
+        password = make_password(None)
+        seller = User.objects.create(username='bench_seller', email='bench_seller@example.com', password=password)
+        seller_team = Team.objects.create(user=seller, name='Bench Seller', capital=Decimal('0.00'))
+        player = Player.objects.create(
+            team=seller_team,
+            name='Bench Player',
+            position='MF',
+            value=Decimal('1000.00')
+        )
+
+        bidders = []
+        for i in range(bidder_count):
+            bidder = User.objects.create(
+                username=f'bench_bidder_{i}',
+                email=f'bench_bidder_{i}@example.com',
+                password=password
+            )
+            Team.objects.create(user=bidder, name=f'Bench Bidder {i}', capital=bidder_capital)
+            bidders.append(bidder)
+        return bidders, seller_team, player
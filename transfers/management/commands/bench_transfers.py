@@ -0,0 +1,120 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.db.models import Sum
+from core.benchmarks import format_latencies, summarize_latencies
+from accounts.models import User
+from players.models import Player
+from teams.models import Team
+from transactions.models import Transaction
+from transfers.models import TransferListing
+from transfers.services import TransferEngine, TransferConflict, TransferError
+
+
+class Command(BaseCommand):
+    """Stress the purchase path with many buyers competing for one listing"""
+    help = (
+        'Fire concurrent purchases at a single listing, relisting it after every round, '
+        'and report throughput, latency percentiles and invariant violations. '
+        'Creates and deletes its own bench_* users; never run against production.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--buyers', type=int, default=50, help='Competing buyers per round')
+        parser.add_argument('--rounds', type=int, default=40, help='Times the player is relisted')
+        parser.add_argument('--threads', type=int, default=16, help='Worker threads')
+        parser.add_argument('--price', default='100.00', help='Asking price per round')
+        parser.add_argument('--keep', action='store_true', help='Keep the generated users afterwards')
+
+    def handle(self, *args, **options):
+        price = Decimal(options['price'])
+        buyers, seller_team, player = self.create_fixtures(options['buyers'], price * options['rounds'])
+        team_ids = [seller_team.pk] + [buyer.team.pk for buyer in buyers]
+        capital_before = Team.objects.filter(pk__in=team_ids).aggregate(total=Sum('capital'))['total']
+
+        latencies = []
+        outcomes = {'success': 0, 'refused': 0, 'conflict': 0, 'error': 0}
+        double_sells = 0
+        lock = threading.Lock()
+
+        def attempt(listing_id, buyer):
+            started = time.perf_counter()
+            try:
+                TransferEngine.purchase(listing_id, buyer)
+                outcome = 'success'
+            except TransferConflict:
+                outcome = 'conflict'
+            except TransferError:
+                outcome = 'refused'
+            except Exception:
+                outcome = 'error'
+            finally:
+                close_old_connections()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+                outcomes[outcome] += 1
+            return outcome
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            for _ in range(options['rounds']):
+                player.refresh_from_db()
+                listing, _ = TransferListing.objects.update_or_create(
+                    player=player, defaults={'asking_price': price, 'is_active': True}
+                )
+                round_buyers = [buyer for buyer in buyers if buyer.team.pk != player.team_id]
+                results = list(pool.map(lambda buyer: attempt(listing.pk, buyer), round_buyers))
+                if results.count('success') > 1:
+                    double_sells += 1
+        elapsed = time.perf_counter() - started
+
+        capital_after = Team.objects.filter(pk__in=team_ids).aggregate(total=Sum('capital'))['total']
+        negative_capital = Team.objects.filter(pk__in=team_ids, capital__lt=0).count()
+        ledger_rows = Transaction.objects.filter(player=player).count()
+
+        attempts = sum(outcomes.values())
+        self.stdout.write(f'Attempts: {attempts} in {elapsed:.2f}s ({attempts / elapsed:.0f} purchases/s)')
+        self.stdout.write(f'Latency: {format_latencies(summarize_latencies(latencies))}')
+        self.stdout.write(
+            f"Outcomes: {outcomes['success']} succeeded, {outcomes['refused']} refused, "
+            f"{outcomes['conflict']} gave up after retries, {outcomes['error']} errored"
+        )
+
+        violations = {
+            'double-sold rounds': double_sells,
+            'teams with negative capital': negative_capital,
+            'capital created or destroyed': capital_after - capital_before,
+            'ledger rows without a success': ledger_rows - outcomes['success'],
+        }
+        for name, count in violations.items():
+            style = self.style.ERROR if count else self.style.SUCCESS
+            self.stdout.write(style(f'Invariant - {name}: {count}'))
+
+        if not options['keep']:
+            User.objects.filter(username__startswith='bench_').delete()
+
+    def create_fixtures(self, buyer_count, buyer_capital):
+        password = make_password(None)
+        seller = User.objects.create(username='bench_seller', email='bench_seller@example.com', password=password)
+        seller_team = Team.objects.create(user=seller, name='Bench Seller', capital=Decimal('0.00'))
+        player = Player.objects.create(
+            team=seller_team,
+            name='Bench Player',
+            position='MF',
+            value=Decimal('1000.00')
+        )
+
+        buyers = []
+        for i in range(buyer_count):
+            buyer = User.objects.create(
+                username=f'bench_buyer_{i}',
+                email=f'bench_buyer_{i}@example.com',
+                password=password
+            )
+            Team.objects.create(user=buyer, name=f'Bench Buyer {i}', capital=buyer_capital)
+            buyers.append(buyer)
+        return buyers, seller_team, player
@@ -0,0 +1,49 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+from transfers.services import TransferEngine
+
+
+class Command(BaseCommand):
+    """Close expired auctions"""
+    help = (
+        'Sell every ended auction to its high bidder, or close it unsold when the reserve was not '
+        'met or the winner can no longer pay, in batches of one transaction each. Exits when no '
+        'ended auction is left; with --every it keeps polling. Several settlers can run at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Auctions per transaction (default: AUCTION_SETTLE_BATCH_SIZE)')
+        parser.add_argument('--every', type=float, help='Poll again after this many seconds, until interrupted')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size is None:
+            batch_size = settings.AUCTION_SETTLE_BATCH_SIZE
+        if batch_size < 1:
+            raise CommandError('--batch-size must be positive')
+
+        totals = {'sold': 0, 'unsold': 0}
+        try:
+            while True:
+                close_old_connections()
+                started = time.perf_counter()
+                sold, unsold = TransferEngine.settle_auctions(limit=batch_size)
+                totals['sold'] += sold
+                totals['unsold'] += unsold
+                if sold or unsold:
+                    self.stdout.write(
+                        f'Settled {sold + unsold} auctions ({sold} sold, {unsold} unsold) '
+                        f'in {time.perf_counter() - started:.2f}s'
+                    )
+                    continue
+                if not options['every']:
+                    break
+                time.sleep(options['every'])
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(
+            f"Settled {totals['sold'] + totals['unsold']} auctions: {totals['sold']} sold, {totals['unsold']} unsold"
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfers', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transferlisting',
+            index=models.Index(fields=['-created_at', '-id'], name='transfers_t_created_8098d5_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 03:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transfers', '0002_transferlisting_transfers_t_created_8098d5_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='transferlisting',
+            name='transfers_t_created_8098d5_idx',
+        ),
+        migrations.AddIndex(
+            model_name='transferlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at', '-id'], name='transfers_active_recent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transferlisting',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['asking_price', 'id'], name='transfers_active_price_idx'),
+        ),
+    ]
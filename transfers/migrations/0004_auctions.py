@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-18 04:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('teams', '0003_leaderboards'),
+        ('transfers', '0003_market_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bid',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-amount', '-id'],
+            },
+        ),
+        migrations.AddField(
+            model_name='transferlisting',
+            name='bid_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='transferlisting',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='transferlisting',
+            name='high_bid',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddField(
+            model_name='transferlisting',
+            name='high_bidder',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='leading_bids', to='teams.team'),
+        ),
+        migrations.AddField(
+            model_name='transferlisting',
+            name='mode',
+            field=models.CharField(choices=[('fixed', 'Fixed price'), ('auction', 'Auction')], default='fixed', max_length=7),
+        ),
+        migrations.AddField(
+            model_name='transferlisting',
+            name='reserve_price',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='transferlisting',
+            index=models.Index(condition=models.Q(('is_active', True), ('mode', 'auction')), fields=['ends_at', 'id'], name='transfers_auction_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='listing',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='transfers.transferlisting'),
+        ),
+        migrations.AddField(
+            model_name='bid',
+            name='team',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bids', to='teams.team'),
+        ),
+        migrations.AddIndex(
+            model_name='bid',
+            index=models.Index(fields=['listing', '-amount'], name='transfers_bid_listing_idx'),
+        ),
+    ]
@@ -1,18 +1,84 @@
 from django.db import models
+from django.db.models import Q
 from players.models import Player
+from teams.models import Team
+from .cache import invalidate_market
 
 
 class TransferListing(models.Model):
     """TransferListing model for players listed for sale"""
+
+    FIXED_PRICE = 'fixed'
+    AUCTION = 'auction'
+    MODE_CHOICES = [
+        (FIXED_PRICE, 'Fixed price'),
+        (AUCTION, 'Auction'),
+    ]
+
     player = models.OneToOneField(Player, on_delete=models.CASCADE, related_name='transfer_listing')
+    # For auctions, the lowest opening bid
     asking_price = models.DecimalField(max_digits=10, decimal_places=2)
     is_active = models.BooleanField(default=True)
+    mode = models.CharField(max_length=7, choices=MODE_CHOICES, default=FIXED_PRICE)
+
+    # Auctions only; the high bid is kept on the listing so that a bid is
+    # one conditional UPDATE of this row
+    reserve_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
+    high_bid = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    high_bidder = models.ForeignKey(
+        Team, on_delete=models.SET_NULL, null=True, blank=True, related_name='leading_bids'
+    )
+    bid_count = models.PositiveIntegerField(default=0)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-created_at']
+        # The API only ever reads active listings, so the market indexes
+        # are partial and skip the ever-growing history of sold ones
+        indexes = [
+            models.Index(
+                fields=['-created_at', '-id'], condition=Q(is_active=True), name='transfers_active_recent_idx'
+            ),
+            models.Index(
+                fields=['asking_price', 'id'], condition=Q(is_active=True), name='transfers_active_price_idx'
+            ),
+            models.Index(
+                fields=['ends_at', 'id'], condition=Q(is_active=True, mode='auction'), name='transfers_auction_due_idx'
+            ),
+        ]
+
+    @property
+    def is_auction(self):
+        return self.mode == self.AUCTION
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        invalidate_market()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        invalidate_market()
+        return result
 
     def __str__(self):
         return f"{self.player.name} - ${self.asking_price}"
+
+
+class Bid(models.Model):
+    """An accepted bid on an auction; the history behind its high bid"""
+    listing = models.ForeignKey(TransferListing, on_delete=models.CASCADE, related_name='bids')
+    team = models.ForeignKey(Team, on_delete=models.CASCADE, related_name='bids')
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-amount', '-id']
+        indexes = [
+            models.Index(fields=['listing', '-amount'], name='transfers_bid_listing_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.team_id} bid ${self.amount} on listing {self.listing_id}"
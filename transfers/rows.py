@@ -0,0 +1,30 @@
+"""
+Render ``values()`` rows in the shape of the transfer serializers.
+"""
+from core.rows import render_datetime, render_decimal
+from players.rows import player_values, render_player
+
+LISTING_VALUES = (
+    'id', 'asking_price', 'is_active', 'mode', 'ends_at', 'high_bid', 'bid_count', 'created_at',
+    *player_values('player__'),
+)
+
+
+def render_listing(row):
+    """Same output as ``TransferListingSerializer``"""
+    return {
+        'id': row['id'],
+        'player': render_player(row, 'player__'),
+        'asking_price': render_decimal(row['asking_price']),
+        'is_active': row['is_active'],
+        'mode': row['mode'],
+        'ends_at': render_datetime(row['ends_at']),
+        'high_bid': render_decimal(row['high_bid']),
+        'bid_count': row['bid_count'],
+        'created_at': render_datetime(row['created_at']),
+    }
+
+
+def render_listings(rows):
+    """Render a page of listing rows"""
+    return [render_listing(row) for row in rows]
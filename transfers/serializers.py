@@ -1,14 +1,81 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.conf import settings
 from rest_framework import serializers
+from core.instrumentation import TimedSerializerMixin
 from players.serializers import PlayerSerializer
-from .models import TransferListing
+from .models import Bid, TransferListing
 
 
-class TransferListingSerializer(serializers.ModelSerializer):
+class TransferListingSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for TransferListing model"""
     player = PlayerSerializer(read_only=True)
     player_id = serializers.IntegerField(write_only=True)
 
     class Meta:
         model = TransferListing
-        fields = ('id', 'player', 'player_id', 'asking_price', 'is_active', 'created_at')
-        read_only_fields = ('is_active',)
+        fields = (
+            'id', 'player', 'player_id', 'asking_price', 'is_active', 'mode', 'ends_at', 'high_bid', 'bid_count',
+            'created_at',
+        )
+        read_only_fields = ('is_active', 'mode', 'ends_at', 'high_bid', 'bid_count')
+
+
+class ListingRequestSerializer(serializers.Serializer):
+    """A player to list and its asking price, or the opening bid of an auction"""
+    player_id = serializers.IntegerField()
+    asking_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+    mode = serializers.ChoiceField(choices=TransferListing.MODE_CHOICES, default=TransferListing.FIXED_PRICE)
+    duration_minutes = serializers.IntegerField(
+        required=False,
+        min_value=settings.AUCTION_MIN_DURATION_MINUTES,
+        max_value=settings.AUCTION_MAX_DURATION_MINUTES
+    )
+    reserve_price = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal('0.01'), required=False, allow_null=True
+    )
+
+    def validate(self, data):
+        if data['mode'] == TransferListing.AUCTION:
+            if 'duration_minutes' not in data:
+                raise serializers.ValidationError({'duration_minutes': 'Auctions need a duration'})
+        elif 'duration_minutes' in data or data.get('reserve_price') is not None:
+            raise serializers.ValidationError('Only auctions take a duration and a reserve price')
+        return data
+
+    @staticmethod
+    def to_item(data, now):
+        """The ``create_listings`` item for validated ``data``"""
+        if data['mode'] != TransferListing.AUCTION:
+            return data['player_id'], data['asking_price']
+        return data['player_id'], data['asking_price'], {
+            'ends_at': now + timedelta(minutes=data['duration_minutes']),
+            'reserve_price': data.get('reserve_price'),
+        }
+
+
+class BatchListingSerializer(serializers.Serializer):
+    """Players to list in one request"""
+    listings = ListingRequestSerializer(many=True, allow_empty=False, max_length=settings.TRANSFER_BATCH_MAX_ITEMS)
+    atomic = serializers.BooleanField(default=True)
+
+
+class BatchPurchaseSerializer(serializers.Serializer):
+    """Listings to buy in one request, in order of preference"""
+    listing_ids = serializers.ListField(
+        child=serializers.IntegerField(), allow_empty=False, max_length=settings.TRANSFER_BATCH_MAX_ITEMS
+    )
+    atomic = serializers.BooleanField(default=True)
+
+
+class BidRequestSerializer(serializers.Serializer):
+    """The amount of a bid"""
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0.01'))
+
+
+class BidSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for Bid model"""
+
+    class Meta:
+        model = Bid
+        fields = ('id', 'listing', 'team', 'amount', 'created_at')
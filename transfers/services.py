@@ -0,0 +1,566 @@
+import logging
+import random
+import time
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from django.conf import settings
+from django.db import OperationalError, transaction
+from django.db.models import Case, DecimalField, F, Q, Value, When
+from django.utils import timezone
+from rest_framework import status
+from outbox.services import publish, publish_many
+from players.models import Player, PositionCount
+from players.squads import SquadRules
+from teams.models import Team
+from transactions.models import LedgerEntry, Transaction
+from .cache import invalidate_market
+from .models import Bid, TransferListing
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL SQLSTATEs for serialization_failure and deadlock_detected
+RETRYABLE_PGCODES = {'40001', '40P01'}
+
+# Outbox topic published for every completed purchase
+TRANSFER_COMPLETED = 'transfers.transfer_completed'
+
+CENT = Decimal('0.01')
+
+
+class TransferError(Exception):
+    """A purchase that was refused; carries the HTTP status to report"""
+    status_code = status.HTTP_400_BAD_REQUEST
+
+
+class ListingNotAvailable(TransferError):
+    status_code = status.HTTP_404_NOT_FOUND
+
+
+class OwnPlayerError(TransferError):
+    pass
+
+
+class InsufficientCapital(TransferError):
+    pass
+
+
+class TransferConflict(TransferError):
+    status_code = status.HTTP_409_CONFLICT
+
+
+class SquadRuleError(TransferError):
+    """The purchase would break the squad composition rules"""
+    status_code = status.HTTP_409_CONFLICT
+
+
+class AuctionOnly(TransferError):
+    """A fixed-price purchase of a player sold by auction"""
+    pass
+
+
+class BidTooLow(TransferError):
+    status_code = status.HTTP_409_CONFLICT
+
+
+class PlayerNotOwned(TransferError):
+    status_code = status.HTTP_404_NOT_FOUND
+
+
+class AlreadyListed(TransferError):
+    pass
+
+
+class BatchError(TransferError):
+    """
+    An all-or-nothing batch with refused items; nothing was written.
+
+    ``results`` maps every item to its error, or to None when it was fine.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        errors = [result for result in results.values() if result is not None]
+        self.status_code = errors[0].status_code
+        super().__init__(f'{len(errors)} of {len(results)} items were refused, nothing was changed')
+
+
+def _per_team(deltas):
+    """``CASE`` expression picking each team's amount from ``deltas``"""
+    return Case(
+        *[When(pk=team_id, then=Value(delta)) for team_id, delta in deltas.items()],
+        default=Value(Decimal('0.00')),
+        output_field=DecimalField(max_digits=15, decimal_places=2)
+    )
+
+
+def is_retryable(exc):
+    """Whether a database error is a transient lock or serialization conflict"""
+    cause = exc.__cause__
+    if getattr(cause, 'pgcode', None) in RETRYABLE_PGCODES:
+        return True
+    # SQLite reports lock contention as a plain OperationalError
+    return 'database is locked' in str(exc)
+
+
+class TransferEngine:
+    """Moves players, capital and ledger rows for a purchase under row locks"""
+
+    max_retries = 3
+    retry_backoff = 0.01
+
+    @classmethod
+    def purchase(cls, listing_id, buyer):
+        """
+        Buy the active listing ``listing_id`` for ``buyer`` and return the
+        new Transaction. Only ``buyer.pk`` and ``buyer.team_id`` are read, so
+        a token-backed user works as well as a model instance.
+
+        The listing row is locked first and then both teams in primary key
+        order, so concurrent purchases never deadlock on each other. Lock and
+        serialization conflicts are retried with jittered backoff when the
+        engine owns the transaction.
+        """
+        return cls._with_retries(cls._purchase, listing_id, buyer)
+
+    @classmethod
+    def purchase_many(cls, listing_ids, buyer, atomic=True):
+        """
+        Buy several active listings for ``buyer`` in one transaction.
+
+        Returns ``{listing_id: Transaction or TransferError}``. Listings are
+        bought in the given order while the buyer's capital lasts. With
+        ``atomic`` any refusal buys nothing and raises ``BatchError``;
+        otherwise the refused listings are skipped.
+
+        All listings are locked in primary key order and then all teams
+        involved in primary key order, the same order as ``purchase()``, so
+        batches and single purchases never deadlock on each other.
+        """
+        if len(set(listing_ids)) != len(listing_ids):
+            raise TransferError('Duplicate listing ids')
+        return cls._with_retries(cls._purchase_many, listing_ids, buyer, atomic)
+
+    @classmethod
+    def _with_retries(cls, operation, *args):
+        # Retrying is only safe when a failure rolls back the whole
+        # transaction, not just a savepoint inside a caller's atomic block
+        retries = 0 if transaction.get_connection().in_atomic_block else cls.max_retries
+
+        for attempt in range(retries + 1):
+            try:
+                with transaction.atomic():
+                    return operation(*args)
+            except OperationalError as exc:
+                if not is_retryable(exc):
+                    raise
+                if attempt == retries:
+                    raise TransferConflict('The listing is busy, please retry') from exc
+                logger.debug('Retrying %s after conflict: %s', operation.__name__, exc)
+                time.sleep(cls.retry_backoff * (2 ** attempt) * random.random())
+
+    @classmethod
+    def _purchase(cls, listing_id, buyer):
+        try:
+            listing = (
+                TransferListing.objects.select_for_update(of=('self', 'player'))
+                .select_related('player')
+                .get(pk=listing_id, is_active=True)
+            )
+        except TransferListing.DoesNotExist:
+            raise ListingNotAvailable('Listing not found or no longer active')
+        if listing.is_auction:
+            raise AuctionOnly('This player is sold by auction, place a bid instead')
+        player = listing.player
+
+        buyer_team_id = buyer.team_id
+        if buyer_team_id is None:
+            raise TransferError('Team not found')
+        if buyer_team_id == player.team_id:
+            raise OwnPlayerError('You cannot buy your own player')
+
+        teams = {
+            team.pk: team
+            for team in Team.objects.select_for_update()
+            .filter(pk__in=[buyer_team_id, player.team_id])
+            .order_by('pk')
+            .only('pk', 'user_id')
+        }
+        if buyer_team_id not in teams:
+            raise TransferError('Team not found')
+        seller_team = teams[player.team_id]
+
+        # Transfers only move the counters while holding these team locks,
+        # so the check stays valid until the player moves
+        violation = SquadRules().transfer_violation(
+            PositionCount.objects.for_teams(list(teams)), buyer_team_id, seller_team.pk, player.position
+        )
+        if violation:
+            raise SquadRuleError(violation)
+
+        now = timezone.now()
+        asking_price = listing.asking_price
+        # The capital check is part of the UPDATE, so it cannot be raced
+        debited = Team.objects.filter(pk=buyer_team_id, capital__gte=asking_price).update(
+            capital=F('capital') - asking_price,
+            transfer_profit=F('transfer_profit') - asking_price,
+            updated_at=now
+        )
+        if not debited:
+            raise InsufficientCapital('Insufficient capital')
+        Team.objects.filter(pk=seller_team.pk).update(
+            capital=F('capital') + asking_price,
+            transfer_profit=F('transfer_profit') + asking_price,
+            updated_at=now
+        )
+
+        player.team_id = buyer_team_id
+        player.value = cls._resale_value(player.value)
+        player.save()
+
+        TransferListing.objects.filter(pk=listing.pk).update(is_active=False, updated_at=now)
+        invalidate_market()
+
+        purchase = Transaction.objects.create(
+            buyer_id=buyer.pk,
+            seller_id=seller_team.user_id,
+            player=player,
+            transfer_amount=asking_price,
+            is_active=True
+        )
+        # Follow-up work runs in the outbox worker, once this commits
+        publish(TRANSFER_COMPLETED, cls._completed_payload(purchase, listing, buyer_team_id, seller_team.pk))
+        return purchase
+
+    @classmethod
+    def _purchase_many(cls, listing_ids, buyer, atomic):
+        buyer_team_id = buyer.team_id
+        if buyer_team_id is None:
+            raise TransferError('Team not found')
+
+        # Players are locked first, in primary key order, like listing
+        # creation and revaluation do, then their listings; locking both
+        # by listing order could deadlock with those on overlapping players
+        player_ids = list(
+            TransferListing.objects.filter(pk__in=listing_ids, is_active=True).values_list('player_id', flat=True)
+        )
+        locked_player_ids = list(
+            Player.objects.select_for_update().filter(pk__in=player_ids).order_by('pk').values_list('pk', flat=True)
+        )
+        listings = {
+            listing.pk: listing
+            for listing in TransferListing.objects.select_for_update(of=('self',))
+            .select_related('player')
+            .filter(pk__in=listing_ids, player_id__in=locked_player_ids, is_active=True)
+            .order_by('pk')
+        }
+        teams = {
+            team.pk: team
+            for team in Team.objects.select_for_update()
+            .filter(pk__in={buyer_team_id, *(listing.player.team_id for listing in listings.values())})
+            .order_by('pk')
+            .only('pk', 'user_id', 'capital')
+        }
+        if buyer_team_id not in teams:
+            raise TransferError('Team not found')
+
+        # Check every item against the locked rows before writing anything
+        results, bought = {}, []
+        capital = teams[buyer_team_id].capital
+        rules, counts = SquadRules(), PositionCount.objects.for_teams(list(teams))
+        for listing_id in listing_ids:
+            listing = listings.get(listing_id)
+            if listing is None:
+                results[listing_id] = ListingNotAvailable('Listing not found or no longer active')
+                continue
+            player = listing.player
+            violation = rules.transfer_violation(counts, buyer_team_id, player.team_id, player.position)
+            if listing.is_auction:
+                results[listing_id] = AuctionOnly('This player is sold by auction, place a bid instead')
+            elif player.team_id == buyer_team_id:
+                results[listing_id] = OwnPlayerError('You cannot buy your own player')
+            elif listing.asking_price > capital:
+                results[listing_id] = InsufficientCapital('Insufficient capital')
+            elif violation:
+                results[listing_id] = SquadRuleError(violation)
+            else:
+                capital -= listing.asking_price
+                rules.apply(counts, buyer_team_id, player.team_id, player.position)
+                results[listing_id] = None
+                bought.append(listing)
+        if atomic and len(bought) < len(listing_ids):
+            raise BatchError(results)
+        if not bought:
+            return results
+
+        purchases = cls._complete_sales(
+            [(listing, teams[buyer_team_id], listing.asking_price) for listing in bought], teams, timezone.now()
+        )
+        for listing, purchase in zip(bought, purchases):
+            results[listing.pk] = purchase
+        return results
+
+    @classmethod
+    def settle_auctions(cls, now=None, limit=None):
+        """
+        Close up to ``limit`` auctions that ended by ``now``, in one
+        transaction; returns ``(sold, unsold)``.
+
+        An auction is sold to its high bidder for the high bid when the bid
+        meets the reserve and the bidder can still pay for the player and fit
+        it in their squad; otherwise it closes unsold. Auctions locked by a
+        bid in flight or another settler are skipped until the next run.
+        """
+        now = now or timezone.now()
+        if limit is None:
+            limit = settings.AUCTION_SETTLE_BATCH_SIZE
+        with transaction.atomic():
+            listings = list(
+                TransferListing.objects.select_for_update(of=('self', 'player'), skip_locked=True)
+                .select_related('player')
+                .filter(is_active=True, mode=TransferListing.AUCTION, ends_at__lte=now)
+                .order_by('ends_at', 'pk')[:limit]
+            )
+            if not listings:
+                return 0, 0
+            teams = {
+                team.pk: team
+                for team in Team.objects.select_for_update()
+                .filter(pk__in={
+                    *(listing.player.team_id for listing in listings),
+                    *(listing.high_bidder_id for listing in listings if listing.high_bidder_id),
+                })
+                .order_by('pk')
+                .only('pk', 'user_id', 'capital')
+            }
+
+            # Capital and squads move with each sale, so later auctions of
+            # the batch are checked against the earlier ones
+            capital = {team.pk: team.capital for team in teams.values()}
+            rules, counts = SquadRules(), PositionCount.objects.for_teams(list(teams))
+            sales = []
+            for listing in listings:
+                player, buyer_team_id, price = listing.player, listing.high_bidder_id, listing.high_bid
+                if buyer_team_id not in teams or price is None:
+                    reason = 'no bids'
+                elif listing.reserve_price is not None and price < listing.reserve_price:
+                    reason = 'reserve not met'
+                elif price > capital[buyer_team_id]:
+                    reason = 'winner cannot pay'
+                else:
+                    reason = rules.transfer_violation(counts, buyer_team_id, player.team_id, player.position)
+                if reason:
+                    logger.info('Auction %s closed unsold: %s', listing.pk, reason)
+                    continue
+                capital[buyer_team_id] -= price
+                capital[player.team_id] += price
+                rules.apply(counts, buyer_team_id, player.team_id, player.position)
+                sales.append((listing, teams[buyer_team_id], price))
+
+            if sales:
+                cls._complete_sales(sales, teams, now)
+            TransferListing.objects.filter(pk__in=[listing.pk for listing in listings]).update(
+                is_active=False, updated_at=now
+            )
+            invalidate_market()
+        return len(sales), len(listings) - len(sales)
+
+    @classmethod
+    def _complete_sales(cls, sales, teams, now):
+        """
+        Write ``(listing, buyer_team, price)`` sales already checked against
+        the locked ``teams``, with one statement per table; returns their
+        Transactions in order.
+        """
+        capital_deltas, value_deltas = defaultdict(Decimal), defaultdict(Decimal)
+        position_deltas = defaultdict(int)
+        players, purchases, seller_team_ids = [], [], []
+        for listing, buyer_team, price in sales:
+            player = listing.player
+            seller_team = teams[player.team_id]
+            seller_team_ids.append(seller_team.pk)
+            new_value = cls._resale_value(player.value).quantize(CENT, rounding=ROUND_HALF_UP)
+            capital_deltas[buyer_team.pk] -= price
+            capital_deltas[seller_team.pk] += price
+            value_deltas[buyer_team.pk] += new_value
+            value_deltas[seller_team.pk] -= player.value
+            position_deltas[buyer_team.pk, player.position] += 1
+            position_deltas[seller_team.pk, player.position] -= 1
+            purchases.append(Transaction(
+                buyer_id=buyer_team.user_id,
+                seller_id=seller_team.user_id,
+                player=player,
+                transfer_amount=price,
+                is_active=True
+            ))
+            player.team_id, player.value, player.updated_at = buyer_team.pk, new_value, now
+            players.append(player)
+
+        # One UPDATE for all teams' capital, transfer profit and squad value
+        Team.objects.filter(pk__in=list(capital_deltas)).update(
+            capital=F('capital') + _per_team(capital_deltas),
+            transfer_profit=F('transfer_profit') + _per_team(capital_deltas),
+            total_team_value=F('total_team_value') + _per_team(value_deltas),
+            updated_at=now
+        )
+        Player.objects.bulk_update(players, ['team', 'value', 'updated_at'])
+        PositionCount.objects.adjust(position_deltas)
+        TransferListing.objects.filter(pk__in=[listing.pk for listing, _, _ in sales]).update(
+            is_active=False, updated_at=now
+        )
+        purchases = Transaction.objects.bulk_create(purchases)
+        LedgerEntry.objects.bulk_create(LedgerEntry.entries_for(purchases))
+        publish_many(TRANSFER_COMPLETED, [
+            cls._completed_payload(purchase, listing, buyer_team.pk, seller_team_id)
+            for purchase, (listing, buyer_team, _), seller_team_id in zip(purchases, sales, seller_team_ids)
+        ])
+        invalidate_market()
+        return purchases
+
+    @staticmethod
+    def _resale_value(value):
+        """A player's value after a transfer: 5-15% above the current one"""
+        return value * (Decimal('1') + Decimal(str(random.uniform(0.05, 0.15))))
+
+    @staticmethod
+    def _completed_payload(purchase, listing, buyer_team_id, seller_team_id):
+        return {
+            'transaction_id': purchase.pk,
+            'listing_id': listing.pk,
+            'player_id': purchase.player_id,
+            'buyer_id': purchase.buyer_id,
+            'buyer_team_id': buyer_team_id,
+            'seller_id': purchase.seller_id,
+            'seller_team_id': seller_team_id,
+            'transfer_amount': purchase.transfer_amount,
+            'player_value': purchase.player.value,
+            'created_at': purchase.created_at,
+        }
+
+
+def place_bid(listing_id, bidder, amount, now=None):
+    """
+    Bid ``amount`` on the open auction ``listing_id`` for ``bidder`` and
+    return the new Bid; only ``bidder.team_id`` is read.
+
+    The bid is one conditional UPDATE that raises the listing's high bid
+    only if the auction is still open and ``amount`` beats the current bid
+    by ``AUCTION_MIN_INCREMENT``. Nothing is locked beforehand, so bidders
+    on a hot listing queue for that single statement instead of a whole
+    read-check-write cycle, and a bid overtaken meanwhile is refused rather
+    than retried. The bidder's capital is checked again at settlement.
+    """
+    team_id = bidder.team_id
+    if team_id is None:
+        raise TransferError('Team not found')
+    now = now or timezone.now()
+    increment = settings.AUCTION_MIN_INCREMENT
+
+    listing = (
+        TransferListing.objects.filter(pk=listing_id, is_active=True, mode=TransferListing.AUCTION, ends_at__gt=now)
+        .values('player__team_id', 'asking_price', 'high_bid')
+        .first()
+    )
+    if listing is None:
+        raise ListingNotAvailable('Auction not found or already closed')
+    if listing['player__team_id'] == team_id:
+        raise OwnPlayerError('You cannot bid on your own player')
+    if not Team.objects.filter(pk=team_id, capital__gte=amount).exists():
+        raise InsufficientCapital('Insufficient capital')
+
+    with transaction.atomic():
+        # Only columns of the listing row are tested, so PostgreSQL rechecks
+        # them against the winning bid when a concurrent one commits first
+        accepted = TransferListing.objects.filter(
+            Q(high_bid__isnull=True, asking_price__lte=amount) | Q(high_bid__lte=amount - increment),
+            pk=listing_id, is_active=True, ends_at__gt=now
+        ).update(
+            high_bid=amount,
+            high_bidder_id=team_id,
+            bid_count=F('bid_count') + 1,
+            updated_at=now
+        )
+        if not accepted:
+            current = TransferListing.objects.filter(pk=listing_id, is_active=True, ends_at__gt=now).values(
+                'asking_price', 'high_bid'
+            ).first()
+            if current is None:
+                raise ListingNotAvailable('Auction not found or already closed')
+            minimum = current['asking_price'] if current['high_bid'] is None else current['high_bid'] + increment
+            raise BidTooLow(f'Bids must be at least {minimum}')
+        bid = Bid.objects.create(listing_id=listing_id, team_id=team_id, amount=amount)
+        invalidate_market()
+    return bid
+
+
+def create_listings(team_id, items, atomic=True):
+    """
+    List players of ``team_id`` for sale.
+
+    ``items`` are ``(player_id, asking_price)`` pairs, or
+    ``(player_id, opening_bid, auction)`` triples where ``auction`` holds
+    the ``ends_at`` and ``reserve_price`` of an auction. Returns
+    ``{player_id: TransferListing or TransferError}``; with ``atomic`` any
+    refusal lists nothing and raises ``BatchError``.
+
+    A player keeps one listing row, so a player sold or withdrawn before is
+    listed again by reactivating that row.
+    """
+    player_ids = [item[0] for item in items]
+    if len(set(player_ids)) != len(player_ids):
+        raise TransferError('Duplicate player ids')
+
+    with transaction.atomic():
+        # Locking the players, in primary key order, keeps two requests from
+        # listing the same player and a purchase from moving it meanwhile
+        owned = set(
+            Player.objects.select_for_update()
+            .filter(pk__in=player_ids, team_id=team_id)
+            .order_by('pk')
+            .values_list('pk', flat=True)
+        )
+        existing = {
+            listing.player_id: listing
+            for listing in TransferListing.objects.filter(player_id__in=owned).only('pk', 'player_id', 'is_active')
+        }
+
+        results = {}
+        for player_id in player_ids:
+            if player_id not in owned:
+                results[player_id] = PlayerNotOwned('Player not found or does not belong to you')
+            elif player_id in existing and existing[player_id].is_active:
+                results[player_id] = AlreadyListed('Player is already listed for transfer')
+            else:
+                results[player_id] = None
+        if atomic and any(result is not None for result in results.values()):
+            raise BatchError(results)
+
+        now = timezone.now()
+        created, relisted = [], []
+        for player_id, asking_price, *auction in items:
+            if results[player_id] is not None:
+                continue
+            listing = existing.get(player_id)
+            if listing is None:
+                listing = TransferListing(player_id=player_id)
+                created.append(listing)
+            else:
+                # Listed afresh, so it sorts with the newest on the market
+                listing.is_active = True
+                listing.created_at = listing.updated_at = now
+                relisted.append(listing)
+            listing.asking_price = asking_price
+            listing.mode = TransferListing.AUCTION if auction else TransferListing.FIXED_PRICE
+            listing.ends_at = auction[0]['ends_at'] if auction else None
+            listing.reserve_price = auction[0].get('reserve_price') if auction else None
+            listing.high_bid, listing.high_bidder_id, listing.bid_count = None, None, 0
+            results[player_id] = listing
+        if relisted:
+            TransferListing.objects.bulk_update(relisted, [
+                'asking_price', 'is_active', 'mode', 'ends_at', 'reserve_price', 'high_bid', 'high_bidder',
+                'bid_count', 'created_at', 'updated_at',
+            ])
+        if created:
+            TransferListing.objects.bulk_create(created)
+        if created or relisted:
+            invalidate_market()
+    return results
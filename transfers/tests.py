@@ -1,13 +1,23 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from django.test import TestCase, override_settings
+from django.core.management import CommandError, call_command
+from django.core.cache import cache
+from django.db import OperationalError
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 from decimal import Decimal
 
 from teams.models import Team
-from players.models import Player
-from transfers.models import TransferListing
+from players.models import Player, PositionCount
+from outbox.models import OutboxEvent
+from transfers.models import Bid, TransferListing
 from transactions.models import Transaction
+from transfers.services import (
+    TransferEngine, BidTooLow, ListingNotAvailable, InsufficientCapital, SquadRuleError, is_retryable, place_bid
+)
 
 User = get_user_model()
 
@@ -95,7 +105,7 @@ class TransferListingTests(TestCase):
         response = self.client.get('/api/transfer-listings/')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
         
     def test_view_my_listings(self):
         """Test viewing only my listings"""
@@ -111,8 +121,8 @@ class TransferListingTests(TestCase):
         response = self.client.get('/api/transfer-listings/?my_listings=true')
         
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['player']['name'], 'My Player')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['player']['name'], 'My Player')
         
     def test_cancel_my_listing(self):
         """Test canceling own listing"""
@@ -230,3 +240,573 @@ class PlayerPurchaseTests(TestCase):
         
         player.refresh_from_db()
         self.assertGreater(player.value, initial_value)
+        
+    def test_purchase_updates_team_values(self):
+        """Test that the player's value moves from the seller to the buyer team"""
+        player = Player.objects.create(
+            team=self.seller_team,
+            name='Test Player',
+            position='GK',
+            value=Decimal('1000000.00')
+        )
+        listing = TransferListing.objects.create(player=player, asking_price=Decimal('1500000.00'))
+        
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/buy/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        
+        player.refresh_from_db()
+        self.seller_team.refresh_from_db()
+        self.buyer_team.refresh_from_db()
+        self.assertEqual(self.seller_team.total_team_value, Decimal('0.00'))
+        self.assertEqual(self.buyer_team.total_team_value, player.value)
+
+
+class TransferEngineTests(TestCase):
+    """Test the purchase engine directly"""
+    
+    def setUp(self):
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        self.seller_team = Team.objects.create(user=self.seller, name='Seller Team', capital=Decimal('5000000.00'))
+        self.buyer_team = Team.objects.create(user=self.buyer, name='Buyer Team', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(
+            team=self.seller_team,
+            name='Player',
+            position='MF',
+            value=Decimal('1000000.00')
+        )
+        self.listing = TransferListing.objects.create(player=self.player, asking_price=Decimal('2000000.00'))
+        
+    def test_sold_listing_cannot_be_bought_again(self):
+        """Test that a second purchase of the same listing is refused"""
+        third = User.objects.create_user(username='third', email='third@test.com', password='Pass123')
+        Team.objects.create(user=third, name='Third Team', capital=Decimal('5000000.00'))
+        
+        TransferEngine.purchase(self.listing.pk, self.buyer)
+        
+        with self.assertRaises(ListingNotAvailable):
+            TransferEngine.purchase(self.listing.pk, third)
+        self.assertEqual(Transaction.objects.count(), 1)
+        
+    def test_insufficient_capital_changes_nothing(self):
+        """Test that a refused purchase leaves capital and ownership untouched"""
+        Team.objects.filter(pk=self.buyer_team.pk).update(capital=Decimal('1999999.99'))
+        
+        with self.assertRaises(InsufficientCapital):
+            TransferEngine.purchase(self.listing.pk, self.buyer)
+        
+        self.seller_team.refresh_from_db()
+        self.player.refresh_from_db()
+        self.listing.refresh_from_db()
+        self.assertEqual(self.seller_team.capital, Decimal('5000000.00'))
+        self.assertEqual(self.player.team_id, self.seller_team.pk)
+        self.assertTrue(self.listing.is_active)
+        
+    def test_retryable_errors_are_detected(self):
+        """Test classification of lock and serialization conflicts"""
+        class PgError(Exception):
+            pgcode = '40001'
+        
+        conflict = OperationalError('could not serialize access')
+        conflict.__cause__ = PgError()
+        
+        self.assertTrue(is_retryable(conflict))
+        self.assertTrue(is_retryable(OperationalError('database is locked')))
+        self.assertFalse(is_retryable(OperationalError('no such table')))
+
+
+class MarketCacheTests(TestCase):
+    """Test the read-through cache of the transfer market"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        self.seller_team = Team.objects.create(user=self.seller, name='Seller Team', capital=Decimal('5000000.00'))
+        self.buyer_team = Team.objects.create(user=self.buyer, name='Buyer Team', capital=Decimal('5000000.00'))
+        self.player = Player.objects.create(
+            team=self.seller_team,
+            name='Player',
+            position='MF',
+            value=Decimal('1000000.00')
+        )
+        self.listing = TransferListing.objects.create(player=self.player, asking_price=Decimal('1500000.00'))
+        self.client.force_authenticate(user=self.buyer)
+        
+    def test_repeated_page_is_served_from_cache(self):
+        """Test that an unchanged page is served without database queries"""
+        first = self.client.get('/api/transfer-listings/')
+        
+        with self.assertNumQueries(0):
+            second = self.client.get('/api/transfer-listings/')
+        
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+        
+    def test_if_none_match_returns_304(self):
+        """Test that a matching ETag is answered with 304"""
+        first = self.client.get('/api/transfer-listings/')
+        
+        response = self.client.get('/api/transfer-listings/', HTTP_IF_NONE_MATCH=first['ETag'])
+        
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], first['ETag'])
+        
+    def test_write_actions_invalidate_cached_pages(self):
+        """Test that buying, cancelling and creating listings change the page"""
+        etags = [self.client.get('/api/transfer-listings/')['ETag']]
+        
+        self.client.post(f'/api/transfer-listings/{self.listing.id}/buy/')
+        response = self.client.get('/api/transfer-listings/')
+        self.assertEqual(len(response.data['results']), 0)
+        etags.append(response['ETag'])
+        
+        player = Player.objects.create(team=self.buyer_team, name='Other', position='GK', value=Decimal('1000000.00'))
+        created = self.client.post(
+            '/api/transfer-listings/', {'player_id': player.id, 'asking_price': '1000.00'}, format='json'
+        )
+        response = self.client.get('/api/transfer-listings/')
+        self.assertEqual(len(response.data['results']), 1)
+        etags.append(response['ETag'])
+        
+        self.client.post(f"/api/transfer-listings/{created.data['id']}/cancel/")
+        response = self.client.get('/api/transfer-listings/')
+        self.assertEqual(len(response.data['results']), 0)
+        etags.append(response['ETag'])
+        
+        self.assertEqual(len(set(etags)), 4)
+        
+    def test_cache_stats_require_staff(self):
+        """Test that cache counters are exposed to staff only"""
+        self.client.get('/api/transfer-listings/')
+        self.client.get('/api/transfer-listings/')
+        
+        response = self.client.get('/api/transfer-listings/cache-stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        
+        staff = User.objects.create_user(username='staff', email='staff@test.com', password='Pass123', is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get('/api/transfer-listings/cache-stats/')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['hits'], 1)
+        self.assertEqual(response.data['misses'], 1)
+
+
+class MarketSearchTests(TestCase):
+    """Test filtering and ordering of the transfer market"""
+    
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.other = User.objects.create_user(username='other', email='other@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        seller_team = Team.objects.create(user=self.seller, name='Red Lions', capital=Decimal('5000000.00'))
+        other_team = Team.objects.create(user=self.other, name='Blue Sharks', capital=Decimal('5000000.00'))
+        Team.objects.create(user=self.buyer, name='Buyer Team', capital=Decimal('5000000.00'))
+        for team, name, position, value, price in [
+            (seller_team, 'Alan Keeper', 'GK', '1000000.00', '1500000.00'),
+            (seller_team, 'Bob Striker', 'AT', '2000000.00', '2500000.00'),
+            (other_team, 'Carl Striker', 'AT', '3000000.00', '1000000.00'),
+            (other_team, 'Dan Defender', 'DF', '1500000.00', '2000000.00'),
+        ]:
+            player = Player.objects.create(team=team, name=name, position=position, value=Decimal(value))
+            TransferListing.objects.create(player=player, asking_price=Decimal(price))
+        self.client.force_authenticate(user=self.buyer)
+        
+    def names(self, query):
+        response = self.client.get(f'/api/transfer-listings/?{query}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item['player']['name'] for item in response.data['results']]
+        
+    def test_filter_by_position(self):
+        """Test filtering listings by player position"""
+        self.assertCountEqual(self.names('position=AT'), ['Bob Striker', 'Carl Striker'])
+        
+    def test_filter_by_price_range(self):
+        """Test filtering listings by asking price range"""
+        self.assertCountEqual(
+            self.names('min_price=1500000&max_price=2000000'), ['Alan Keeper', 'Dan Defender']
+        )
+        
+    def test_filter_by_team_and_player_name(self):
+        """Test filtering listings by team name and player name"""
+        self.assertCountEqual(self.names('team_name=sharks'), ['Carl Striker', 'Dan Defender'])
+        self.assertEqual(self.names('player_name=bob'), ['Bob Striker'])
+        self.assertEqual(self.names('team_name=lions&position=AT'), ['Bob Striker'])
+        
+    def test_order_by_price_and_value(self):
+        """Test ordering listings by asking price and player value"""
+        self.assertEqual(
+            self.names('ordering=asking_price'),
+            ['Carl Striker', 'Alan Keeper', 'Dan Defender', 'Bob Striker']
+        )
+        self.assertEqual(
+            self.names('ordering=-player_value'),
+            ['Carl Striker', 'Bob Striker', 'Dan Defender', 'Alan Keeper']
+        )
+        
+    def test_ordered_results_page_with_cursor(self):
+        """Test cursor pagination over a price ordering"""
+        response = self.client.get('/api/transfer-listings/?ordering=-asking_price&page_size=3')
+        names = [item['player']['name'] for item in response.data['results']]
+        response = self.client.get(response.data['next'])
+        names += [item['player']['name'] for item in response.data['results']]
+        
+        self.assertEqual(names, ['Bob Striker', 'Dan Defender', 'Alan Keeper', 'Carl Striker'])
+
+
+class BatchTransferTests(TestCase):
+    """Test creating and buying several listings in one request"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        self.seller_team = Team.objects.create(user=self.seller, name='Seller', capital=Decimal('5000000.00'))
+        self.buyer_team = Team.objects.create(user=self.buyer, name='Buyer', capital=Decimal('5000000.00'))
+        self.players = [
+            Player.objects.create(
+                team=self.seller_team, name=f'Player {i}', position='MF', value=Decimal('1000000.00')
+            )
+            for i in range(3)
+        ]
+        
+    def list_players(self, prices, atomic=True):
+        self.client.force_authenticate(user=self.seller)
+        listings = [
+            {'player_id': player.id, 'asking_price': price}
+            for player, price in zip(self.players, prices)
+        ]
+        return self.client.post(
+            '/api/transfer-listings/batch/', {'listings': listings, 'atomic': atomic}, format='json'
+        )
+        
+    def test_batch_create_lists_every_player(self):
+        """Test that an atomic batch lists all players and relists withdrawn ones"""
+        TransferListing.objects.create(player=self.players[0], asking_price=Decimal('1.00'), is_active=False)
+        
+        response = self.list_players(['1500000.00', '1600000.00', '1700000.00'])
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['status'] for item in response.data['results']], ['listed'] * 3)
+        self.assertEqual(response.data['results'][0]['listing']['asking_price'], '1500000.00')
+        self.assertEqual(TransferListing.objects.filter(is_active=True).count(), 3)
+        
+    def test_atomic_batch_create_lists_nothing_on_error(self):
+        """Test that one foreign player fails the whole atomic batch"""
+        self.players[1] = Player.objects.create(
+            team=self.buyer_team, name='Not Mine', position='GK', value=Decimal('1000000.00')
+        )
+        
+        response = self.list_players(['1500000.00', '1600000.00', '1700000.00'])
+        
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(
+            [item['status'] for item in response.data['results']], ['skipped', 'failed', 'skipped']
+        )
+        self.assertFalse(TransferListing.objects.exists())
+        
+    def test_per_item_batch_create(self):
+        """Test that a non-atomic batch lists what it can"""
+        TransferListing.objects.create(player=self.players[2], asking_price=Decimal('1500000.00'))
+        
+        response = self.list_players(['1500000.00', '1600000.00', '1700000.00'], atomic=False)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['status'] for item in response.data['results']], ['listed', 'listed', 'failed']
+        )
+        self.assertEqual(response.data['results'][2]['error'], 'Player is already listed for transfer')
+        
+    def test_batch_buy_moves_players_and_capital(self):
+        """Test that an atomic batch buys every listing in one transaction"""
+        self.list_players(['1500000.00', '1600000.00'])
+        listing_ids = list(TransferListing.objects.order_by('pk').values_list('pk', flat=True))
+        
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.post(
+            '/api/transfer-listings/batch-buy/', {'listing_ids': listing_ids}, format='json'
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['status'] for item in response.data['results']], ['purchased'] * 2)
+        self.buyer_team.refresh_from_db()
+        self.seller_team.refresh_from_db()
+        self.assertEqual(self.buyer_team.capital, Decimal('1900000.00'))
+        self.assertEqual(self.seller_team.capital, Decimal('8100000.00'))
+        self.assertEqual(Player.objects.filter(team=self.buyer_team).count(), 2)
+        self.assertEqual(
+            self.buyer_team.total_team_value,
+            sum(Player.objects.filter(team=self.buyer_team).values_list('value', flat=True))
+        )
+        self.assertEqual(self.seller_team.total_team_value, Decimal('1000000.00'))
+        self.assertFalse(TransferListing.objects.filter(is_active=True).exists())
+        self.assertEqual(Transaction.objects.filter(buyer=self.buyer).count(), 2)
+        self.assertEqual(self.buyer.ledger_entries.count(), 2)
+        
+    def test_batch_buy_stops_when_capital_runs_out(self):
+        """Test atomic and per-item semantics when capital covers only some listings"""
+        self.list_players(['3000000.00', '3000000.00'])
+        listing_ids = list(TransferListing.objects.order_by('pk').values_list('pk', flat=True))
+        self.client.force_authenticate(user=self.buyer)
+        
+        response = self.client.post(
+            '/api/transfer-listings/batch-buy/', {'listing_ids': listing_ids}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Transaction.objects.exists())
+        
+        response = self.client.post(
+            '/api/transfer-listings/batch-buy/', {'listing_ids': listing_ids, 'atomic': False}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['status'] for item in response.data['results']], ['purchased', 'failed'])
+        self.assertEqual(response.data['results'][1]['error'], 'Insufficient capital')
+        self.assertEqual(Transaction.objects.count(), 1)
+        
+    def test_bought_player_can_be_listed_again(self):
+        """Test that a player keeps one listing row across sales"""
+        self.list_players(['1500000.00'])
+        listing = TransferListing.objects.get()
+        TransferEngine.purchase(listing.pk, self.buyer)
+        
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.post(
+            '/api/transfer-listings/', {'player_id': self.players[0].id, 'asking_price': '2500000.00'}
+        )
+        
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['id'], listing.pk)
+        self.assertTrue(response.data['is_active'])
+
+
+@override_settings(SQUAD_RULES={
+    'POSITIONS': {'GK': (1, 2), 'DF': (0, 10), 'MF': (0, 10), 'AT': (0, 10)},
+    'MAX_SQUAD_SIZE': 4,
+})
+class SquadRuleTests(TestCase):
+    """Test squad composition rules on purchases"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.buyer = User.objects.create_user(username='buyer', email='buyer@test.com', password='Pass123')
+        self.seller_team = Team.objects.create(user=self.seller, name='Seller', capital=Decimal('5000000.00'))
+        self.buyer_team = Team.objects.create(user=self.buyer, name='Buyer', capital=Decimal('50000000.00'))
+        
+    def create_listing(self, team, position, price='1000000.00'):
+        player = Player.objects.create(team=team, name=f'{position} player', position=position, value=Decimal(price))
+        return TransferListing.objects.create(player=player, asking_price=Decimal(price))
+        
+    def counts(self, team):
+        return dict(PositionCount.objects.filter(team=team).values_list('position', 'count'))
+        
+    def test_position_maximum_is_enforced(self):
+        """Test that a buyer cannot exceed the goalkeeper maximum"""
+        self.create_listing(self.buyer_team, 'GK')
+        self.create_listing(self.buyer_team, 'GK')
+        self.create_listing(self.seller_team, 'GK')
+        listing = self.create_listing(self.seller_team, 'GK')
+        
+        self.client.force_authenticate(user=self.buyer)
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/buy/')
+        
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['error'], 'Your squad already has the maximum of 2 goalkeepers')
+        listing.player.refresh_from_db()
+        self.assertEqual(listing.player.team_id, self.seller_team.pk)
+        self.assertEqual(self.counts(self.buyer_team), {'GK': 2})
+        
+    def test_position_minimum_is_enforced(self):
+        """Test that a seller cannot sell its last goalkeeper"""
+        listing = self.create_listing(self.seller_team, 'GK')
+        
+        with self.assertRaisesMessage(SquadRuleError, 'The selling team must keep at least 1 goalkeepers'):
+            TransferEngine.purchase(listing.pk, self.buyer)
+        self.assertFalse(Transaction.objects.exists())
+        
+    def test_counters_follow_purchases(self):
+        """Test that single and batch purchases move the position counters"""
+        listings = [self.create_listing(self.seller_team, position) for position in ('MF', 'AT', 'AT')]
+        
+        TransferEngine.purchase(listings[0].pk, self.buyer)
+        TransferEngine.purchase_many([listing.pk for listing in listings[1:]], self.buyer)
+        
+        self.assertEqual(self.counts(self.buyer_team), {'MF': 1, 'AT': 2})
+        self.assertEqual(self.counts(self.seller_team), {'MF': 0, 'AT': 0})
+        
+    def test_batch_checks_squad_size_cumulatively(self):
+        """Test that each item of a batch counts against the squad size"""
+        self.create_listing(self.buyer_team, 'DF')
+        self.create_listing(self.buyer_team, 'DF')
+        listing_ids = [self.create_listing(self.seller_team, 'MF').pk for _ in range(3)]
+        
+        results = TransferEngine.purchase_many(listing_ids, self.buyer, atomic=False)
+        
+        self.assertIsInstance(results[listing_ids[1]], Transaction)
+        self.assertIsInstance(results[listing_ids[2]], SquadRuleError)
+        self.assertEqual(str(results[listing_ids[2]]), 'Your squad already has the maximum of 4 players')
+        self.assertEqual(self.counts(self.buyer_team), {'DF': 2, 'MF': 2})
+
+
+@override_settings(AUCTION_MIN_INCREMENT=Decimal('100.00'))
+class AuctionTests(TestCase):
+    """Test auction listings, bidding and settlement"""
+    
+    def setUp(self):
+        self.client = APIClient()
+        self.seller = User.objects.create_user(username='seller', email='seller@test.com', password='Pass123')
+        self.bidder1 = User.objects.create_user(username='bidder1', email='bidder1@test.com', password='Pass123')
+        self.bidder2 = User.objects.create_user(username='bidder2', email='bidder2@test.com', password='Pass123')
+        self.seller_team = Team.objects.create(user=self.seller, name='Seller', capital=Decimal('5000.00'))
+        self.team1 = Team.objects.create(user=self.bidder1, name='Bidder 1', capital=Decimal('5000.00'))
+        self.team2 = Team.objects.create(user=self.bidder2, name='Bidder 2', capital=Decimal('5000.00'))
+        self.player = Player.objects.create(
+            team=self.seller_team, name='Auctioned', position='MF', value=Decimal('1000.00')
+        )
+        
+    def create_auction(self, opening_bid='1000.00', reserve_price=None):
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.post('/api/transfer-listings/', {
+            'player_id': self.player.id,
+            'asking_price': opening_bid,
+            'mode': 'auction',
+            'duration_minutes': 60,
+            'reserve_price': reserve_price,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return TransferListing.objects.get(pk=response.data['id'])
+        
+    def close(self, listing):
+        TransferListing.objects.filter(pk=listing.pk).update(ends_at=timezone.now() - timedelta(seconds=1))
+        
+    def test_create_auction(self):
+        """Test that an auction is listed with its end time and no bids"""
+        listing = self.create_auction()
+        
+        self.assertEqual(listing.mode, TransferListing.AUCTION)
+        self.assertAlmostEqual(listing.ends_at, timezone.now() + timedelta(minutes=60), delta=timedelta(minutes=1))
+        self.assertIsNone(listing.high_bid)
+        
+        self.client.force_authenticate(user=self.bidder1)
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/buy/')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('place a bid', response.data['error'])
+        
+    def test_bids_must_beat_the_high_bid(self):
+        """Test the opening bid and the minimum increment"""
+        listing = self.create_auction()
+        
+        self.client.force_authenticate(user=self.bidder1)
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/bid/', {'amount': '999.99'})
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['error'], 'Bids must be at least 1000.00')
+        
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/bid/', {'amount': '1000.00'})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['bid']['team'], self.team1.pk)
+        
+        with self.assertRaisesMessage(BidTooLow, 'Bids must be at least 1100.00'):
+            place_bid(listing.pk, self.bidder2, Decimal('1099.99'))
+        place_bid(listing.pk, self.bidder2, Decimal('1100.00'))
+        
+        listing.refresh_from_db()
+        self.assertEqual(listing.high_bid, Decimal('1100.00'))
+        self.assertEqual(listing.high_bidder_id, self.team2.pk)
+        self.assertEqual(listing.bid_count, 2)
+        self.assertEqual(Bid.objects.filter(listing=listing).count(), 2)
+        
+    def test_closed_auction_and_own_player_refuse_bids(self):
+        """Test that sellers cannot bid and ended auctions take no bids"""
+        listing = self.create_auction()
+        
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/bid/', {'amount': '2000.00'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        self.close(listing)
+        with self.assertRaises(ListingNotAvailable):
+            place_bid(listing.pk, self.bidder1, Decimal('2000.00'))
+        
+    def test_settlement_sells_to_high_bidder(self):
+        """Test that an ended auction is sold at the high bid"""
+        listing = self.create_auction()
+        place_bid(listing.pk, self.bidder1, Decimal('1000.00'))
+        place_bid(listing.pk, self.bidder2, Decimal('1500.00'))
+        
+        self.assertEqual(TransferEngine.settle_auctions(), (0, 0))
+        self.close(listing)
+        self.assertEqual(TransferEngine.settle_auctions(), (1, 0))
+        
+        self.player.refresh_from_db()
+        self.team2.refresh_from_db()
+        self.seller_team.refresh_from_db()
+        listing.refresh_from_db()
+        self.assertEqual(self.player.team_id, self.team2.pk)
+        self.assertEqual(self.team2.capital, Decimal('3500.00'))
+        self.assertEqual(self.seller_team.capital, Decimal('6500.00'))
+        self.assertFalse(listing.is_active)
+        purchase = Transaction.objects.get(player=self.player)
+        self.assertEqual((purchase.buyer, purchase.transfer_amount), (self.bidder2, Decimal('1500.00')))
+        self.assertEqual(OutboxEvent.objects.get().payload['buyer_team_id'], self.team2.pk)
+        self.assertEqual(PositionCount.objects.get(team=self.team2, position='MF').count, 1)
+        
+    def test_settlement_closes_unsold_auctions(self):
+        """Test that auctions below the reserve or without bids close unsold"""
+        listing = self.create_auction(reserve_price='2000.00')
+        place_bid(listing.pk, self.bidder1, Decimal('1500.00'))
+        self.close(listing)
+        
+        self.assertEqual(TransferEngine.settle_auctions(), (0, 1))
+        self.player.refresh_from_db()
+        self.team1.refresh_from_db()
+        self.assertEqual(self.player.team_id, self.seller_team.pk)
+        self.assertEqual(self.team1.capital, Decimal('5000.00'))
+        self.assertFalse(Transaction.objects.exists())
+        
+        # Relisting starts a fresh auction
+        listing = self.create_auction()
+        self.assertTrue(listing.is_active)
+        self.assertEqual((listing.high_bid, listing.bid_count), (None, 0))
+        
+    def test_auction_with_bids_cannot_be_cancelled(self):
+        """Test that the seller cannot withdraw an auction once bid on"""
+        listing = self.create_auction()
+        place_bid(listing.pk, self.bidder1, Decimal('1000.00'))
+        
+        self.client.force_authenticate(user=self.seller)
+        response = self.client.post(f'/api/transfer-listings/{listing.id}/cancel/')
+        
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        listing.refresh_from_db()
+        self.assertTrue(listing.is_active)
+        
+    def test_auction_cannot_be_edited_or_deleted(self):
+        """Test that listings offer no update or delete around the cancel checks"""
+        listing = self.create_auction()
+        place_bid(listing.pk, self.bidder1, Decimal('1000.00'))
+        
+        response = self.client.delete(f'/api/transfer-listings/{listing.id}/')
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        
+        self.client.force_authenticate(user=self.bidder2)
+        response = self.client.patch(
+            f'/api/transfer-listings/{listing.id}/', {'asking_price': '1.00'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
+        
+        listing.refresh_from_db()
+        self.assertTrue(listing.is_active)
+        self.assertEqual(listing.asking_price, Decimal('1000.00'))
+        self.assertEqual(Bid.objects.filter(listing=listing).count(), 1)
+        
+    def test_settle_command_rejects_invalid_batch_size(self):
+        """Test that --batch-size 0 is refused rather than replaced by the default"""
+        with self.assertRaisesMessage(CommandError, '--batch-size must be positive'):
+            call_command('settle_auctions', '--batch-size', '0', stdout=StringIO())
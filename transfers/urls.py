@@ -1,10 +1,12 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import TransferListingViewSet
 
 router = DefaultRouter()
 router.register(r'transfer-listings', TransferListingViewSet, basename='transferlisting')
 
 urlpatterns = [
+    path('async/transfer-listings/', async_views.market, name='async-transfer-listings'),
     path('', include(router.urls)),
 ]
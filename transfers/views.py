@@ -1,122 +1,234 @@
-from rest_framework import viewsets, status
+from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db import transaction as db_transaction
-from decimal import Decimal
-import random
+from django.db.models import F
+from django.http import Http404
+from django.utils import timezone
+from django_filters.rest_framework import DjangoFilterBackend
 
-from players.models import Player
+from core.compact import CompactListMixin
+from core.conditional import is_not_modified, not_modified_response, set_validators
+from core.pagination import FeedCursorPagination
+from core.querysets import OptimizedQuerySetMixin, optimize_queryset
 from transactions.models import Transaction
 from transactions.serializers import TransactionSerializer
+from .cache import MarketPage, get_stats, invalidate_market, record
+from .filters import MarketOrderingFilter, TransferListingFilter
 from .models import TransferListing
-from .serializers import TransferListingSerializer
+from .rows import LISTING_VALUES, render_listings
+from .serializers import (
+    BatchListingSerializer, BatchPurchaseSerializer, BidRequestSerializer, BidSerializer, ListingRequestSerializer,
+    TransferListingSerializer
+)
+from .services import BatchError, TransferEngine, TransferError, create_listings, place_bid
 
 
-class TransferListingViewSet(viewsets.ModelViewSet):
+class TransferListingViewSet(CompactListMixin, OptimizedQuerySetMixin, viewsets.ModelViewSet):
     """ViewSet for Transfer Listing operations"""
+    queryset = TransferListing.objects.filter(is_active=True)
+    # Listings change only through create, buy, bid and cancel, which carry
+    # the ownership and auction checks; there is no generic update or delete
+    http_method_names = ['get', 'post', 'head', 'options']
+    pagination_class = FeedCursorPagination
     serializer_class = TransferListingSerializer
+    filter_backends = [DjangoFilterBackend, MarketOrderingFilter]
+    filterset_class = TransferListingFilter
+    ordering_fields = ('asking_price', 'player_value', 'created_at')
+    ordering = ('-created_at', '-id')
+    compact_values = LISTING_VALUES
+    compact_renderer = staticmethod(render_listings)
     
     def get_queryset(self):
         """Filter queryset based on user and active status"""
-        queryset = TransferListing.objects.filter(is_active=True)
+        queryset = super().get_queryset().annotate(player_value=F('player__value'))
         
         my_listings = self.request.query_params.get('my_listings', None)
         if my_listings == 'true' and self.request.user.is_authenticated:
-            queryset = queryset.filter(player__team__user=self.request.user)
+            queryset = queryset.filter(player__team_id=self.request.user.team_id)
         
         return queryset
     
+    def list(self, request, *args, **kwargs):
+        """List the active market, served from the page cache when possible"""
+        if request.query_params.get('my_listings') == 'true':
+            return super().list(request, *args, **kwargs)
+        
+        page = MarketPage(request, request.accepted_renderer.format)
+        if is_not_modified(request, etag=page.etag):
+            record('not_modified')
+            return not_modified_response(etag=page.etag)
+        
+        data = page.get()
+        if data is None:
+            response = super().list(request, *args, **kwargs)
+            page.set(response.data)
+        else:
+            response = Response(data)
+        return set_validators(response, etag=page.etag)
+    
+    @action(detail=False, methods=['get'], url_path='cache-stats',
+            permission_classes=[permissions.IsAdminUser])
+    def cache_stats(self, request):
+        """Hit/miss counters of the market page cache"""
+        return Response(get_stats())
+    
     def create(self, request):
         """Create a new transfer listing"""
-        player_id = request.data.get('player_id')
+        item = ListingRequestSerializer(data=request.data)
+        item.is_valid(raise_exception=True)
+        player_id = item.validated_data['player_id']
         
         try:
-            player = Player.objects.get(id=player_id, team__user=request.user)
-        except Player.DoesNotExist:
-            return Response(
-                {'error': 'Player not found or does not belong to you'},
-                status=status.HTTP_404_NOT_FOUND
+            results = create_listings(
+                request.user.team_id, [ListingRequestSerializer.to_item(item.validated_data, timezone.now())]
             )
+        except BatchError as exc:
+            error = exc.results[player_id]
+            return Response({'error': str(error)}, status=error.status_code)
         
-        if TransferListing.objects.filter(player=player, is_active=True).exists():
-            return Response(
-                {'error': 'Player is already listed for transfer'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer = self.get_serializer(results[player_id])
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        List several players at once.
         
-        asking_price = request.data.get('asking_price')
-        listing = TransferListing.objects.create(
-            player=player,
-            asking_price=asking_price
-        )
+        With ``atomic`` (the default) either every player is listed or none
+        is; otherwise each item succeeds or fails on its own.
+        """
+        batch = BatchListingSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        now = timezone.now()
+        items = [ListingRequestSerializer.to_item(item, now) for item in batch.validated_data['listings']]
         
-        serializer = self.get_serializer(listing)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        try:
+            results = create_listings(request.user.team_id, items, atomic=batch.validated_data['atomic'])
+        except BatchError as exc:
+            return self.batch_error_response(exc, 'player_id')
+        except TransferError as exc:
+            return Response({'error': str(exc)}, status=exc.status_code)
+        
+        listings = optimize_queryset(
+            TransferListing.objects.filter(pk__in=[
+                result.pk for result in results.values() if isinstance(result, TransferListing)
+            ]),
+            TransferListingSerializer
+        ).in_bulk()
+        return Response({'results': [
+            {'player_id': player_id, 'status': 'listed',
+             'listing': TransferListingSerializer(listings[result.pk]).data}
+            if isinstance(result, TransferListing)
+            else {'player_id': player_id, 'status': 'failed', 'error': str(result)}
+            for player_id, result in results.items()
+        ]}, status=status.HTTP_201_CREATED if batch.validated_data['atomic'] else status.HTTP_200_OK)
+    
+    @action(detail=False, methods=['post'], url_path='batch-buy')
+    def batch_buy(self, request):
+        """
+        Buy several listings at once, in the order given.
+        
+        With ``atomic`` (the default) either every listing is bought or none
+        is; otherwise listings are bought while capital lasts and the rest
+        are reported as failed.
+        """
+        batch = BatchPurchaseSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        
+        try:
+            results = TransferEngine.purchase_many(
+                batch.validated_data['listing_ids'], request.user, atomic=batch.validated_data['atomic']
+            )
+        except BatchError as exc:
+            return self.batch_error_response(exc, 'listing_id')
+        except TransferError as exc:
+            return Response({'error': str(exc)}, status=exc.status_code)
+        
+        transactions = optimize_queryset(
+            Transaction.objects.filter(pk__in=[
+                result.pk for result in results.values() if isinstance(result, Transaction)
+            ]),
+            TransactionSerializer
+        ).in_bulk()
+        return Response({'results': [
+            {'listing_id': listing_id, 'status': 'purchased',
+             'transaction': TransactionSerializer(transactions[result.pk]).data}
+            if isinstance(result, Transaction)
+            else {'listing_id': listing_id, 'status': 'failed', 'error': str(result)}
+            for listing_id, result in results.items()
+        ]}, status=status.HTTP_200_OK)
+    
+    def batch_error_response(self, exc, key):
+        """Per-item report of an all-or-nothing batch that changed nothing"""
+        return Response({'error': str(exc), 'results': [
+            {key: item, 'status': 'skipped'} if error is None
+            else {key: item, 'status': 'failed', 'error': str(error)}
+            for item, error in exc.results.items()
+        ]}, status=exc.status_code)
     
     @action(detail=True, methods=['post'])
     def buy(self, request, pk=None):
         """Buy a player from transfer listing"""
         listing = self.get_object()
         
-        if listing.player.team.user == request.user:
-            return Response(
-                {'error': 'You cannot buy your own player'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        with db_transaction.atomic():
-            buyer_team = request.user.team
-            seller_team = listing.player.team
-            
-            if buyer_team.capital < listing.asking_price:
-                return Response(
-                    {'error': 'Insufficient capital'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-            
-            asking_price = Decimal(str(listing.asking_price))
-            buyer_team.capital = Decimal(str(buyer_team.capital)) - asking_price
-            seller_team.capital = Decimal(str(seller_team.capital)) + asking_price
-            
-            buyer_team.save()
-            seller_team.save()
-            
-            seller_user = listing.player.team.user
-            
-            listing.player.team = buyer_team
-            
-            value_increase = Decimal(str(random.uniform(0.05, 0.15)))
-            listing.player.value = Decimal(str(listing.player.value)) * (Decimal('1') + value_increase)
-            listing.player.save()
-            
-            transaction = Transaction.objects.create(
-                buyer=request.user,
-                seller=seller_user,
-                player=listing.player,
-                transfer_amount=listing.asking_price,
-                is_active=True
-            )
-            
-            listing.is_active = False
-            listing.save()
+        try:
+            transaction = TransferEngine.purchase(listing.pk, request.user)
+        except TransferError as exc:
+            return Response({'error': str(exc)}, status=exc.status_code)
         
+        transaction = optimize_queryset(
+            Transaction.objects.filter(pk=transaction.pk), TransactionSerializer
+        ).get()
         return Response({
             'message': 'Player purchased successfully',
             'transaction': TransactionSerializer(transaction).data
         }, status=status.HTTP_200_OK)
     
+    @action(detail=True, methods=['post'])
+    def bid(self, request, pk=None):
+        """Bid on an auction"""
+        item = BidRequestSerializer(data=request.data)
+        item.is_valid(raise_exception=True)
+        # The listing is not loaded here; the bid engine reads it once
+        try:
+            listing_id = int(pk)
+        except ValueError:
+            raise Http404
+        
+        try:
+            bid = place_bid(listing_id, request.user, item.validated_data['amount'])
+        except TransferError as exc:
+            return Response({'error': str(exc)}, status=exc.status_code)
+        
+        return Response({
+            'message': 'Bid placed',
+            'bid': BidSerializer(bid).data
+        }, status=status.HTTP_201_CREATED)
+    
     @action(detail=True, methods=['post'])
     def cancel(self, request, pk=None):
         """Cancel a transfer listing"""
         listing = self.get_object()
         
-        if listing.player.team.user != request.user:
+        if listing.player.team_id != request.user.team_id:
             return Response(
                 {'error': 'You can only cancel your own listings'},
                 status=status.HTTP_403_FORBIDDEN
             )
         
-        listing.is_active = False
-        listing.save()
+        if listing.is_auction:
+            # Conditional, so a bid arriving meanwhile keeps the auction open
+            cancelled = TransferListing.objects.filter(pk=listing.pk, is_active=True, bid_count=0).update(
+                is_active=False, updated_at=timezone.now()
+            )
+            if not cancelled:
+                return Response(
+                    {'error': 'An auction with bids cannot be cancelled'},
+                    status=status.HTTP_409_CONFLICT
+                )
+            invalidate_market()
+        else:
+            listing.is_active = False
+            listing.save()
         
         return Response({'message': 'Transfer listing cancelled'}, status=status.HTTP_200_OK)